@@ -0,0 +1,140 @@
+"""
+Microbenchmarks for the non-LLM hot paths of the pipeline.
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 100 1000 10000
+
+Each run appends its timings to a JSON-lines history file and compares them
+with the previous run, flagging anything slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from src.columnar import available as columnar_available
+from src.graph_encoding import encode_graph
+from src.miro_client import MiroClient
+from src.models import BoardItem
+from src.parser import LayoutParser
+from src.server import format_dsl_to_text
+from src.tools import extract_json
+from tests.synthetic_board import adversarial_llm_outputs, generate_board, generate_dsl
+
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "results.jsonl")
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def _extract_all(outputs: Dict[str, str]):
+    for text in outputs.values():
+        try:
+            extract_json(text)
+        except ValueError:
+            pass
+
+def run_benchmarks(sizes: List[int], repeat: int) -> Dict[str, float]:
+    client = MiroClient(access_token="benchmark")
+    results: Dict[str, float] = {}
+
+    for size in sizes:
+        raw = generate_board(size)
+        contents = [d.get("data", {}).get("content", "") for d in raw]
+        items: List[BoardItem] = [client._parse_item(d) for d in raw]
+        graph = LayoutParser(items).parse().dict(exclude_none=True)
+
+        results[f"parse_item[{size}]"] = best_of(lambda: [client._parse_item(d) for d in raw], repeat)
+        results[f"clean_html[{size}]"] = best_of(lambda: [client._clean_html(c) for c in contents], repeat)
+        results[f"layout_parse[{size}]"] = best_of(lambda: LayoutParser(items, columnar=False).parse(), repeat)
+        if columnar_available():
+            results[f"layout_parse_columnar[{size}]"] = best_of(lambda: LayoutParser(items, columnar=True).parse(), repeat)
+        results[f"encode_graph[{size}]"] = best_of(lambda: encode_graph(graph), repeat)
+        results[f"json_dumps_graph[{size}]"] = best_of(lambda: json.dumps(graph, indent=2), repeat)
+
+    for size in (10, 200):
+        outputs = adversarial_llm_outputs(size)
+        results[f"extract_json[{size}]"] = best_of(lambda: _extract_all(outputs), repeat)
+        dsl = generate_dsl(size)
+        results[f"format_dsl_to_text[{size}]"] = best_of(lambda: format_dsl_to_text(dsl), repeat)
+
+    # CLI startup on top of bare interpreter startup; heavy imports must stay lazy
+    server = os.path.join(ROOT, "src", "server.py")
+    interpreter = best_of(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), repeat)
+    help_time = best_of(lambda: subprocess.run([sys.executable, server, "--help"], capture_output=True, check=True), repeat)
+    results["cli_help_overhead"] = max(0.0, help_time - interpreter)
+
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_previous(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+def compare(previous: Dict[str, float], current: Dict[str, float], threshold: float) -> List[str]:
+    regressions = []
+    for name, seconds in current.items():
+        before = previous.get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append(f"{name}: {before * 1000:.2f}ms -> {seconds * 1000:.2f}ms (+{(seconds / before - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline microbenchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Board sizes in items")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best is kept")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file of past results")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when a regression is found")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    width = max(len(name) for name in results)
+    for name, seconds in results.items():
+        print(f"{name:<{width}}  {seconds * 1000:10.2f} ms")
+
+    previous = load_previous(args.history)
+    regressions = compare(previous["results"], results, args.threshold) if previous else []
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print(f"\nRegressions against {previous.get('revision') or previous['timestamp']}:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    elif previous:
+        print("\nNo regressions against the previous run.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Local stand-ins for the Miro REST API and Ollama, for load tests that must not
+touch the real services.
+
+    FakeMiro    /v2/boards/<id>, /v2/boards/<id>/items and /v2/boards/<id>/connectors
+                over synthetic boards, paginated like the real API, with optional
+                per-request latency, 429 rate limits and 5xx errors.
+    FakeOllama  /api/chat and /api/generate. Replies are the smallest instance of the
+                requested JSON schema, paced by a configurable latency and prompt and
+                generation token rates; a fraction can be truncated (malformed).
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from tests.synthetic_board import generate_board
+
+CHARS_PER_TOKEN = 4
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-stream on purpose; that is not worth a traceback
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+class _Server:
+    """An HTTP server on a background thread; use as a context manager."""
+    def __init__(self, handler: type, host: str = "127.0.0.1", port: int = 0):
+        self.server = _HTTPServer((host, port), handler)
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeMiro(_Server):
+    """
+    Synthetic boards of board_items items, generated from a hash of the board id
+    so every board is different but stable. Every rate_limit_every-th request is
+    answered 429 with Retry-After: retry_after; error_rate of the rest fail with 503.
+    """
+    def __init__(self, board_items: int = 500, latency: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 0.0, error_rate: float = 0.0, seed: int = 0, **kwargs):
+        self.board_items = board_items
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.boards: Dict[str, List[Dict[str, Any]]] = {}
+        self.requests = 0
+        super().__init__(self._handler(), **kwargs)
+
+    def board(self, board_id: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            if board_id not in self.boards:
+                self.boards[board_id] = generate_board(self.board_items, seed=zlib.crc32(board_id.encode("utf-8")))
+            return self.boards[board_id]
+
+    def _fault(self) -> Optional[Tuple[int, Dict[str, str]]]:
+        with self.lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                self.stats["rate_limited"] = self.stats.get("rate_limited", 0) + 1
+                return 429, {"Retry-After": f"{self.retry_after:g}"}
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["errors"] = self.stats.get("errors", 0) + 1
+                return 503, {}
+        return None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                fake.count("requests")
+                if fake.latency:
+                    time.sleep(fake.latency)
+                fault = fake._fault()
+                if fault:
+                    self.send_json(fault[0], {"status": fault[0], "message": "injected"}, fault[1])
+                    return
+
+                parsed = urlparse(self.path)
+                parts = [part for part in parsed.path.split("/") if part]
+                if len(parts) < 3 or parts[:2] != ["v2", "boards"]:
+                    self.send_json(404, {"message": "Not found"})
+                    return
+                board_id = parts[2]
+                if len(parts) == 3:
+                    self.send_json(200, {"id": board_id, "name": f"Load test {board_id}", "modifiedAt": "2025-01-01T00:00:00Z"})
+                elif len(parts) == 4 and parts[3] in ("items", "connectors"):
+                    self.send_page(board_id, parts[3], parse_qs(parsed.query))
+                else:
+                    self.send_json(404, {"message": "Not found"})
+
+            def send_page(self, board_id: str, kind: str, query: Dict[str, List[str]]):
+                items = fake.board(board_id)
+                if kind == "connectors":
+                    items = [d for d in items if d["type"] == "connector"]
+                else:
+                    wanted = query.get("type", [None])[0]
+                    items = [d for d in items if d["type"] != "connector" and (wanted is None or d["type"] == wanted)]
+                limit = min(50, int(query.get("limit", ["10"])[0]))
+                offset = int(query.get("cursor", ["0"])[0])
+                body: Dict[str, Any] = {"data": items[offset:offset + limit], "total": len(items), "limit": limit}
+                if offset + limit < len(items):
+                    params = {"limit": limit, "cursor": offset + limit}
+                    if "type" in query:
+                        params["type"] = query["type"][0]
+                    body["links"] = {"next": f"{fake.url}/v2/boards/{board_id}/{kind}?{urlencode(params)}"}
+                self.send_json(200, body)
+
+        return Handler
+
+def schema_instance(schema: Dict[str, Any], name: str = "value", counter: Optional[List[int]] = None) -> Any:
+    """The smallest value that satisfies a JSON schema (one element per array)."""
+    counter = counter if counter is not None else [0]
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return schema_instance(options[0], name, counter)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {key: schema_instance(sub, key, counter) for key, sub in properties.items()}
+    if kind == "array":
+        return [schema_instance(schema.get("items", {}), name, counter)]
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    counter[0] += 1
+    return f"{name}_{counter[0]}"
+
+class FakeOllama(_Server):
+    """
+    Each chat reply takes latency + prompt tokens / prompt_rate + output tokens /
+    token_rate seconds. At most parallel requests are processed at once (0 for no
+    limit), like OLLAMA_NUM_PARALLEL; the rest wait. malformed_rate of the
+    replies are cut off halfway, as when generation hits its token limit.
+    """
+    def __init__(self, latency: float = 0.0, prompt_rate: float = 0.0, token_rate: float = 0.0,
+                 malformed_rate: float = 0.0, parallel: int = 0, seed: int = 0, **kwargs):
+        self.latency = latency
+        self.prompt_rate = prompt_rate
+        self.token_rate = token_rate
+        self.malformed_rate = malformed_rate
+        self.slots = threading.BoundedSemaphore(parallel) if parallel > 0 else None
+        self.random = random.Random(seed)
+        super().__init__(self._handler(), **kwargs)
+
+    def reply(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        schema = payload.get("format")
+        content = json.dumps(schema_instance(schema) if isinstance(schema, dict) else {})
+        with self.lock:
+            malformed = self.malformed_rate and self.random.random() < self.malformed_rate
+        if malformed:
+            self.count("malformed")
+            content = content[: len(content) // 2]
+        prompt = sum(len(m.get("content", "")) for m in payload.get("messages", [])) // CHARS_PER_TOKEN
+        output = len(content) // CHARS_PER_TOKEN + 1
+        return content, {"prompt_eval_count": prompt, "eval_count": output}
+
+    def _timings(self, counts: Dict[str, int]) -> Tuple[float, float]:
+        prompt_seconds = counts["prompt_eval_count"] / self.prompt_rate if self.prompt_rate else 0.0
+        eval_seconds = counts["eval_count"] / self.token_rate if self.token_rate else 0.0
+        return self.latency + prompt_seconds, eval_seconds
+
+    def _handler(self):
+        fake = self
+
+        class Handler(_Handler):
+            def do_POST(self):
+                path = urlparse(self.path).path
+                payload = self.read_json()
+                if path == "/api/generate":
+                    fake.count("warmups")
+                    self.send_json(200, {"model": payload.get("model"), "response": "", "done": True})
+                    return
+                if path != "/api/chat":
+                    self.send_json(404, {"error": "not found"})
+                    return
+                fake.count("chats")
+                if fake.slots:
+                    fake.slots.acquire()
+                try:
+                    self.chat(payload)
+                finally:
+                    if fake.slots:
+                        fake.slots.release()
+
+            def chat(self, payload: Dict[str, Any]):
+                content, counts = fake.reply(payload)
+                first, generation = fake._timings(counts)
+                stats = {
+                    **counts, "load_duration": 0,
+                    "prompt_eval_duration": int(first * 1e9), "eval_duration": int(generation * 1e9),
+                    "total_duration": int((first + generation) * 1e9),
+                }
+                time.sleep(first)
+                if not payload.get("stream"):
+                    time.sleep(generation)
+                    self.send_json(200, {"model": payload.get("model"), "message": {"role": "assistant", "content": content},
+                                         "done": True, **stats})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+                try:
+                    for piece in pieces:
+                        time.sleep(generation / max(1, len(pieces)))
+                        self.write_chunk({"message": {"role": "assistant", "content": piece}, "done": False})
+                    self.write_chunk({"message": {"role": "assistant", "content": ""}, "done": True, **stats})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stops reading once its JSON is complete, which aborts generation
+                    fake.count("aborted")
+                    self.close_connection = True
+
+            def write_chunk(self, body: Dict[str, Any]):
+                data = json.dumps(body).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+        return Handler
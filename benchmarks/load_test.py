@@ -0,0 +1,200 @@
+"""
+End-to-end load test of the compiled graph against local Miro and Ollama stand-ins.
+
+Usage:
+    python benchmarks/load_test.py --runs 50 --concurrency 8 --board-items 500 \\
+        --llm-latency 0.2 --token-rate 60 --rate-limit-every 25 --malformed-rate 0.02
+
+Runs --runs boards (each a different synthetic board) through the app with
+--concurrency in flight, then reports run latency percentiles, throughput, a
+per-stage breakdown from the run traces and what the fake services saw.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from benchmarks.fake_services import FakeMiro, FakeOllama
+from src.config import Config
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+def configure(miro_url: str, ollama_url: str, workdir: str) -> Dict[str, Any]:
+    """
+    Point the pipeline at the fakes and keep every cache, checkpoint and trace in
+    workdir. Returns the previous settings for restore().
+    """
+    settings = {
+        "MIRO_BASE_URL": f"{miro_url}/v2",
+        "MIRO_ACCESS_TOKEN": "load-test",
+        "OLLAMA_BASE_URL": ollama_url,
+        "TRACE_ENABLED": True,
+        "TRACE_DIR": os.path.join(workdir, "traces"),
+        "CHECKPOINT_DB": os.path.join(workdir, "checkpoints.sqlite3"),
+        "SNAPSHOT_DIR": os.path.join(workdir, "snapshots"),
+        "LLM_CACHE_DIR": os.path.join(workdir, "llm"),
+        "ROUTER_LOG": os.path.join(workdir, "routing.jsonl"),
+        "METRICS_FILE": None,
+    }
+    previous = {name: getattr(Config, name, None) for name in settings}
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    return previous
+
+def restore(previous: Dict[str, Any]):
+    for name, value in previous.items():
+        setattr(Config, name, value)
+
+def stage_seconds(trace_dir: str, run_ids: List[str]) -> Dict[str, List[float]]:
+    """Wall time of every node of the given runs, from their JSON-lines traces."""
+    stages: Dict[str, List[float]] = {}
+    for run_id in run_ids:
+        path = os.path.join(trace_dir, f"{run_id}.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r") as f:
+            for line in f:
+                event = json.loads(line)
+                if event.get("kind") == "node":
+                    stages.setdefault(event["node"], []).append(event["seconds"])
+    return stages
+
+def run_load(app, urls: List[str], concurrency: int, quiet: bool = True) -> Dict[str, Any]:
+    """Invoke app once per URL with `concurrency` runs in flight and report on them."""
+    def run_one(url: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = app.invoke({"board_url": url})
+        except Exception as e:
+            result = {"error": str(e)}
+        status = "ok" if result.get("agent_dsl") and not result.get("error") else "failed"
+        return {"url": url, "status": status, "seconds": time.perf_counter() - started,
+                "run_id": result.get("run_id"), "error": result.get("error")}
+
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    started = time.perf_counter()
+    with output, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        runs = list(executor.map(run_one, urls))
+    wall = time.perf_counter() - started
+
+    ok = [run for run in runs if run["status"] == "ok"]
+    stages = stage_seconds(Config.TRACE_DIR, [run["run_id"] for run in runs if run["run_id"]])
+    errors: Dict[str, int] = {}
+    for run in runs:
+        if run["error"]:
+            key = str(run["error"]).splitlines()[0][:120]
+            errors[key] = errors.get(key, 0) + 1
+    return {
+        "runs": len(runs),
+        "succeeded": len(ok),
+        "failed": len(runs) - len(ok),
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput_per_second": len(ok) / wall if wall else None,
+        "latency": summarize([run["seconds"] for run in ok]),
+        "stages": {name: summarize(values) for name, values in stages.items()},
+        "errors": errors,
+    }
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.0f}ms"
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency"]
+    print(f"Runs: {report['succeeded']}/{report['runs']} succeeded, {report['concurrency']} concurrent, "
+          f"{report['wall_seconds']:.2f}s wall, {report['throughput_per_second'] or 0:.2f} runs/s")
+    print(f"Latency: p50 {_format_seconds(latency['p50'])}  p95 {_format_seconds(latency['p95'])}  "
+          f"p99 {_format_seconds(latency['p99'])}  max {_format_seconds(latency['max'])}")
+    if report["stages"]:
+        width = max(len(name) for name in report["stages"])
+        print("\nPer stage:")
+        total = sum(stage["mean"] * stage["count"] for stage in report["stages"].values()) or 1.0
+        for name, stage in report["stages"].items():
+            share = stage["mean"] * stage["count"] / total * 100
+            print(f"  {name:<{width}}  p50 {_format_seconds(stage['p50']):>8}  p95 {_format_seconds(stage['p95']):>8}  "
+                  f"p99 {_format_seconds(stage['p99']):>8}  {share:5.1f}% of stage time")
+    for service in ("miro", "ollama"):
+        if report.get(service):
+            print(f"{service.title()} stand-in: {report[service]}")
+    if report["errors"]:
+        print("\nErrors:")
+        for error, count in report["errors"].items():
+            print(f"  {count} x {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the pipeline against local Miro and Ollama stand-ins")
+    parser.add_argument("--runs", type=int, default=20, help="Boards to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Runs in flight")
+    parser.add_argument("--board-items", type=int, default=500, help="Items per synthetic board")
+    parser.add_argument("--miro-latency", type=float, default=0.02, help="Seconds per Miro request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth Miro request with 429 (0: never)")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--miro-error-rate", type=float, default=0.0, help="Fraction of Miro requests failing with 503")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fixed seconds per LLM call")
+    parser.add_argument("--prompt-rate", type=float, default=2000.0, help="Prompt tokens processed per second (0: instant)")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Output tokens generated per second (0: instant)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of LLM replies truncated")
+    parser.add_argument("--ollama-parallel", type=int, default=0, help="Requests the fake Ollama serves at once (0: no limit)")
+    parser.add_argument("--miro-concurrency", type=int, help="Max in-flight Miro API requests (default: MIRO_MAX_CONCURRENCY)")
+    parser.add_argument("--ollama-concurrency", type=int, help="Max in-flight Ollama requests (default: OLLAMA_MAX_CONCURRENCY)")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache on (off by default)")
+    parser.add_argument("--stream", action="store_true", help="Stream LLM responses")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    miro = FakeMiro(board_items=args.board_items, latency=args.miro_latency, rate_limit_every=args.rate_limit_every,
+                    retry_after=args.retry_after, error_rate=args.miro_error_rate)
+    ollama = FakeOllama(latency=args.llm_latency, prompt_rate=args.prompt_rate, token_rate=args.token_rate,
+                        malformed_rate=args.malformed_rate, parallel=args.ollama_parallel)
+    with miro, ollama, tempfile.TemporaryDirectory(prefix="miro-load-") as workdir:
+        configure(miro.url, ollama.url, workdir)
+        Config.LLM_CACHE_ENABLED = args.llm_cache
+        Config.LLM_STREAM = args.stream
+
+        from src import agent, limits
+        if not args.llm_cache:
+            agent.llm_cache = None
+        if args.miro_concurrency is not None:
+            limits.configure_limit("miro", args.miro_concurrency)
+        if args.ollama_concurrency is not None:
+            limits.configure_limit("ollama", args.ollama_concurrency)
+
+        urls = [f"https://miro.com/app/board/load-{index}=/" for index in range(args.runs)]
+        report = run_load(agent.get_app(), urls, args.concurrency, quiet=not args.verbose)
+        report["miro"] = dict(miro.stats)
+        report["ollama"] = dict(ollama.stats)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
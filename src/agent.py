@@ -1,142 +1,523 @@
 import json
+import threading
+import time
 import requests
-from typing import TypedDict, Dict, Any, List
-from langgraph.graph import StateGraph, END
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from pydantic import BaseModel
+from typing import TypedDict, Dict, Any, List, Optional, Type
 
 import sys
 import os
 
-# Ensure local imports work when running via langgraph CLI
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.append(current_dir)
+# Ensure local imports work when loaded as a standalone file (e.g. by the langgraph CLI).
+# Inside the src package the fallback imports below are used instead, so sibling
+# modules are never loaded twice under different names.
+if not __package__:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
 
 try:
+    from artifacts import offload, resolve
+    from assembler import assemble_agent_spec, normalize_name, ReconciliationError
+    from checkpoints import NODE_ORDER, checkpointed_node, get_checkpoint_store
     from config import Config
-    from prompts import ARCHITECT_PROMPT, WORKFLOW_PLANNER_PROMPT, DSL_GENERATOR_PROMPT
+    from graph_encoding import encode_graph, estimate_tokens, graph_token_estimate
+    from instrumentation import OLLAMA_STAT_FIELDS, metrics, propagate, record_llm_call, traced_node
+    from incremental import affected_workflows, diff_graphs, frame_subgraph, patch_components, patch_spec, patch_workflows, should_patch
+    from limits import limit
+    from llm_cache import LLMCache
+    from partition import partition_graph, merge_components
+    from streaming import IncrementalJSONParser, consume_ollama_stream
+    from prompt_layout import build_messages, context_options
+    from router import get_router, graph_complexity
+    from models import AgentSpec, ArchitectOutput, WorkflowPlan
+    from prompts import ARCHITECT_PROMPT, ARCHITECT_PARTITION_PROMPT, WORKFLOW_PLANNER_PROMPT, WORKFLOW_PLANNER_INCREMENTAL_PROMPT, DSL_GENERATOR_PROMPT, REPAIR_PROMPT
+    from structured import FIX_SCHEMA, apply_fixes, format_errors, output_schema, validate_output
     from tools import fetch_board_info, parse_board_items, extract_json
 except ImportError:
-    # Fallback if the above fails (unlikely with sys.path hack, but good for safety)
+    # Imported as part of the src package
+    from src.artifacts import offload, resolve
+    from src.assembler import assemble_agent_spec, normalize_name, ReconciliationError
+    from src.checkpoints import NODE_ORDER, checkpointed_node, get_checkpoint_store
     from src.config import Config
-    from src.prompts import ARCHITECT_PROMPT, WORKFLOW_PLANNER_PROMPT, DSL_GENERATOR_PROMPT
+    from src.graph_encoding import encode_graph, estimate_tokens, graph_token_estimate
+    from src.instrumentation import OLLAMA_STAT_FIELDS, metrics, propagate, record_llm_call, traced_node
+    from src.incremental import affected_workflows, diff_graphs, frame_subgraph, patch_components, patch_spec, patch_workflows, should_patch
+    from src.limits import limit
+    from src.llm_cache import LLMCache
+    from src.partition import partition_graph, merge_components
+    from src.streaming import IncrementalJSONParser, consume_ollama_stream
+    from src.prompt_layout import build_messages, context_options
+    from src.router import get_router, graph_complexity
+    from src.models import AgentSpec, ArchitectOutput, WorkflowPlan
+    from src.prompts import ARCHITECT_PROMPT, ARCHITECT_PARTITION_PROMPT, WORKFLOW_PLANNER_PROMPT, WORKFLOW_PLANNER_INCREMENTAL_PROMPT, DSL_GENERATOR_PROMPT, REPAIR_PROMPT
+    from src.structured import FIX_SCHEMA, apply_fixes, format_errors, output_schema, validate_output
     from src.tools import fetch_board_info, parse_board_items, extract_json
 
 # --- State Definition ---
+# raw_items, structural_graph, board_context, identified_components and workflow_plan
+# may hold artifact handles (see artifacts.py); read them through resolve()
 class AgentState(TypedDict):
+    run_id: str
+    resume_from: str # node to start at when resuming a checkpointed run
     board_url: str
     board_id: str
     raw_items: list
+    board_diff: Dict[str, List[str]] # added/changed/removed item ids since the last snapshot
     structural_graph: Dict[str, Any]
+    board_context: str # structural_graph encoded once; the byte-identical prefix of every stage's prompt
     
     # Intermediate Artifacts
     identified_components: Dict[str, Any] # sub_agents, tools
+    cross_frame_edges: List[List[str]] # [from, to, label] connectors between partitions
+    incremental: Dict[str, Any] # base_run_id, touched_frames, changed_components, base_workflow_plan, base_agent_dsl when patching a previous run
     workflow_plan: Dict[str, Any] # workflows
     
     agent_dsl: Dict[str, Any]
     error: str
 
 # --- Helper for LLM Calls ---
-def call_llm(prompt: str, data: str) -> Dict[str, Any]:
+llm_cache = LLMCache() if Config.LLM_CACHE_ENABLED else None
+
+# Keep-alive connections to Ollama, shared by every call in the process
+ollama_session = requests.Session()
+_ollama_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, Config.OLLAMA_MAX_CONCURRENCY))
+ollama_session.mount("http://", _ollama_adapter)
+ollama_session.mount("https://", _ollama_adapter)
+
+_last_num_ctx = None
+
+def warm_model() -> None:
+    """
+    Load the model (or extend how long it stays loaded) without generating
+    anything, so the next real call doesn't pay the load time.
+    """
+    payload = {"model": Config.OLLAMA_MODEL, "keep_alive": Config.OLLAMA_KEEP_ALIVE}
+    if _last_num_ctx:
+        # Loading with a different num_ctx than the next call would force a reload
+        payload["options"] = {"num_ctx": _last_num_ctx}
+    response = ollama_session.post(f"{Config.OLLAMA_BASE_URL}/api/generate", json=payload)
+    response.raise_for_status()
+
+def call_llm(prompt: str, data: str, board_context: Optional[str] = None,
+             schema: Optional[Type[BaseModel]] = None, stage: Optional[str] = None,
+             complexity: int = 0) -> Dict[str, Any]:
+    """
+    Run one stage prompt. board_context (the encoded graph) goes ahead of the
+    stage instructions so consecutive stages share a cacheable prompt prefix.
+    With a schema, generation is constrained to it and the response is
+    validated, with targeted repairs for anything that still fails.
+
+    The router may try a smaller model first (by stage, prompt size and graph
+    complexity); if its output fails, the call escalates to the next model.
+    """
+    global _last_num_ctx
+    messages = build_messages(prompt, data, board_context)
+    prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+    router = get_router()
+    models = router.candidates(stage, prompt_tokens, complexity)
+
+    cache_key = None
+    if llm_cache is not None:
+        # Keyed by the whole candidate chain; the entry records which model answered
+        output_format = schema.__name__ if schema is not None else "json"
+        cache_key = LLMCache.make_key("|".join(models), prompt, data, {"format": output_format, "board_context": board_context})
+        cached = llm_cache.get(cache_key)
+        if cached is not None and set(cached) == {"model", "output"}:
+            print("LLM cache hit")
+            record_llm_call(cached["model"], 0.0, cache_hit=True)
+            return cached["output"]
+
+    options = context_options(messages, board_context)
+    _last_num_ctx = options["num_ctx"]
+    output_format = output_schema(schema) if schema is not None else "json"
+    for index, model in enumerate(models):
+        last = index == len(models) - 1
+        started = time.perf_counter()
+        try:
+            parsed = _chat(model, messages, output_format, options, Config.LLM_STREAM)
+            if schema is not None:
+                # Smaller models escalate instead of spending turns on repairs
+                attempts = Config.LLM_REPAIR_ATTEMPTS if last else 0
+                parsed = _validate_with_repair(model, schema, messages, parsed, options, attempts)
+        except Exception as e:
+            seconds = time.perf_counter() - started
+            router.record(stage, model, "failed" if last else "escalated", seconds, prompt_tokens, complexity, str(e)[:500])
+            if last:
+                raise Exception(f"LLM Call Failed: {str(e)}")
+            print(f"  {model} failed ({str(e).splitlines()[0][:120]}), escalating to {models[index + 1]}")
+            continue
+        router.record(stage, model, "ok", time.perf_counter() - started, prompt_tokens, complexity)
+        break
+
+    if cache_key is not None:
+        llm_cache.set(cache_key, {"model": model, "output": parsed})
+    return parsed
+
+def _chat(model: str, messages: List[Dict[str, str]], output_format: Any, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
     payload = {
-        "model": Config.OLLAMA_MODEL,
-        "messages": [
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": f"Context Data:\n{data}"}
-        ],
-        "format": "json",
-        "stream": False
+        "model": model,
+        "messages": messages,
+        "format": output_format,
+        "stream": stream,
+        "options": options,
+        "keep_alive": Config.OLLAMA_KEEP_ALIVE
     }
-    try:
-        response = requests.post(f"{Config.OLLAMA_BASE_URL}/api/chat", json=payload)
+    # Serialize once; the size is recorded and the bytes are posted as-is
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    started = time.perf_counter()
+    if stream:
+        with limit("ollama"):
+            parsed, stats, received = _stream_llm(body, headers)
+    else:
+        with limit("ollama"):
+            response = ollama_session.post(f"{Config.OLLAMA_BASE_URL}/api/chat", data=body, headers=headers)
         response.raise_for_status()
         result = response.json()
+        stats = {k: result[k] for k in OLLAMA_STAT_FIELDS if k in result}
+        received = len(response.content)
         content = result.get("message", {}).get("content", "{}")
-        return extract_json(content)
-    except Exception as e:
-        raise Exception(f"LLM Call Failed: {str(e)}")
+        parsed = extract_json(content)
+    record_llm_call(model, time.perf_counter() - started, len(body), received, stats)
+    return parsed
+
+def _validate_with_repair(model: str, schema: Type[BaseModel], messages: List[Dict[str, str]], parsed: Any,
+                          options: Dict[str, Any], attempts: int) -> Dict[str, Any]:
+    """
+    Validate against the stage model. On failure, ask for fixes to just the
+    failing fields in a follow-up turn (the conversation so far is an unchanged
+    prefix) and apply them, instead of regenerating the whole output.
+    """
+    for attempt in range(attempts + 1):
+        validated, errors = validate_output(schema, parsed)
+        if validated is not None:
+            return validated
+        if attempt == attempts:
+            break
+        print(f"  Output failed {schema.__name__} validation ({len(errors)} errors), requesting repair")
+        metrics.inc("miro_agent_llm_repairs_total", model=model, schema=schema.__name__)
+        repair_messages = messages + [
+            {"role": "assistant", "content": json.dumps(parsed, separators=(",", ":"))},
+            {"role": "user", "content": REPAIR_PROMPT.strip() + "\n" + format_errors(errors)},
+        ]
+        fixes = _chat(model, repair_messages, FIX_SCHEMA, options, False)
+        parsed = apply_fixes(parsed, fixes.get("fixes", []) if isinstance(fixes, dict) else [])
+    raise ValueError(f"Output does not match {schema.__name__}:\n{format_errors(errors)}")
+
+def _print_progress(key: str, element: Any):
+    name = element.get("name", "?") if isinstance(element, dict) else element
+    print(f"  + {key}: {name}")
+
+def _stream_llm(body: bytes, headers: Dict[str, str]):
+    parser = IncrementalJSONParser(on_element=_print_progress)
+    with ollama_session.post(f"{Config.OLLAMA_BASE_URL}/api/chat", data=body, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        # Leaving the block closes the connection, which stops generation on an abort
+        parsed, stream_stats = consume_ollama_stream(
+            response.iter_lines(),
+            parser,
+            max_tokens=Config.LLM_STREAM_MAX_TOKENS,
+            max_seconds=Config.LLM_STREAM_MAX_SECONDS,
+        )
+    ttft = stream_stats["time_to_first_token"]
+    ttft_str = f"{ttft:.2f}s" if ttft is not None else "n/a"
+    print(f"  streamed {stream_stats['tokens']} tokens in {stream_stats['total_seconds']:.2f}s (first token after {ttft_str})")
+    return parsed, stream_stats["stats"], stream_stats["bytes_received"]
 
 # --- Nodes ---
 
+def _stash(update: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    # Large values are stored once as artifacts; the state and its checkpoints carry handles
+    for key in keys:
+        if key in update:
+            update[key] = offload(update[key], key)
+    return update
+
 def fetch_data_node(state: AgentState):
     print(f"Fetching data for board: {state['board_url']}")
     result = fetch_board_info(state['board_url'])
     if "error" in result:
         return {"error": result["error"]}
-    return result
+    return _stash(result, "raw_items")
 
 def parse_structure_node(state: AgentState):
     print("Parsing board structure...")
     if state.get("error"):
         return {}
     
-    result = parse_board_items(state['raw_items'])
+    result = parse_board_items(resolve(state['raw_items']))
     if "error" in result:
         return {"error": result["error"]}
-    return result
+    result["board_context"] = encode_graph(result["structural_graph"])
+    return _stash(result, "structural_graph", "board_context")
+
+def _board_context(state: AgentState) -> str:
+    # Runs resumed from checkpoints written before board_context existed re-encode the graph
+    return resolve(state.get("board_context")) or encode_graph(resolve(state["structural_graph"]))
+
+def _should_partition(graph: Dict[str, Any]) -> bool:
+    return (
+        len(graph.get("frames", [])) >= Config.PARTITION_MIN_FRAMES
+        or graph_token_estimate(graph) > Config.PROMPT_TOKEN_BUDGET
+    )
+
+def _architect_partitioned(graph: Dict[str, Any]) -> Dict[str, Any]:
+    split = partition_graph(graph, Config.PARTITION_TARGET_TOKENS)
+    partitions = split["partitions"]
+    print(f"  Analyzing {len(partitions)} partitions ({Config.OLLAMA_MAX_PARALLEL} in parallel)")
+
+    def analyze(partition: Dict[str, Any]) -> Dict[str, Any]:
+        return call_llm(ARCHITECT_PARTITION_PROMPT, "", board_context=encode_graph(partition["graph"]), schema=ArchitectOutput,
+                        stage="architect", complexity=graph_complexity(partition["graph"]))
+
+    with ThreadPoolExecutor(max_workers=Config.OLLAMA_MAX_PARALLEL) as executor:
+        results = list(executor.map(propagate(analyze), partitions))
+
+    components = merge_components(results, [p["frames"] for p in partitions])
+    return {"identified_components": components, "cross_frame_edges": split["cross_frame_edges"]}
+
+def _previous_run(state: AgentState) -> Optional[Dict[str, Any]]:
+    """Final state of the board's latest other completed run, the base for patching."""
+    if not (Config.INCREMENTAL_ENABLED and Config.CHECKPOINT_ENABLED and state.get("board_id")):
+        return None
+    store = get_checkpoint_store()
+    for run in store.list_runs(board_id=state["board_id"], status="completed", limit=5):
+        if run["run_id"] != state.get("run_id"):
+            previous = store.state_after(run["run_id"], NODE_ORDER[-1])
+            if previous and previous.get("structural_graph") and previous.get("agent_dsl"):
+                return {**previous, "run_id": run["run_id"]}
+    return None
+
+def _architect_incremental(state: AgentState) -> Optional[Dict[str, Any]]:
+    """
+    Re-analyze only the frames that changed since the previous run and patch
+    its components. Returns None when a full analysis is needed instead.
+    """
+    graph = resolve(state['structural_graph'])
+    try:
+        previous = _previous_run(state)
+        if previous is None or not previous.get("identified_components"):
+            return None
+        previous_graph = resolve(previous["structural_graph"])
+        previous_components = resolve(previous["identified_components"])
+        diff = diff_graphs(previous_graph, graph)
+    except Exception as e:
+        # A base run that cannot be loaded (missing artifact, bad checkpoint) is no reason to fail this one
+        print(f"  Could not load the previous run ({e}), analyzing the whole board")
+        return None
+    if not should_patch(diff, Config.INCREMENTAL_MAX_CHANGED_FRACTION):
+        return None
+
+    touched = diff["added"] + diff["changed"] + diff["removed"]
+    # The later stages patch the base run's plan and spec; carrying them here loads that run once
+    info = {"base_run_id": previous["run_id"], "touched_frames": touched, "changed_components": [],
+            "base_workflow_plan": previous.get("workflow_plan"), "base_agent_dsl": offload(previous["agent_dsl"], "agent_dsl")}
+    update: Dict[str, Any] = {"incremental": info, "identified_components": previous["identified_components"]}
+    if previous.get("cross_frame_edges"):
+        update["cross_frame_edges"] = partition_graph(graph, Config.PARTITION_TARGET_TOKENS)["cross_frame_edges"]
+    if not touched:
+        print(f"  No frames changed since run {previous['run_id']}, reusing its components")
+        return update
+
+    analyzable = diff["added"] + diff["changed"]
+    print(f"  Re-analyzing {len(analyzable)} of {diff['total']} frames changed since run {previous['run_id']}")
+
+    def analyze(frame: str) -> Dict[str, Any]:
+        subgraph = frame_subgraph(graph, [frame])
+        return call_llm(ARCHITECT_PARTITION_PROMPT, "", board_context=encode_graph(subgraph), schema=ArchitectOutput,
+                        stage="architect", complexity=graph_complexity(subgraph))
+
+    # One call per frame keeps provenance exact for the next patch
+    with ThreadPoolExecutor(max_workers=Config.OLLAMA_MAX_PARALLEL) as executor:
+        results = list(executor.map(propagate(analyze), analyzable))
+    fresh = merge_components(results, [[frame] for frame in analyzable])
+    patch = patch_components(previous_components, fresh, touched, previous_graph)
+    info["changed_components"] = patch["changed"]
+    update["identified_components"] = patch["components"]
+    return update
 
 def architect_agent_node(state: AgentState):
     print("Architect Agent: Identifying components...")
     if state.get("error"):
         return {}
     
-    graph_data = json.dumps(state['structural_graph'], indent=2)
+    graph = resolve(state['structural_graph'])
     try:
-        components = call_llm(ARCHITECT_PROMPT, graph_data)
-        return {"identified_components": components}
+        update = _architect_incremental(state)
+        if update is None and _should_partition(graph):
+            update = _architect_partitioned(graph)
+        if update is None:
+            components = call_llm(ARCHITECT_PROMPT, "", board_context=_board_context(state), schema=ArchitectOutput,
+                                  stage="architect", complexity=graph_complexity(graph))
+            update = {"identified_components": components}
+        return _stash(update, "identified_components")
     except Exception as e:
         return {"error": str(e)}
 
+def _planner_context(state: AgentState) -> str:
+    # The graph goes in the shared board context; only the components are stage data
+    components = {k: v for k, v in resolve(state['identified_components']).items() if k != "provenance"}
+    context_str = f"Identified Components:\n{json.dumps(components, separators=(',', ':'))}"
+    if state.get("cross_frame_edges"):
+        context_str += f"\n\nCross-Frame Connections:\n{json.dumps(state['cross_frame_edges'], separators=(',', ':'))}"
+    return context_str
+
+def _plan_incremental(state: AgentState) -> Optional[Dict[str, Any]]:
+    """
+    Regenerate only the workflows that use a changed component and patch them
+    into the previous plan. Returns None when the whole plan must be redone.
+    """
+    info = state.get("incremental")
+    if not info or not info.get("base_workflow_plan"):
+        return None
+    plan = resolve(info["base_workflow_plan"])
+    changed = info.get("changed_components") or []
+    if not changed:
+        return plan
+
+    affected = affected_workflows(plan, changed)
+    display = {normalize_name(c.get("name", "")): c.get("name") for kind in ("sub_agents", "tools")
+               for c in resolve(state['identified_components']).get(kind, [])}
+    print(f"  Regenerating {len(affected)} of {len(plan.get('workflows', []))} workflows")
+    context_str = (
+        f"{_planner_context(state)}\n\n"
+        f"Existing Workflows:\n{json.dumps([w.get('name') for w in plan.get('workflows', [])])}\n\n"
+        f"Workflows To Regenerate:\n{json.dumps(affected)}\n\n"
+        f"Changed Components:\n{json.dumps([display.get(key, key) for key in changed])}"
+    )
+    regenerated = call_llm(WORKFLOW_PLANNER_INCREMENTAL_PROMPT, context_str, board_context=_board_context(state), schema=WorkflowPlan,
+                           stage="planner", complexity=graph_complexity(resolve(state['structural_graph'])))
+    return patch_workflows(plan, regenerated, affected)
+
 def workflow_planner_node(state: AgentState):
     print("Workflow Planner: Designing workflows...")
     if state.get("error"):
         return {}
     
-    # Combine graph and components for context
-    context = {
-        "structural_graph": state['structural_graph'],
-        "identified_components": state['identified_components']
-    }
-    context_str = json.dumps(context, indent=2)
-    
     try:
-        plan = call_llm(WORKFLOW_PLANNER_PROMPT, context_str)
-        return {"workflow_plan": plan}
+        plan = _plan_incremental(state)
+        if plan is None:
+            plan = call_llm(WORKFLOW_PLANNER_PROMPT, _planner_context(state), board_context=_board_context(state), schema=WorkflowPlan,
+                            stage="planner", complexity=graph_complexity(resolve(state['structural_graph'])))
+        return _stash({"workflow_plan": plan}, "workflow_plan")
     except Exception as e:
         return {"error": str(e)}
 
+def _patch_previous_spec(state: AgentState, dsl: Dict[str, Any]) -> Dict[str, Any]:
+    # Keep unchanged parts of the previous run's spec exactly as they were
+    info = state.get("incremental")
+    if not info or not info.get("base_agent_dsl"):
+        return dsl
+    return patch_spec(resolve(info["base_agent_dsl"]), dsl)
+
 def dsl_generator_node(state: AgentState):
     print("DSL Generator: Synthesizing final plan...")
     if state.get("error"):
         return {}
+
+    # Merge deterministically; the LLM is only needed when reconciliation fails
+    components, plan = resolve(state['identified_components']), resolve(state['workflow_plan'])
+    try:
+        spec = assemble_agent_spec(components, plan)
+        return {"agent_dsl": _patch_previous_spec(state, spec.dict())}
+    except ReconciliationError as e:
+        print(f"Deterministic assembly failed ({e}), falling back to LLM")
     
     context = {
-        "components": state['identified_components'],
-        "workflows": state['workflow_plan']
+        "components": components,
+        "workflows": plan
     }
-    context_str = json.dumps(context, indent=2)
+    context_str = json.dumps(context, separators=(",", ":"))
     
     try:
-        dsl = call_llm(DSL_GENERATOR_PROMPT, context_str)
-        return {"agent_dsl": dsl}
+        dsl = call_llm(DSL_GENERATOR_PROMPT, context_str, board_context=_board_context(state), schema=AgentSpec,
+                       stage="generator")
+        return {"agent_dsl": _patch_previous_spec(state, dsl)}
     except Exception as e:
         return {"error": str(e)}
 
 # --- Graph Construction ---
 
-workflow = StateGraph(AgentState)
+NODES = {
+    "fetch_data": fetch_data_node,
+    "parse_structure": parse_structure_node,
+    "architect_agent": architect_agent_node,
+    "workflow_planner": workflow_planner_node,
+    "dsl_generator": dsl_generator_node,
+}
+# Checkpointing wraps tracing so it sees the run_id assigned by the first node
+WRAPPED_NODES = {name: checkpointed_node(name, traced_node(name, fn)) for name, fn in NODES.items()}
+
+def route_entry(state: AgentState) -> str:
+    # Resumed runs start at the node that failed; fresh runs fetch the board
+    return state.get("resume_from") or NODE_ORDER[0]
+
+def build_graph():
+    """
+    Build and compile the pipeline graph. Prefer get_app(), which compiles it
+    once per process.
+    """
+    from langgraph.graph import StateGraph, END
+
+    workflow = StateGraph(AgentState)
+
+    for name in NODE_ORDER:
+        workflow.add_node(name, WRAPPED_NODES[name])
+
+    workflow.set_conditional_entry_point(route_entry, {name: name for name in NODE_ORDER})
+
+    for current, following in zip(NODE_ORDER, NODE_ORDER[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(NODE_ORDER[-1], END)
+
+    return workflow.compile()
+
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = build_graph()
+        return _app
 
-workflow.add_node("fetch_data", fetch_data_node)
-workflow.add_node("parse_structure", parse_structure_node)
-workflow.add_node("architect_agent", architect_agent_node)
-workflow.add_node("workflow_planner", workflow_planner_node)
-workflow.add_node("dsl_generator", dsl_generator_node)
+def __getattr__(name: str):
+    # `app` stays importable (langgraph.json points at it) but is compiled on first access
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-workflow.set_entry_point("fetch_data")
+# --- Resuming Checkpointed Runs ---
 
-workflow.add_edge("fetch_data", "parse_structure")
-workflow.add_edge("parse_structure", "architect_agent")
-workflow.add_edge("architect_agent", "workflow_planner")
-workflow.add_edge("workflow_planner", "dsl_generator")
-workflow.add_edge("dsl_generator", END)
+def resume_run(run_id: str) -> Dict[str, Any]:
+    """
+    Continue a checkpointed run from its first unfinished node, with the state
+    saved by the previous node restored.
+    """
+    store = get_checkpoint_store()
+    if store.get_run(run_id) is None:
+        raise ValueError(f"Unknown run: {run_id}")
+    point = store.resume_point(run_id)
+    if point is None:
+        raise ValueError(f"Run {run_id} has already completed; use a stage re-run instead")
+    node, state = point
+    print(f"Resuming run {run_id} at {node}")
+    return get_app().invoke({**state, "run_id": run_id, "resume_from": node})
 
-app = workflow.compile()
+def rerun_stage(run_id: str, stage: str) -> Dict[str, Any]:
+    """
+    Re-run a single stage of a checkpointed run from the state it started with.
+    Later checkpoints are discarded, so a following resume continues from here.
+    """
+    if stage not in WRAPPED_NODES:
+        raise ValueError(f"Unknown stage '{stage}'. Choose from: {', '.join(NODE_ORDER)}")
+    state = get_checkpoint_store().state_before(run_id, stage)
+    if state is None:
+        raise ValueError(f"Run {run_id} has no checkpoint before {stage}")
+    state["run_id"] = run_id
+    update = WRAPPED_NODES[stage](state)
+    return {**state, **update}
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+try:
+    # Optional faster encoder; falls back to the standard library
+    from orjson import dumps as _orjson_dumps
+except ImportError:
+    _orjson_dumps = None
+
+try:
+    from config import Config
+    from models import BoardItem
+except ImportError:
+    from .config import Config
+    from .models import BoardItem
+
+HANDLE_KEY = "$artifact"
+
+# Rebuild typed values from their JSON form, by artifact kind
+DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "raw_items": lambda items: [BoardItem(**item) if isinstance(item, dict) else item for item in items],
+}
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_none=True)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def encode_value(value: Any) -> bytes:
+    if _orjson_dumps is not None:
+        return _orjson_dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, dict) and HANDLE_KEY in value
+
+class ArtifactStore:
+    """
+    Content-addressed store for large pipeline artifacts (raw items, the structural
+    graph, LLM outputs), so run state and checkpoints carry small handles instead.
+
+    An artifact is its compact JSON, zlib-compressed and named by the SHA-256 of the
+    JSON, so identical values are written once. Decoded values are kept in a bounded
+    in-memory LRU; callers must treat resolved values as read-only.
+    """
+    def __init__(self, root: Optional[str] = None, max_memory_entries: Optional[int] = None,
+                 min_bytes: Optional[int] = None):
+        self.root = root or artifact_dir()
+        self.max_memory_entries = max_memory_entries if max_memory_entries is not None else Config.ARTIFACT_CACHE_ENTRIES
+        self.min_bytes = min_bytes if min_bytes is not None else Config.ARTIFACT_MIN_BYTES
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"writes": 0, "dedup": 0, "memory_hits": 0, "disk_reads": 0}
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def _remember(self, digest: str, value: Any):
+        with self._lock:
+            self._memory[digest] = value
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def put(self, value: Any, kind: str) -> Any:
+        """
+        Store value and return its handle. Values whose encoding is smaller than
+        min_bytes are returned unchanged; they are cheaper to keep inline.
+        """
+        data = encode_value(value)
+        if len(data) < self.min_bytes:
+            return value
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            self.stats["dedup"] += 1
+        else:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # Concurrent writers of the same artifact each rename a complete file into place
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 1))
+            os.replace(tmp_path, path)
+            self.stats["writes"] += 1
+        self._remember(digest, value)
+        return {HANDLE_KEY: digest, "kind": kind, "bytes": len(data)}
+
+    def get(self, handle: Dict[str, Any]) -> Any:
+        digest = handle[HANDLE_KEY]
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                self.stats["memory_hits"] += 1
+                return self._memory[digest]
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise ValueError(f"Artifact {digest} ({handle.get('kind')}) is missing from {self.root}") from None
+        value = json.loads(data)
+        decode = DECODERS.get(handle.get("kind"))
+        if decode is not None:
+            value = decode(value)
+        self.stats["disk_reads"] += 1
+        self._remember(digest, value)
+        return value
+
+def artifact_dir() -> str:
+    # Artifacts live next to the checkpoints that reference them unless configured
+    return Config.ARTIFACT_DIR or os.path.join(os.path.dirname(os.path.abspath(Config.CHECKPOINT_DB)), "artifacts")
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None or _store.root != artifact_dir():
+            _store = ArtifactStore()
+        return _store
+
+def offload(value: Any, kind: str) -> Any:
+    """A handle for value when artifacts are enabled, otherwise value itself."""
+    if value is None or is_handle(value) or not (Config.ARTIFACTS_ENABLED and Config.CHECKPOINT_ENABLED):
+        return value
+    return get_artifact_store().put(value, kind)
+
+def resolve(value: Any) -> Any:
+    """The value behind a handle; anything else (inline state, old checkpoints) is returned as is."""
+    return get_artifact_store().get(value) if is_handle(value) else value
@@ -0,0 +1,137 @@
+import difflib
+import re
+from typing import Dict, Any, List, Optional
+
+from pydantic import ValidationError
+
+try:
+    from models import AgentSpec, AgentStep, AgentTool, AgentWorkflow, SubAgent
+except ImportError:
+    from .models import AgentSpec, AgentStep, AgentTool, AgentWorkflow, SubAgent
+
+SYSTEM_ASSIGNEE = "System"
+
+class ReconciliationError(Exception):
+    """Raised when stage outputs cannot be merged into a valid AgentSpec."""
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+class NameResolver:
+    """
+    Maps loosely written names ("Web Search", "web_search", "WebSerch") onto
+    canonical names by normalized exact match, then close fuzzy match.
+    """
+    def __init__(self, names: List[str], cutoff: float = 0.85):
+        self.cutoff = cutoff
+        self.by_key: Dict[str, str] = {}
+        for name in names:
+            self.by_key.setdefault(normalize_name(name), name)
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        key = normalize_name(name)
+        if key in self.by_key:
+            return self.by_key[key]
+        matches = difflib.get_close_matches(key, list(self.by_key), n=1, cutoff=self.cutoff)
+        return self.by_key[matches[0]] if matches else None
+
+def _unique(models: List[Any]) -> List[Any]:
+    seen = set()
+    result = []
+    for model in models:
+        key = normalize_name(model.name)
+        if key not in seen:
+            seen.add(key)
+            result.append(model)
+    return result
+
+def assemble_agent_spec(components: Dict[str, Any], workflow_plan: Dict[str, Any]) -> AgentSpec:
+    """
+    Deterministically merge the architect and planner outputs into an AgentSpec.
+
+    Names are normalized across stages and step references are resolved to the
+    identified sub-agents and tools. Raises ReconciliationError when a reference
+    cannot be resolved or the result does not validate.
+    """
+    try:
+        sub_agents = _unique([SubAgent(**a) for a in components.get("sub_agents", [])])
+        tools = _unique([AgentTool(**t) for t in components.get("tools", [])])
+    except (TypeError, ValidationError) as e:
+        raise ReconciliationError(f"Invalid components: {e}")
+
+    agents = NameResolver([a.name for a in sub_agents])
+    tool_names = NameResolver([t.name for t in tools])
+    unresolved = []
+    workflows = []
+
+    for wf in workflow_plan.get("workflows", []):
+        if not isinstance(wf, dict):
+            raise ReconciliationError(f"Invalid workflow: {wf!r}")
+        steps = []
+        for index, step in enumerate(wf.get("steps", []), start=1):
+            if not isinstance(step, dict):
+                raise ReconciliationError(f"Invalid step in workflow '{wf.get('name')}': {step!r}")
+
+            assigned_to = step.get("assigned_to")
+            if assigned_to and normalize_name(assigned_to) != normalize_name(SYSTEM_ASSIGNEE):
+                # A step may be assigned to a sub-agent or directly to a tool
+                resolved = agents.resolve(assigned_to) or tool_names.resolve(assigned_to)
+                if resolved is None:
+                    unresolved.append(f"agent '{assigned_to}'")
+                assigned_to = resolved
+            elif assigned_to:
+                assigned_to = SYSTEM_ASSIGNEE
+
+            tools_required = []
+            for tool in step.get("tools_required") or []:
+                resolved = tool_names.resolve(tool)
+                if resolved is None:
+                    unresolved.append(f"tool '{tool}'")
+                elif resolved not in tools_required:
+                    tools_required.append(resolved)
+
+            step_id = step.get("step_id")
+            try:
+                steps.append(AgentStep(
+                    step_id=step_id if isinstance(step_id, int) else index,
+                    description=step.get("description", ""),
+                    assigned_to=assigned_to,
+                    tools_required=tools_required,
+                    expected_output=step.get("expected_output"),
+                ))
+            except ValidationError as e:
+                raise ReconciliationError(f"Invalid step: {e}")
+
+        try:
+            workflows.append(AgentWorkflow(
+                name=wf.get("name") or f"Workflow{len(workflows) + 1}",
+                description=wf.get("description", ""),
+                steps=steps,
+            ))
+        except ValidationError as e:
+            raise ReconciliationError(f"Invalid workflow: {e}")
+
+    if unresolved:
+        raise ReconciliationError(f"Unresolved references: {', '.join(sorted(set(unresolved)))}")
+    if not (sub_agents or tools or workflows):
+        raise ReconciliationError("Nothing to assemble")
+
+    goal = components.get("goal")
+    if not goal:
+        goal = workflows[0].description if workflows and workflows[0].description else "Coordinate the sub-agents and tools on the board."
+
+    try:
+        return AgentSpec(
+            name=components.get("name") or "AgentSystem",
+            role=components.get("role") or "Orchestrator",
+            goal=goal,
+            type="orchestrator" if sub_agents else "agent",
+            sub_agents=sub_agents,
+            tools=tools,
+            workflows=_unique(workflows),
+            constraints=[str(c) for c in components.get("constraints", [])],
+        )
+    except ValidationError as e:
+        raise ReconciliationError(f"Invalid AgentSpec: {e}")
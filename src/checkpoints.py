@@ -0,0 +1,177 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    from config import Config
+    from models import BoardItem
+except ImportError:
+    from .config import Config
+    from .models import BoardItem
+
+# Graph nodes in execution order; a checkpoint is the state after a node succeeded
+NODE_ORDER = ["fetch_data", "parse_structure", "architect_agent", "workflow_planner", "dsl_generator"]
+
+def encode_state(state: Dict[str, Any]) -> str:
+    def default(value: Any):
+        if isinstance(value, BaseModel):
+            return value.dict(exclude_none=True)
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+    return json.dumps(state, default=default, separators=(",", ":"))
+
+def decode_state(data: str) -> Dict[str, Any]:
+    state = json.loads(data)
+    if isinstance(state.get("raw_items"), list):
+        state["raw_items"] = [BoardItem(**item) if isinstance(item, dict) else item for item in state["raw_items"]]
+    return state
+
+class CheckpointStore:
+    """
+    Durable per-run checkpoints in a local SQLite database, keyed by run id and node.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.CHECKPOINT_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, board_id TEXT, board_url TEXT, status TEXT, "
+                "failed_node TEXT, error TEXT, created REAL, updated REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_id TEXT, node TEXT, state TEXT, created REAL, PRIMARY KEY (run_id, node))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _upsert_run(self, conn: sqlite3.Connection, run_id: str, state: Dict[str, Any], status: str,
+                    failed_node: Optional[str] = None, error: Optional[str] = None):
+        now = time.time()
+        conn.execute(
+            "INSERT INTO runs (run_id, board_id, board_url, status, failed_node, error, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(run_id) DO UPDATE SET board_id = COALESCE(excluded.board_id, runs.board_id), "
+            "board_url = COALESCE(excluded.board_url, runs.board_url), status = excluded.status, "
+            "failed_node = excluded.failed_node, error = excluded.error, updated = excluded.updated",
+            (run_id, state.get("board_id"), state.get("board_url"), status, failed_node, error, now, now),
+        )
+
+    def save(self, run_id: str, node: str, state: Dict[str, Any]):
+        status = "completed" if node == NODE_ORDER[-1] else "running"
+        data = encode_state({k: v for k, v in state.items() if k not in ("error", "resume_from")})
+        with closing(self._connect()) as conn, conn:
+            self._upsert_run(conn, run_id, state, status)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, node, state, created) VALUES (?, ?, ?, ?)",
+                (run_id, node, data, time.time()),
+            )
+            # Checkpoints after a re-run node are stale
+            later = NODE_ORDER[NODE_ORDER.index(node) + 1:]
+            conn.executemany("DELETE FROM checkpoints WHERE run_id = ? AND node = ?", [(run_id, n) for n in later])
+
+    def mark_failed(self, run_id: str, node: str, state: Dict[str, Any], error: str):
+        with closing(self._connect()) as conn, conn:
+            self._upsert_run(conn, run_id, state, "failed", node, error)
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_runs(self, board_id: Optional[str] = None, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM runs"
+        clauses, args = [], []
+        if board_id:
+            clauses.append("board_id = ?")
+            args.append(board_id)
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY updated DESC LIMIT ?"
+        args.append(limit)
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(query, args).fetchall()]
+
+    def completed_nodes(self, run_id: str) -> List[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT node FROM checkpoints WHERE run_id = ?", (run_id,)).fetchall()
+        done = {row["node"] for row in rows}
+        return [node for node in NODE_ORDER if node in done]
+
+    def state_before(self, run_id: str, node: str) -> Optional[Dict[str, Any]]:
+        """State as it was when node started: the checkpoint of the closest earlier node."""
+        earlier = NODE_ORDER[:NODE_ORDER.index(node)]
+        if not earlier:
+            run = self.get_run(run_id)
+            return {"run_id": run_id, "board_url": run["board_url"]} if run else None
+        with closing(self._connect()) as conn:
+            for previous in reversed(earlier):
+                row = conn.execute(
+                    "SELECT state FROM checkpoints WHERE run_id = ? AND node = ?", (run_id, previous)
+                ).fetchone()
+                if row:
+                    return decode_state(row["state"])
+        return None
+
+    def state_after(self, run_id: str, node: str) -> Optional[Dict[str, Any]]:
+        """State saved when node finished, if it did."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT state FROM checkpoints WHERE run_id = ? AND node = ?", (run_id, node)
+            ).fetchone()
+        return decode_state(row["state"]) if row else None
+
+    def resume_point(self, run_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """The first node without a checkpoint and the state to start it from."""
+        done = self.completed_nodes(run_id)
+        pending = [node for node in NODE_ORDER if node not in done]
+        if not pending:
+            return None
+        node = pending[0]
+        state = self.state_before(run_id, node)
+        return (node, state) if state is not None else None
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != Config.CHECKPOINT_DB:
+            _store = CheckpointStore()
+        return _store
+
+def checkpointed_node(name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Wrap a graph node so the merged state is checkpointed after it succeeds,
+    and the run is marked failed at this node when it returns an error.
+    """
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        update = fn(state)
+        if not Config.CHECKPOINT_ENABLED or state.get("error"):
+            return update
+        merged = {**state, **update}
+        run_id = merged.get("run_id")
+        if not run_id:
+            return update
+        store = get_checkpoint_store()
+        if update.get("error"):
+            store.mark_failed(run_id, name, merged, update["error"])
+        else:
+            store.save(run_id, name, merged)
+        return update
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    return wrapper
@@ -0,0 +1,363 @@
+import json
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; LayoutParser falls back to the per-item passes
+    np = None
+
+try:
+    from models import BoardItem, Geometry, Position
+except ImportError:
+    from .models import BoardItem, Geometry, Position
+
+_MAGIC = b"MIROCOL1"
+_ALIGN = 64
+
+# Upper bound on candidate pairs materialised at once by ColumnarBoard.proximity
+_PAIR_CHUNK = 1 << 20
+
+def available() -> bool:
+    return np is not None
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def _nearest(source: "np.ndarray", target: "np.ndarray", gap: "np.ndarray",
+             limit: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Keep each source's limit nearest targets (ties by target), grouped by source, nearest first."""
+    ranked = np.lexsort((target, gap, source))
+    source, target, gap = source[ranked], target[ranked], gap[ranked]
+    starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+    rank = np.arange(len(source)) - np.repeat(starts, np.diff(np.r_[starts, len(source)]))
+    keep = rank < limit
+    return source[keep], target[keep], gap[keep]
+
+class StringTable:
+    """
+    Interned strings. Built in memory as a list; loaded from a file as one UTF-8
+    blob plus offsets, decoding entries only when they are read.
+    """
+    def __init__(self, strings: Optional[List[str]] = None, blob=None, offsets=None):
+        self._strings = strings
+        self._blob = blob
+        self._offsets = offsets
+        self._decoded: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._strings) if self._strings is not None else len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if self._strings is not None:
+            return self._strings[index]
+        text = self._decoded.get(index)
+        if text is None:
+            start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+            text = self._decoded[index] = bytes(self._blob[start:end]).decode("utf-8")
+        return text
+
+    def encoded(self):
+        if self._strings is None:
+            return np.asarray(self._blob), np.asarray(self._offsets)
+        data = [s.encode("utf-8") for s in self._strings]
+        offsets = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in data], out=offsets[1:])
+        return np.frombuffer(b"".join(data), dtype=np.uint8), offsets
+
+class ColumnarBoard:
+    """
+    Column-oriented copy of a board's items: one NumPy array per field, with ids,
+    content and other strings interned in a StringTable and referenced by index
+    (-1 for none). Only the fields the structural passes use are kept; styles
+    and raw payloads stay with the BoardItems.
+
+    Columns, one row per item:
+        id, content, parent_ref, start_ref, end_ref, modified_ref  string refs
+        type                                                       code into .types
+        x, y, width, height                                        float64, NaN if missing
+        relative                                                   position is relative to the parent
+        parent                                                     row of the parent item, -1 if not on the board
+    """
+    STRING_COLUMNS = ("id", "content", "parent_ref", "start_ref", "end_ref", "modified_ref")
+    COLUMNS = STRING_COLUMNS + ("type", "x", "y", "width", "height", "relative", "parent")
+
+    def __init__(self, strings: StringTable, types: List[str], columns: Dict[str, "np.ndarray"]):
+        if np is None:
+            raise ImportError("ColumnarBoard requires numpy (pip install numpy)")
+        self.strings = strings
+        self.types = list(types)
+        self.columns = columns
+        self.n = len(columns["id"])
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getattr__(self, name: str):
+        columns = self.__dict__.get("columns")
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    @classmethod
+    def from_items(cls, items: Sequence[BoardItem]) -> "ColumnarBoard":
+        if np is None:
+            raise ImportError("ColumnarBoard requires numpy (pip install numpy)")
+        table: Dict[str, int] = {}
+        types: Dict[str, int] = {}
+
+        def intern(text: Optional[str]) -> int:
+            return -1 if text is None else table.setdefault(text, len(table))
+
+        nan = float("nan")
+        columns: Dict[str, list] = {name: [] for name in cls.COLUMNS if name != "parent"}
+        for item in items:
+            data = item.metadata or {}
+            columns["id"].append(intern(item.id))
+            columns["content"].append(intern(item.content))
+            columns["parent_ref"].append(intern(item.parent_id))
+            columns["start_ref"].append(intern(item.start_id or data.get("startItem", {}).get("id")))
+            columns["end_ref"].append(intern(item.end_id or data.get("endItem", {}).get("id")))
+            columns["modified_ref"].append(intern(item.modified_at))
+            columns["type"].append(types.setdefault(item.type, len(types)))
+            position, geometry = item.position, item.geometry
+            columns["x"].append(nan if position is None else position.x)
+            columns["y"].append(nan if position is None else position.y)
+            columns["relative"].append(position is not None and (position.relative_to == "parent_top_left" or (
+                position.relative_to is None and item.parent_id is not None
+            )))
+            width = geometry.width if geometry is not None else None
+            height = geometry.height if geometry is not None else None
+            columns["width"].append(nan if width is None else width)
+            columns["height"].append(nan if height is None else height)
+
+        dtypes = {"type": np.int16, "relative": bool, "x": np.float64, "y": np.float64,
+                  "width": np.float64, "height": np.float64}
+        arrays = {name: np.array(values, dtype=dtypes.get(name, np.int32)) for name, values in columns.items()}
+        arrays["parent"] = np.full(len(items), -1, dtype=np.int32)
+        board = cls(StringTable(list(table)), list(types), arrays)
+        board.columns["parent"] = board.resolve(board.parent_ref)
+        return board
+
+    # --- Vectorized passes ---
+
+    def rows_of_strings(self) -> "np.ndarray":
+        """Row of the item each interned string is the id of, -1 if none."""
+        rows = np.full(len(self.strings), -1, dtype=np.int32)
+        rows[self.id] = np.arange(self.n, dtype=np.int32)
+        return rows
+
+    def resolve(self, refs: "np.ndarray") -> "np.ndarray":
+        """Map string refs (item ids) to item rows, -1 where the id is not on the board."""
+        rows = self.rows_of_strings()
+        return np.where(refs >= 0, rows[np.maximum(refs, 0)], -1).astype(np.int32)
+
+    def type_mask(self, name: str) -> "np.ndarray":
+        code = self.types.index(name) if name in self.types else -1
+        return self.type == code
+
+    def absolute_bboxes(self, max_depth: int = 32) -> "np.ndarray":
+        """
+        (n, 4) array of (min_x, min_y, max_x, max_y) in absolute board coordinates,
+        NaN for items without a position. Same rules as spatial.absolute_bboxes:
+        relative positions are offset by the parent's absolute position, resolved
+        one nesting level per vectorized step.
+        """
+        positioned = ~np.isnan(self.x)
+        parent = np.maximum(self.parent, 0)
+        offset = self.relative & (self.parent >= 0) & positioned[parent]
+        half_w = np.nan_to_num(self.width) / 2
+        half_h = np.nan_to_num(self.height) / 2
+        # Children are offset by their parent's top-left corner
+        ax, ay = self.x.copy(), self.y.copy()
+        for _ in range(max_depth):
+            nx = np.where(offset, self.x + (ax - half_w)[parent], self.x)
+            ny = np.where(offset, self.y + (ay - half_h)[parent], self.y)
+            if np.array_equal(nx, ax, equal_nan=True) and np.array_equal(ny, ay, equal_nan=True):
+                break
+            ax, ay = nx, ny
+        return np.stack([ax - half_w, ay - half_h, ax + half_w, ay + half_h], axis=1)
+
+    def bbox_dict(self, boxes: Optional["np.ndarray"] = None) -> Dict[str, Tuple[float, float, float, float]]:
+        boxes = self.absolute_bboxes() if boxes is None else boxes
+        rows = np.flatnonzero(~np.isnan(boxes[:, 0]))
+        return {self.strings[ref]: tuple(box) for ref, box in zip(self.id[rows].tolist(), boxes[rows].tolist())}
+
+    def geometric_containment(self, boxes: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        Row of the smallest frame whose bounds hold each unparented item's center,
+        -1 for none; ties go to the first frame. Frames only hold smaller frames.
+        Each frame looks up its candidates by binary search over centers sorted
+        by x, so the cost is O(frames * log(items) + matches).
+        """
+        boxes = self.absolute_bboxes() if boxes is None else boxes
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        is_frame = self.type_mask("frame")
+
+        candidates = np.flatnonzero(~np.isnan(cx) & (self.parent < 0) & ~self.type_mask("connector"))
+        candidates = candidates[np.argsort(cx[candidates], kind="stable")]
+        sorted_cx = cx[candidates]
+
+        frames = np.flatnonzero(is_frame & (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]))
+        # Largest first, so smaller frames overwrite; equal areas in reverse so the first frame wins
+        frames = frames[np.lexsort((-frames, -area[frames]))]
+
+        container = np.full(self.n, -1, dtype=np.int32)
+        for frame in frames.tolist():
+            x0, y0, x1, y1 = boxes[frame]
+            hits = candidates[np.searchsorted(sorted_cx, x0, side="left"):np.searchsorted(sorted_cx, x1, side="right")]
+            hits = hits[(cy[hits] >= y0) & (cy[hits] <= y1) & (hits != frame)]
+            hits = hits[~is_frame[hits] | (area[hits] < area[frame])]
+            container[hits] = frame
+        return container
+
+    def proximity(self, boxes: "np.ndarray", scope: "np.ndarray", distance: float,
+                  max_neighbors: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Pairs of items (not frames or connectors) with the same scope whose boxes
+        are at most distance apart, as (source rows, target rows) with source <
+        target. Each source keeps its max_neighbors nearest targets, nearest first.
+
+        Like spatial.SpatialGrid, each box (padded by distance / 2) is registered in
+        every grid cell it overlaps, so only items sharing a cell are measured, and
+        each pair only in the first cell they share. Candidate pairs are generated
+        in chunks of at most _PAIR_CHUNK and reduced to the nearest as they go, so
+        memory stays bounded however the items are laid out.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        candidates = np.flatnonzero(~np.isnan(boxes[:, 0]) & ~self.type_mask("frame") & ~self.type_mask("connector"))
+        if distance <= 0 or max_neighbors <= 0 or len(candidates) < 2:
+            return empty, empty
+        box = boxes[candidates]
+        # Cells around the typical item size, as LayoutParser._cell_size
+        typical = float(np.median(np.maximum(box[:, 2] - box[:, 0], box[:, 3] - box[:, 1])))
+        cell_size = max(distance, typical, 1.0)
+
+        # The padding is widened a hair so float rounding never separates a pair exactly distance apart
+        pad = distance / 2 * (1 + 1e-9)
+        x0 = np.floor((box[:, 0] - pad) / cell_size).astype(np.int64)
+        y0 = np.floor((box[:, 1] - pad) / cell_size).astype(np.int64)
+        x1 = np.floor((box[:, 2] + pad) / cell_size).astype(np.int64)
+        y1 = np.floor((box[:, 3] + pad) / cell_size).astype(np.int64)
+        rows = y1 - y0 + 1
+        cells = (x1 - x0 + 1) * rows
+
+        # One entry per (item, cell), grouped by scope and cell with items in row order
+        item = np.repeat(np.arange(len(candidates)), cells)
+        offset = np.arange(len(item)) - np.repeat(np.cumsum(cells) - cells, cells)
+        cell_x = x0[item] + offset // rows[item]
+        cell_y = y0[item] + offset % rows[item]
+        item_scope = scope[candidates][item]
+        order = np.lexsort((item, cell_y, cell_x, item_scope))
+        item, cell_x, cell_y, item_scope = item[order], cell_x[order], cell_y[order], item_scope[order]
+        boundary = np.r_[True, (item_scope[1:] != item_scope[:-1]) | (cell_x[1:] != cell_x[:-1]) | (cell_y[1:] != cell_y[:-1])]
+        starts = np.flatnonzero(boundary)
+        group_end = np.repeat(np.r_[starts[1:], len(item)], np.diff(np.r_[starts, len(item)]))
+        counts = group_end - np.arange(len(item)) - 1
+        total = np.cumsum(counts)
+
+        source, target, gap = empty, empty, np.zeros(0)
+        start = 0
+        while start < len(item):
+            before = total[start - 1] if start else 0
+            stop = max(int(np.searchsorted(total, before + _PAIR_CHUNK, side="right")), start + 1)
+            index = np.arange(start, stop)
+            count = counts[start:stop]
+            left = np.repeat(index, count)
+            right = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count) + left + 1
+            a, b = item[left], item[right]
+            # Measure each pair only in the first cell both boxes cover
+            first = (np.maximum(x0[a], x0[b]) == cell_x[left]) & (np.maximum(y0[a], y0[b]) == cell_y[left])
+            a, b = a[first], b[first]
+            dx = np.maximum(0.0, np.maximum(box[b, 0] - box[a, 2], box[a, 0] - box[b, 2]))
+            dy = np.maximum(0.0, np.maximum(box[b, 1] - box[a, 3], box[a, 1] - box[b, 3]))
+            pair_gap = np.hypot(dx, dy)
+            near = pair_gap <= distance
+            source, target, gap = _nearest(np.r_[source, candidates[a[near]]], np.r_[target, candidates[b[near]]],
+                                           np.r_[gap, pair_gap[near]], max_neighbors)
+            start = stop
+        return source, target
+
+    def connector_endpoints(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Rows of connectors with both endpoints set, and their start and end string refs."""
+        rows = np.flatnonzero(self.type_mask("connector") & (self.start_ref >= 0) & (self.end_ref >= 0))
+        return rows, self.start_ref[rows], self.end_ref[rows]
+
+    # --- Conversion and storage ---
+
+    def items(self) -> List[BoardItem]:
+        """Rebuild BoardItems (without style or metadata) from the columns."""
+        def text(ref) -> Optional[str]:
+            return None if ref < 0 else self.strings[ref]
+
+        columns = {name: self.columns[name].tolist() for name in self.COLUMNS}
+        result = []
+        for row in range(self.n):
+            x, y, width, height = (columns[name][row] for name in ("x", "y", "width", "height"))
+            position = None
+            if x == x:
+                position = Position(x=x, y=y, relative_to="parent_top_left" if columns["relative"][row] else "canvas_center")
+            geometry = None
+            if width == width or height == height:
+                geometry = Geometry(width=None if width != width else width, height=None if height != height else height)
+            result.append(BoardItem(
+                id=self.strings[columns["id"][row]],
+                type=self.types[columns["type"][row]],
+                content=text(columns["content"][row]) or "",
+                position=position,
+                geometry=geometry,
+                parent_id=text(columns["parent_ref"][row]),
+                modified_at=text(columns["modified_ref"][row]),
+                start_id=text(columns["start_ref"][row]),
+                end_id=text(columns["end_ref"][row]),
+            ))
+        return result
+
+    def save(self, path: str) -> None:
+        """
+        Write one binary file: magic, header length, a JSON header with the type
+        names and each column's dtype, shape and offset, then the raw columns at
+        64-byte aligned offsets so they can be memory-mapped in place.
+        """
+        blob, offsets = self.strings.encoded()
+        arrays = {**{name: np.ascontiguousarray(self.columns[name]) for name in self.COLUMNS},
+                  "string_offsets": offsets, "string_data": blob}
+        layout, position = {}, 0
+        for name, array in arrays.items():
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+            position += _aligned(array.nbytes)
+        header = json.dumps({"types": self.types, "columns": layout}, separators=(",", ":")).encode("utf-8")
+        start = _aligned(len(_MAGIC) + 8 + len(header))
+
+        with open(path, "wb") as f:
+            f.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+            f.write(b"\0" * (start - f.tell()))
+            for name, array in arrays.items():
+                f.write(array.tobytes())
+                f.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ColumnarBoard":
+        """Open a saved board; with mmap the columns are read-only views of the file."""
+        if np is None:
+            raise ImportError("ColumnarBoard requires numpy (pip install numpy)")
+        with open(path, "rb") as f:
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a columnar board file: {path}")
+            (length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length))
+        data = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+        start = _aligned(len(_MAGIC) + 8 + length)
+
+        def column(name: str):
+            spec = header["columns"][name]
+            dtype = np.dtype(spec["dtype"])
+            offset = start + spec["offset"]
+            size = dtype.itemsize * int(np.prod(spec["shape"], dtype=np.int64))
+            return data[offset:offset + size].view(dtype).reshape(spec["shape"])
+
+        strings = StringTable(blob=column("string_data"), offsets=column("string_offsets"))
+        return cls(strings, header["types"], {name: column(name) for name in cls.COLUMNS})
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,9 +12,108 @@ class Config:
     # Ollama settings
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "qwen3-coder:480b-cloud") # Updated to a known good model
+
+    # Model routing: try OLLAMA_SMALL_MODEL first on calls the profile deems simple, escalating to OLLAMA_MODEL
+    OLLAMA_SMALL_MODEL: Optional[str] = os.getenv("OLLAMA_SMALL_MODEL") # unset routes everything to OLLAMA_MODEL
+    ROUTER_PROFILE: str = os.getenv("ROUTER_PROFILE", "balanced") # fast, balanced or quality
+    ROUTER_LOG: str = os.getenv("ROUTER_LOG", os.path.join(".miro_cache", "routing.jsonl")) # decisions and outcomes; empty disables
     
+    # Spatial analysis in the layout parser (board units)
+    SPATIAL_ENABLED: bool = os.getenv("SPATIAL_ENABLED", "true").lower() == "true"
+    SPATIAL_NEAR_DISTANCE: float = float(os.getenv("SPATIAL_NEAR_DISTANCE", "40"))
+    SPATIAL_MAX_NEIGHBORS: int = int(os.getenv("SPATIAL_MAX_NEIGHBORS", "4"))
+    # Boards this large use the vectorized NumPy passes when numpy is installed
+    COLUMNAR_ENABLED: bool = os.getenv("COLUMNAR_ENABLED", "true").lower() == "true"
+    COLUMNAR_MIN_ITEMS: int = int(os.getenv("COLUMNAR_MIN_ITEMS", "2000"))
+
+    # Prompt encoding of the structural graph
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "12000"))
+    PROMPT_CHARS_PER_TOKEN: int = int(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+
+    # Frame-partitioned analysis of large boards
+    PARTITION_MIN_FRAMES: int = int(os.getenv("PARTITION_MIN_FRAMES", "12"))
+    PARTITION_TARGET_TOKENS: int = int(os.getenv("PARTITION_TARGET_TOKENS", "4000"))
+    OLLAMA_MAX_PARALLEL: int = int(os.getenv("OLLAMA_MAX_PARALLEL", "2"))
+
+    # Prompt layout: Ollama context window sizing (num_ctx rounds up to a power of two)
+    LLM_NUM_CTX_MIN: int = int(os.getenv("LLM_NUM_CTX_MIN", "4096"))
+    LLM_NUM_CTX_MAX: int = int(os.getenv("LLM_NUM_CTX_MAX", "131072"))
+    LLM_CONTEXT_HEADROOM: int = int(os.getenv("LLM_CONTEXT_HEADROOM", "6144")) # tokens beyond the board context for instructions, stage data and output
+    LLM_OUTPUT_RESERVE: int = int(os.getenv("LLM_OUTPUT_RESERVE", "2048")) # tokens kept free for the response
+
+    # Follow-up turns that fix fields failing stage schema validation before giving up
+    LLM_REPAIR_ATTEMPTS: int = int(os.getenv("LLM_REPAIR_ATTEMPTS", "2"))
+
+    # Streaming generation and its abort budget
+    LLM_STREAM: bool = os.getenv("LLM_STREAM", "false").lower() == "true"
+    LLM_STREAM_MAX_TOKENS: int = int(os.getenv("LLM_STREAM_MAX_TOKENS", "8192"))
+    LLM_STREAM_MAX_SECONDS: float = float(os.getenv("LLM_STREAM_MAX_SECONDS", "300"))
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_DIR: str = os.getenv("LLM_CACHE_DIR", os.path.join(".miro_cache", "llm"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+    LLM_CACHE_MAX_DISK_MB: int = int(os.getenv("LLM_CACHE_MAX_DISK_MB", "256"))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Re-analyze only the frames changed since the board's last completed run (needs checkpoints)
+    INCREMENTAL_ENABLED: bool = os.getenv("INCREMENTAL_ENABLED", "true").lower() == "true"
+    INCREMENTAL_MAX_CHANGED_FRACTION: float = float(os.getenv("INCREMENTAL_MAX_CHANGED_FRACTION", "0.5")) # above this, run in full
+
+    # Durable per-run checkpoints for resuming failed runs
+    CHECKPOINT_ENABLED: bool = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+    CHECKPOINT_DB: str = os.getenv("CHECKPOINT_DB", os.path.join(".miro_cache", "checkpoints.sqlite3"))
+
+    # Large state values (raw items, graph, LLM outputs) go to a content-addressed store; state keeps handles
+    ARTIFACTS_ENABLED: bool = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+    ARTIFACT_DIR: Optional[str] = os.getenv("ARTIFACT_DIR") # default: "artifacts" next to CHECKPOINT_DB
+    ARTIFACT_MIN_BYTES: int = int(os.getenv("ARTIFACT_MIN_BYTES", "4096")) # smaller values stay inline
+    ARTIFACT_CACHE_ENTRIES: int = int(os.getenv("ARTIFACT_CACHE_ENTRIES", "64")) # decoded artifacts kept in memory
+
+    # Instrumentation: per-run JSON-lines traces and aggregate counters
+    TRACE_ENABLED: bool = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+    TRACE_DIR: str = os.getenv("TRACE_DIR", os.path.join(".miro_cache", "traces"))
+    METRICS_FILE: Optional[str] = os.getenv("METRICS_FILE") # Prometheus text file, rewritten after every node
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0")) # 0 disables the /metrics endpoint
+
+    # Long-running service mode (server.py --serve)
+    SERVICE_HOST: str = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT: int = int(os.getenv("SERVICE_PORT", "8765"))
+    SERVICE_WORKERS: int = int(os.getenv("SERVICE_WORKERS", "2"))
+    SERVICE_MAX_JOBS: int = int(os.getenv("SERVICE_MAX_JOBS", "1000")) # finished jobs kept for status/result lookups
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m") # how long Ollama keeps the model loaded
+    OLLAMA_KEEP_WARM_SECONDS: float = float(os.getenv("OLLAMA_KEEP_WARM_SECONDS", "240")) # 0 disables warm-up pings
+
     TEST_BOARD_ID: Optional[str] = os.getenv("TEST_BOARD_ID")
 
+    # Miro fetch settings
+    MIRO_BASE_URL: str = os.getenv("MIRO_BASE_URL", "https://api.miro.com/v2")
+    MIRO_PAGE_LIMIT: int = int(os.getenv("MIRO_PAGE_LIMIT", "50")) # 50 is the API maximum
+    MIRO_MAX_WORKERS: int = int(os.getenv("MIRO_MAX_WORKERS", "8"))
+    # Item types fetched as separate parallel streams once a board spans more than one page
+    MIRO_ITEM_TYPES: List[str] = [
+        "frame", "shape", "sticky_note", "text", "card",
+        "app_card", "image", "document", "embed",
+    ]
+
+    # Client-side rate limiting and retries, shared by all fetches in the process
+    MIRO_RATE_LIMIT_CREDITS: float = float(os.getenv("MIRO_RATE_LIMIT_CREDITS", "100000")) # credits per minute
+    MIRO_REQUEST_CREDITS: float = float(os.getenv("MIRO_REQUEST_CREDITS", "100")) # cost of one list request
+    MIRO_MAX_RETRIES: int = int(os.getenv("MIRO_MAX_RETRIES", "6"))
+    MIRO_BACKOFF_BASE: float = float(os.getenv("MIRO_BACKOFF_BASE", "0.5"))
+    MIRO_BACKOFF_MAX: float = float(os.getenv("MIRO_BACKOFF_MAX", "30"))
+
+    # Spill raw item payloads to a per-board side file next to the snapshots
+    MIRO_KEEP_RAW: bool = os.getenv("MIRO_KEEP_RAW", "false").lower() == "true"
+
+    # Process-wide in-flight request caps (0 = unlimited), shared by concurrent runs
+    MIRO_MAX_CONCURRENCY: int = int(os.getenv("MIRO_MAX_CONCURRENCY", "16"))
+    OLLAMA_MAX_CONCURRENCY: int = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+
+    # Local per-board snapshots for incremental sync
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", "true").lower() == "true"
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", os.path.join(".miro_cache", "snapshots"))
+
     # LangSmith Tracing
     LANGCHAIN_TRACING_V2: str = os.getenv("LANGCHAIN_TRACING_V2", "true")
     LANGCHAIN_ENDPOINT: str = os.getenv("LANGCHAIN_ENDPOINT", "https://api.smith.langchain.com")
@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    from models import FlowAnalysis
+except ImportError:
+    from .models import FlowAnalysis
+
+def strongly_connected_components(nodes: List[str], successors: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Tarjan's algorithm without recursion, so long chains of arrows cannot hit
+    the recursion limit. Components come out in reverse topological order.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    components: List[List[str]] = []
+    work: List[Tuple[str, Iterable[str]]] = []
+
+    def visit(node: str):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(successors.get(node, ()))))
+
+    for root in nodes:
+        if root in index:
+            continue
+        visit(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    visit(child)
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+def analyze_flow(nodes: List[str], edges: List[Tuple[str, str]]) -> FlowAnalysis:
+    """
+    Flow structure of the arrows between items, in time linear in nodes + edges.
+
+    Loops (strongly connected components) are collapsed and the condensed graph
+    is ordered with Kahn's algorithm, so "order" is a topological order in which
+    the members of a loop stay adjacent. Ties are broken by the order of "nodes"
+    (the board's item order), which keeps the result stable between runs.
+    """
+    known = set(nodes)
+    successors: Dict[str, List[str]] = {}
+    predecessors: Dict[str, List[str]] = {}
+    self_loops = set()
+    seen = set()
+    for source, target in edges:
+        if source not in known or target not in known or (source, target) in seen:
+            continue
+        seen.add((source, target))
+        if source == target:
+            self_loops.add(source)
+            continue
+        successors.setdefault(source, []).append(target)
+        predecessors.setdefault(target, []).append(source)
+
+    connected = [node for node in nodes if node in successors or node in predecessors or node in self_loops]
+    scc = {node: key for key, members in enumerate(strongly_connected_components(connected, successors)) for node in members}
+    # Renumber components, and order their members, by the board order
+    numbering: Dict[int, int] = {}
+    components: List[List[str]] = []
+    component_of: Dict[str, int] = {}
+    for node in connected:
+        if scc[node] not in numbering:
+            numbering[scc[node]] = len(components)
+            components.append([])
+        component_of[node] = numbering[scc[node]]
+        components[component_of[node]].append(node)
+
+    incoming = [0] * len(components)
+    for source, targets in successors.items():
+        for target in targets:
+            if component_of[source] != component_of[target]:
+                incoming[component_of[target]] += 1
+
+    starts = [cid for cid in range(len(components)) if incoming[cid] == 0]
+    # A stack rather than a queue, so a chain of steps is not interleaved with parallel paths
+    ready = starts[::-1]
+    sinks = []
+    order: List[str] = []
+    while ready:
+        cid = ready.pop()
+        order.extend(components[cid])
+        unlocked = []
+        leaves = True
+        for node in components[cid]:
+            for target in successors.get(node, ()):
+                other = component_of[target]
+                if other == cid:
+                    continue
+                leaves = False
+                incoming[other] -= 1
+                if incoming[other] == 0:
+                    unlocked.append(other)
+        if leaves:
+            sinks.append(cid)
+        ready.extend(reversed(unlocked))
+
+    def ends(cids: List[int], neighbours: Dict[str, List[str]], fallback: int) -> List[str]:
+        # A loop nobody enters (or leaves) still needs a way in (or out)
+        found = []
+        for cid in cids:
+            free = [node for node in components[cid] if not neighbours.get(node)]
+            found.extend(free or [components[cid][fallback]])
+        return found
+
+    return FlowAnalysis(
+        entries=ends(starts, predecessors, 0),
+        exits=ends(sinks, successors, -1),
+        order=order,
+        branches={node: targets for node, targets in successors.items() if len(targets) > 1},
+        merges={node: sources for node, sources in predecessors.items() if len(sources) > 1},
+        loops=[component for component in components if len(component) > 1 or component[0] in self_loops],
+    )
@@ -0,0 +1,192 @@
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+LEGEND = (
+    "frames group their items; items are [alias, type, text] in reading order; "
+    "edges map a source alias to target aliases, ':label' is the arrow label; "
+    "near lists spatially adjacent aliases; flow is precomputed from the edges: order is the step order "
+    "(loop members adjacent), branch/merge are fan-out/fan-in points, loop lists cycles"
+)
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // Config.PROMPT_CHARS_PER_TOKEN + 1
+
+def _truncate(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+class CompactGraphView:
+    """
+    Prompt-oriented view of a StructuralGraph dict.
+
+    Long Miro ids are replaced by short aliases (F1 for frames, n1 for items),
+    raw metadata and styles are dropped, items are grouped under their frames
+    and connectors become an adjacency map.
+    """
+    def __init__(self, graph: Dict[str, Any]):
+        items = graph.get("items", {})
+        frames = [f for f in graph.get("frames", []) if f in items]
+        self.aliases: Dict[str, str] = {}
+        for index, frame_id in enumerate(frames, start=1):
+            self.aliases[frame_id] = f"F{index}"
+        count = 0
+        for item_id, item in items.items():
+            if item_id not in self.aliases and item.get("type") != "connector":
+                count += 1
+                self.aliases[item_id] = f"n{count}"
+
+        self.items = items
+        self.frames = frames
+        self.flow = graph.get("flow") or {}
+        self.parent: Dict[str, str] = {}
+        self.edges: Dict[str, List[Tuple[str, str]]] = {}
+        self.near: Dict[str, List[str]] = {}
+        for rel in graph.get("relations", []):
+            source, target = rel["source_id"], rel["target_id"]
+            if source not in self.aliases or target not in self.aliases:
+                continue
+            if rel["type"] == "contains" and source in frames:
+                self.parent[target] = source
+            elif rel["type"] == "connected_to":
+                self.edges.setdefault(source, []).append((target, rel.get("label") or ""))
+            elif rel["type"] == "visually_near":
+                self.near.setdefault(source, []).append(target)
+
+        connected = set(self.edges)
+        for targets in self.edges.values():
+            connected.update(target for target, _ in targets)
+        self.connected = connected
+
+        self.members: Dict[Optional[str], List[str]] = {}
+        for item_id in self.aliases:
+            if item_id in frames and item_id not in self.parent:
+                continue
+            self.members.setdefault(self.parent.get(item_id), []).append(item_id)
+        for ids in self.members.values():
+            ids.sort(key=self._order_key)
+
+    def _order_key(self, item_id: str):
+        # Connected items first so they survive truncation, then reading order
+        position = self.items[item_id].get("position") or {}
+        return (item_id not in self.connected, position.get("y", float("inf")), position.get("x", float("inf")))
+
+    def render(self, max_text: int, drop_empty: bool = False, max_items: Optional[int] = None,
+               over_budget: bool = False) -> str:
+        kept = set(self.frames)
+        truncated = False
+
+        def entries(item_ids: List[str]) -> List[List[str]]:
+            nonlocal truncated
+            result = []
+            for item_id in item_ids:
+                if item_id in self.frames:
+                    continue
+                item = self.items[item_id]
+                content = item.get("content") or ""
+                if drop_empty and not content and item_id not in self.connected:
+                    continue
+                if max_items is not None and len(result) >= max_items:
+                    truncated = True
+                    break
+                kept.add(item_id)
+                result.append([self.aliases[item_id], item.get("type", ""), _truncate(content, max_text)])
+            return result
+
+        frames = []
+        for frame_id in self.frames:
+            frame = {"id": self.aliases[frame_id], "title": _truncate(self.items[frame_id].get("content") or "", max_text)}
+            if frame_id in self.parent:
+                frame["parent"] = self.aliases[self.parent[frame_id]]
+            members = self.members.get(frame_id, [])
+            frame["items"] = entries(members)
+            hidden = sum(1 for m in members if m not in self.frames) - len(frame["items"])
+            if hidden:
+                frame["more"] = hidden
+            frames.append(frame)
+
+        loose = entries(self.members.get(None, []))
+        edges = {}
+        for source, targets in self.edges.items():
+            if source not in kept:
+                continue
+            rendered = [
+                self.aliases[target] + (f":{_truncate(label, max_text)}" if label else "")
+                for target, label in targets if target in kept
+            ]
+            if rendered:
+                edges[self.aliases[source]] = rendered
+
+        near = {}
+        for source, targets in self.near.items():
+            rendered = [self.aliases[target] for target in targets if source in kept and target in kept]
+            if rendered:
+                near[self.aliases[source]] = rendered
+
+        view: Dict[str, Any] = {"legend": LEGEND, "frames": frames, "items": loose, "edges": edges}
+        if near:
+            view["near"] = near
+        flow = self._render_flow(kept)
+        if flow:
+            view["flow"] = flow
+        if truncated:
+            view["truncated"] = True
+        if over_budget:
+            view["over_budget"] = True
+        return json.dumps(view, ensure_ascii=False, separators=(",", ":"))
+
+    def _render_flow(self, kept) -> Dict[str, Any]:
+        def aliases(item_ids: List[str]) -> List[str]:
+            return [self.aliases[i] for i in item_ids if i in kept and i in self.aliases]
+
+        def fans(mapping: Dict[str, List[str]]) -> Dict[str, List[str]]:
+            rendered = {self.aliases[i]: aliases(targets) for i, targets in mapping.items() if i in kept and i in self.aliases}
+            return {alias: targets for alias, targets in rendered.items() if len(targets) > 1}
+
+        flow = {
+            "entry": aliases(self.flow.get("entries", [])),
+            "order": aliases(self.flow.get("order", [])),
+            "branch": fans(self.flow.get("branches", {})),
+            "merge": fans(self.flow.get("merges", {})),
+            "loop": [loop for loop in map(aliases, self.flow.get("loops", [])) if loop],
+            "exit": aliases(self.flow.get("exits", [])),
+        }
+        return {key: value for key, value in flow.items() if value} if flow["order"] else {}
+
+def graph_token_estimate(graph: Dict[str, Any]) -> int:
+    """Token estimate of a graph's encoding before any degradation."""
+    return estimate_tokens(CompactGraphView(graph).render(500))
+
+def encode_graph(graph: Dict[str, Any], token_budget: Optional[int] = None) -> str:
+    """
+    Encode a StructuralGraph dict for a prompt within a token budget.
+
+    Degrades progressively when the board does not fit: item text is shortened,
+    empty unconnected items are dropped, then each frame keeps only its first
+    (connected first) items with a count of the rest. A board whose frames alone
+    exceed the budget is returned at its smallest, marked "over_budget".
+    """
+    budget = token_budget or Config.PROMPT_TOKEN_BUDGET
+    view = CompactGraphView(graph)
+
+    text = ""
+    for max_text, drop_empty in ((500, False), (120, False), (40, True)):
+        text = view.render(max_text, drop_empty)
+        if estimate_tokens(text) <= budget:
+            return text
+
+    largest = max((len(ids) for ids in view.members.values()), default=0)
+    max_items = largest
+    while max_items > 0:
+        max_items //= 2
+        text = view.render(40, True, max_items)
+        if estimate_tokens(text) <= budget:
+            return text
+
+    print(f"Warning: board encoding needs ~{estimate_tokens(text)} tokens even at its smallest, "
+          f"over the {budget} token budget")
+    return view.render(40, True, 0, over_budget=True)
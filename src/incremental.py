@@ -0,0 +1,202 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Set
+
+try:
+    from assembler import normalize_name
+    from partition import UNFRAMED, item_roots
+except ImportError:
+    from .assembler import normalize_name
+    from .partition import UNFRAMED, item_roots
+
+COMPONENT_KINDS = ("sub_agents", "tools")
+
+def frame_fingerprints(graph: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Hash the content of every top-level frame (UNFRAMED for loose items): item
+    types, text and nesting, plus the relations inside the frame. Positions are
+    left out, so moving a frame around the canvas does not count as a change.
+    Connectors between frames are hashed separately as "cross_frame".
+    """
+    items = graph.get("items", {})
+    roots = item_roots(graph)
+    entries: Dict[str, List[Any]] = {}
+    for item_id in sorted(items):
+        item = items[item_id]
+        entries.setdefault(roots[item_id], []).append(
+            [item_id, item.get("type"), item.get("content", ""), item.get("parent_id")]
+        )
+    cross = []
+    for rel in graph.get("relations", []):
+        source, target = roots.get(rel["source_id"]), roots.get(rel["target_id"])
+        entry = [rel["source_id"], rel["target_id"], rel["type"], rel.get("label")]
+        if source is not None and source == target:
+            entries[source].append(entry)
+        elif rel["type"] == "connected_to":
+            cross.append(entry)
+
+    def digest(value: Any) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+    return {"frames": {root: digest(entry) for root, entry in entries.items()}, "cross_frame": digest(sorted(cross, key=str))}
+
+def diff_graphs(old_graph: Dict[str, Any], new_graph: Dict[str, Any]) -> Dict[str, Any]:
+    old, new = frame_fingerprints(old_graph), frame_fingerprints(new_graph)
+    old_frames, new_frames = old["frames"], new["frames"]
+    return {
+        "added": [f for f in new_frames if f not in old_frames],
+        "changed": [f for f in new_frames if f in old_frames and old_frames[f] != new_frames[f]],
+        "removed": [f for f in old_frames if f not in new_frames],
+        "cross_frame_changed": old["cross_frame"] != new["cross_frame"],
+        "total": len(new_frames),
+    }
+
+def frame_subgraph(graph: Dict[str, Any], frames: List[str]) -> Dict[str, Any]:
+    """The items and internal relations of the given top-level frames."""
+    wanted = set(frames)
+    roots = item_roots(graph)
+    items = {i: item for i, item in graph.get("items", {}).items() if roots.get(i) in wanted}
+    return {
+        "items": items,
+        "relations": [r for r in graph.get("relations", []) if r["source_id"] in items and r["target_id"] in items],
+        "frames": [f for f in graph.get("frames", []) if f in items],
+    }
+
+_STOPWORDS = {"the", "and", "for", "with", "from", "that", "this", "into", "agent", "tool"}
+
+def _words(text: str) -> Set[str]:
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", str(text))
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+def _overlap(words: Set[str], text: Set[str]) -> int:
+    # Prefix matches count, so "researcher" matches "research"
+    return sum(1 for w in words if w in text or any(len(t) > 3 and (w.startswith(t) or t.startswith(w)) for t in text))
+
+def attribute_components(components: Dict[str, Any], graph: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Best-effort provenance for components from a single, unpartitioned architect
+    call: a component belongs to the frame(s) whose text shares the most words
+    with its name and description. Components that match no frame get no frames
+    and are never dropped by a patch.
+    """
+    roots = item_roots(graph)
+    words: Dict[str, Set[str]] = {}
+    for item_id, item in graph.get("items", {}).items():
+        if roots[item_id] != UNFRAMED:
+            words.setdefault(roots[item_id], set()).update(_words(item.get("content", "")))
+
+    provenance: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in COMPONENT_KINDS}
+    for kind in COMPONENT_KINDS:
+        for component in components.get(kind, []):
+            component_words = _words(f"{component.get('name', '')} {component.get('description', '')}")
+            scores = {root: _overlap(component_words, text) for root, text in words.items()}
+            best = max(scores.values(), default=0)
+            provenance[kind][component.get("name", "")] = [root for root, score in scores.items() if best and score == best]
+    return provenance
+
+def patch_components(previous: Dict[str, Any], fresh: Dict[str, Any], touched: List[str],
+                     previous_graph: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace the components that came only from touched frames with the fresh
+    analysis of those frames. Everything else is kept exactly as it was.
+    Returns the patched components plus the normalized names that changed.
+    """
+    touched_set = set(touched)
+    provenance = previous.get("provenance") or attribute_components(previous, previous_graph)
+    fresh_provenance = fresh.get("provenance") or {}
+    patched: Dict[str, Any] = {k: v for k, v in previous.items() if k not in COMPONENT_KINDS and k != "provenance"}
+    patched["provenance"] = {kind: {} for kind in COMPONENT_KINDS}
+    changed: Set[str] = set()
+
+    for kind in COMPONENT_KINDS:
+        kept: Dict[str, Dict[str, Any]] = {}
+        patched[kind] = []
+        for component in previous.get(kind, []):
+            frames = provenance.get(kind, {}).get(component.get("name"), [])
+            if frames and set(frames) <= touched_set:
+                continue
+            kept[normalize_name(component.get("name", ""))] = component
+            patched[kind].append(component)
+            patched["provenance"][kind][component.get("name")] = list(frames)
+
+        dropped = {normalize_name(c.get("name", "")): c for c in previous.get(kind, [])
+                   if normalize_name(c.get("name", "")) not in kept}
+        for component in fresh.get(kind, []):
+            key = normalize_name(component.get("name", ""))
+            frames = fresh_provenance.get(kind, {}).get(component.get("name"), list(touched))
+            if key in kept:
+                sources = patched["provenance"][kind][kept[key]["name"]]
+                sources.extend(f for f in frames if f not in sources)
+                continue
+            kept[key] = component
+            patched[kind].append(component)
+            patched["provenance"][kind][component.get("name")] = list(frames)
+            if dropped.pop(key, None) != component:
+                changed.add(key)
+        # Dropped and not re-derived: the component is gone
+        changed.update(dropped)
+    return {"components": patched, "changed": sorted(changed)}
+
+def affected_workflows(workflow_plan: Dict[str, Any], changed: List[str]) -> List[str]:
+    """Names of workflows with a step assigned to, or using, a changed component."""
+    changed_set = set(changed)
+    affected = []
+    for workflow in workflow_plan.get("workflows", []):
+        for step in workflow.get("steps", []):
+            names = [step.get("assigned_to") or ""] + list(step.get("tools_required") or [])
+            if any(normalize_name(name) in changed_set for name in names):
+                affected.append(workflow.get("name"))
+                break
+    return affected
+
+def patch_workflows(previous: Dict[str, Any], regenerated: Dict[str, Any], affected: List[str]) -> Dict[str, Any]:
+    """
+    Swap in regenerated versions of the affected workflows, in place and by name.
+    Affected workflows the planner no longer returns are dropped; new ones are
+    appended; all others stay as they were.
+    """
+    fresh = {normalize_name(w.get("name", "")): w for w in regenerated.get("workflows", [])}
+    affected_keys = {normalize_name(name) for name in affected}
+    workflows = []
+    for workflow in previous.get("workflows", []):
+        key = normalize_name(workflow.get("name", ""))
+        if key not in affected_keys:
+            # Unaffected workflows are kept even if the planner returned them anyway
+            fresh.pop(key, None)
+            workflows.append(workflow)
+        elif key in fresh:
+            workflows.append(fresh.pop(key))
+    workflows.extend(fresh.values())
+    return {**previous, "workflows": workflows}
+
+def patch_spec(previous: Dict[str, Any], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Patch a freshly assembled spec into the previous one: entries that did not
+    change keep their previous form and position, top-level fields keep their
+    previous values, and only added, changed or removed entries differ.
+    """
+    patched = dict(previous)
+    for key in ("sub_agents", "tools", "workflows"):
+        fresh = {normalize_name(entry.get("name", "")): entry for entry in spec.get(key, [])}
+        entries = []
+        for entry in previous.get(key, []):
+            name = normalize_name(entry.get("name", ""))
+            if name in fresh:
+                new_entry = fresh.pop(name)
+                entries.append(entry if new_entry == entry else new_entry)
+        entries.extend(fresh.values())
+        patched[key] = entries
+    for field, value in spec.items():
+        patched.setdefault(field, value)
+    return patched
+
+def should_patch(diff: Dict[str, Any], max_fraction: float) -> bool:
+    """
+    Patching pays off only while most frames are unchanged. Changed connectors
+    between frames can reshape every component, so they always mean a full run.
+    """
+    if diff["cross_frame_changed"]:
+        return False
+    touched = len(diff["added"]) + len(diff["changed"]) + len(diff["removed"])
+    return touched <= max_fraction * max(1, diff["total"])
@@ -0,0 +1,186 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+# Ollama reports durations in nanoseconds
+OLLAMA_STAT_FIELDS = (
+    "prompt_eval_count", "eval_count", "total_duration",
+    "load_duration", "prompt_eval_duration", "eval_duration",
+)
+
+_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("run_id", default=None)
+_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("node", default=None)
+
+class Metrics:
+    """
+    Process-wide aggregate counters, rendered in the Prometheus text format.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counters = dict(self._counters)
+        result = {}
+        for (name, labels), value in counters.items():
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            result[f"{name}{{{label_str}}}" if label_str else name] = value
+        return result
+
+    def render_prometheus(self) -> str:
+        lines = []
+        typed = set()
+        for series, value in sorted(self.snapshot().items()):
+            name = series.split("{", 1)[0]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{series} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
+_trace_lock = threading.Lock()
+
+def current_run_id() -> Optional[str]:
+    return _run_id.get()
+
+def record(event: Dict[str, Any]):
+    """Append an event to the current run's JSON-lines trace."""
+    run_id = _run_id.get()
+    if not Config.TRACE_ENABLED or run_id is None:
+        return
+    event = {"ts": round(time.time(), 6), "run_id": run_id, "node": _node.get(), **event}
+    line = json.dumps(event, separators=(",", ":")) + "\n"
+    path = os.path.join(Config.TRACE_DIR, f"{run_id}.jsonl")
+    with _trace_lock:
+        try:
+            os.makedirs(Config.TRACE_DIR, exist_ok=True)
+            with open(path, "a") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+def record_http(service: str, method: str, url: str, status: Optional[int], seconds: float, bytes_sent: int, bytes_received: int):
+    metrics.inc("miro_agent_http_requests_total", service=service, status=status)
+    metrics.inc("miro_agent_http_seconds_total", seconds, service=service)
+    metrics.inc("miro_agent_http_bytes_sent_total", bytes_sent, service=service)
+    metrics.inc("miro_agent_http_bytes_received_total", bytes_received, service=service)
+    record({
+        "kind": "http", "service": service, "method": method, "url": url, "status": status,
+        "seconds": round(seconds, 6), "bytes_sent": bytes_sent, "bytes_received": bytes_received,
+    })
+
+def record_llm_call(model: str, seconds: float, bytes_sent: int = 0, bytes_received: int = 0,
+                    stats: Optional[Dict[str, Any]] = None, cache_hit: bool = False):
+    stats = stats or {}
+    prompt_tokens = stats.get("prompt_eval_count", 0)
+    completion_tokens = stats.get("eval_count", 0)
+    load_seconds = stats.get("load_duration", 0) / 1e9
+    metrics.inc("miro_agent_llm_calls_total", model=model, cache="hit" if cache_hit else "miss")
+    metrics.inc("miro_agent_llm_seconds_total", seconds, model=model)
+    metrics.inc("miro_agent_llm_prompt_tokens_total", prompt_tokens, model=model)
+    metrics.inc("miro_agent_llm_completion_tokens_total", completion_tokens, model=model)
+    metrics.inc("miro_agent_llm_load_seconds_total", load_seconds, model=model)
+    metrics.inc("miro_agent_llm_eval_seconds_total", stats.get("eval_duration", 0) / 1e9, model=model)
+    record({
+        "kind": "llm", "model": model, "seconds": round(seconds, 6), "cache_hit": cache_hit,
+        "bytes_sent": bytes_sent, "bytes_received": bytes_received,
+        "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+        "load_seconds": round(load_seconds, 6),
+        **{k: stats[k] for k in OLLAMA_STAT_FIELDS if k in stats},
+    })
+
+def traced_node(name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Wrap a graph node so its wall time and outcome are recorded, and HTTP/LLM
+    calls made inside it are attributed to the run and node.
+    """
+    @functools.wraps(fn)
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        run_id = state.get("run_id") or uuid.uuid4().hex[:12]
+        run_token = _run_id.set(run_id)
+        node_token = _node.set(name)
+        try:
+            started = time.perf_counter()
+            update = fn(state) or {}
+            seconds = time.perf_counter() - started
+
+            failed = bool(update.get("error")) and not state.get("error")
+            metrics.inc("miro_agent_node_calls_total", node=name)
+            metrics.inc("miro_agent_node_seconds_total", seconds, node=name)
+            if failed:
+                metrics.inc("miro_agent_node_errors_total", node=name)
+            record({"kind": "node", "seconds": round(seconds, 6), "error": update.get("error") if failed else None})
+        finally:
+            _node.reset(node_token)
+            _run_id.reset(run_token)
+
+        if Config.METRICS_FILE:
+            write_metrics(Config.METRICS_FILE)
+
+        if "run_id" not in state:
+            update = {**update, "run_id": run_id}
+        return update
+
+    return wrapper
+
+def propagate(fn: Callable) -> Callable:
+    """Carry the caller's run/node context into worker threads."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return wrapper
+
+def write_metrics(path: str):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(metrics.render_prometheus())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Expose the aggregate counters at /metrics on a background thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
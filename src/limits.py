@@ -0,0 +1,37 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+# Process-wide caps on in-flight requests per backend, shared by all concurrent runs
+_DEFAULTS = {
+    "miro": lambda: Config.MIRO_MAX_CONCURRENCY,
+    "ollama": lambda: Config.OLLAMA_MAX_CONCURRENCY,
+}
+_semaphores: Dict[str, Optional[threading.BoundedSemaphore]] = {}
+_lock = threading.Lock()
+
+def configure_limit(name: str, limit: Optional[int]):
+    """Set the limit for a backend; None or a value < 1 means unlimited."""
+    with _lock:
+        _semaphores[name] = threading.BoundedSemaphore(limit) if limit and limit > 0 else None
+
+def _semaphore(name: str) -> Optional[threading.BoundedSemaphore]:
+    with _lock:
+        if name not in _semaphores:
+            limit = _DEFAULTS[name]() if name in _DEFAULTS else None
+            _semaphores[name] = threading.BoundedSemaphore(limit) if limit and limit > 0 else None
+        return _semaphores[name]
+
+@contextmanager
+def limit(name: str):
+    semaphore = _semaphore(name)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
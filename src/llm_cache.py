@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Entries live in an in-memory LRU tier backed by an on-disk tier. Both tiers
+    honour a TTL; the memory tier is bounded by entry count and the disk tier by
+    total size, evicting the oldest files first. The disk size is counted as
+    entries are written, so the directory is only scanned once per process and
+    again when the count crosses the limit.
+    """
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_memory_entries: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.directory = directory or Config.LLM_CACHE_DIR
+        self.max_memory_entries = max_memory_entries if max_memory_entries is not None else Config.LLM_CACHE_MAX_ENTRIES
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else Config.LLM_CACHE_MAX_DISK_MB * 1024 * 1024
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.LLM_CACHE_TTL_SECONDS
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None # unknown until the first write scans the directory
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, data: str, options: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps(
+            {"model": model, "system": system_prompt, "data": data, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, serialized = entry
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return json.loads(serialized)
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        if now - record["created"] > self.ttl_seconds:
+            self._discard(path)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        serialized = json.dumps(record["value"])
+        with self._lock:
+            self._remember(key, record["created"], serialized)
+            self.stats["disk_hits"] += 1
+        return record["value"]
+
+    def set(self, key: str, value: Dict[str, Any]):
+        created = time.time()
+        serialized = json.dumps(value)
+        with self._lock:
+            self._remember(key, created, serialized)
+
+        # The disk tier is best-effort; a failed write must not fail the LLM call
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        data = f'{{"created":{created},"value":{serialized}}}'.encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            replaced = self._size(path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        if self._disk_bytes is None:
+            total = sum(size for _, _, size in self._disk_entries())
+            with self._lock:
+                self._disk_bytes = total
+        else:
+            with self._lock:
+                self._disk_bytes += len(data) - replaced
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path, _, _ in self._disk_entries():
+            self._remove(path)
+        with self._lock:
+            self._disk_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, created: float, serialized: str):
+        self._memory[key] = (created, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _evict_disk(self):
+        entries = self._disk_entries()
+        now = time.time()
+        total = 0
+        live = []
+        for path, mtime, size in entries:
+            if now - mtime > self.ttl_seconds:
+                self._remove(path)
+            else:
+                live.append((path, mtime, size))
+                total += size
+
+        # Evict below the limit so the next few writes do not trigger another scan
+        target = self.max_disk_bytes * 0.9
+        live.sort(key=lambda entry: entry[1])
+        for path, _, size in live:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+        # Resync with the directory, which other processes may share
+        with self._lock:
+            self._disk_bytes = total
+
+    def _discard(self, path: str):
+        size = self._size(path)
+        self._remove(path)
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
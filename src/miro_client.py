@@ -1,19 +1,55 @@
 import requests
 import re
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 
 try:
     from config import Config
-    from models import BoardItem, Position
+    from instrumentation import propagate, record_http
+    from limits import limit
+    from rate_limit import TokenBucket, miro_bucket, retry_delay
+    from models import BoardItem, Geometry, Position
+    from raw_store import RawPayloadStore
 except ImportError:
     from .config import Config
-    from .models import BoardItem, Position
+    from .instrumentation import propagate, record_http
+    from .limits import limit
+    from .rate_limit import TokenBucket, miro_bucket, retry_delay
+    from .models import BoardItem, Geometry, Position
+    from .raw_store import RawPayloadStore
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+def shared_session() -> requests.Session:
+    """
+    One keep-alive pool for every client in the process, so concurrent board
+    fetches (batch or service mode) reuse connections instead of opening new ones.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            pool_size = max(Config.MIRO_MAX_WORKERS, Config.MIRO_MAX_CONCURRENCY)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
 
 class MiroClient:
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, session: Optional[requests.Session] = None, keep_raw: Optional[bool] = None,
+                 bucket: Optional[TokenBucket] = None):
         self.access_token = access_token or Config.MIRO_ACCESS_TOKEN
-        self.base_url = "https://api.miro.com/v2"
-        
+        self.base_url = Config.MIRO_BASE_URL.rstrip("/")
+        self.session = session or shared_session()
+        self.keep_raw = Config.MIRO_KEEP_RAW if keep_raw is None else keep_raw
+        self.raw_store: Optional[RawPayloadStore] = None
+        self.bucket = bucket or miro_bucket()
+
     def get_headers(self) -> Dict[str, str]:
         if not self.access_token:
             raise ValueError("Miro Access Token is missing.")
@@ -28,30 +64,133 @@ class MiroClient:
             return match.group(1)
         raise ValueError("Invalid Miro Board URL")
 
+    def _get(self, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        GET with client-side throttling. 429s, 5xx responses and connection errors
+        are retried with backoff, so a pagination walk resumes at the failed page.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire(Config.MIRO_REQUEST_CREDITS)
+            try:
+                with limit("miro"):
+                    started = time.perf_counter()
+                    response = self.session.get(url, headers=headers, params=params)
+                    seconds = time.perf_counter() - started
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= Config.MIRO_MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+                print(f"Miro request failed ({e}), retrying in {delay:.1f}s")
+            else:
+                sent = len(url) + sum(len(k) + len(str(v)) for k, v in (params or {}).items())
+                record_http("miro", "GET", url, response.status_code, seconds, sent, len(response.content))
+                response_headers = getattr(response, "headers", None) or {}
+                self.bucket.update_from_headers(response_headers)
+
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt >= Config.MIRO_MAX_RETRIES:
+                    return response
+                delay = retry_delay(attempt, response_headers.get("Retry-After"))
+                if response.status_code == 429:
+                    # Every concurrent fetch backs off, not just this one
+                    self.bucket.pause(delay)
+                print(f"Miro returned {response.status_code}, retrying in {delay:.1f}s")
+
+            time.sleep(delay)
+            attempt += 1
+
+    def fetch_board(self, board_id: str) -> Dict[str, Any]:
+        response = self._get(f"{self.base_url}/boards/{board_id}", self.get_headers())
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch board: {response.text}")
+        return response.json()
+
     def fetch_board_items(self, board_id: str) -> List[BoardItem]:
+        """
+        Fetch every item and connector on a board.
+
+        The item and connector streams are walked concurrently. When the board spans
+        more than one page of items, the item stream is split by type so each type
+        is paginated in parallel. Results are merged and de-duplicated by id; when
+        they fall short of the board's reported total (an item type not in
+        MIRO_ITEM_TYPES and not on the first page), the unfiltered stream is walked
+        as well.
+        """
+        headers = self.get_headers()
+        items_url = f"{self.base_url}/boards/{board_id}/items"
+        connectors_url = f"{self.base_url}/boards/{board_id}/connectors"
+
+        with ThreadPoolExecutor(max_workers=Config.MIRO_MAX_WORKERS) as executor:
+            connectors = executor.submit(propagate(self._fetch_stream), connectors_url, {}, headers)
+
+            # Probe the first page; small boards are done after a single request
+            first_page, next_url, total = self._fetch_page(items_url, {"limit": Config.MIRO_PAGE_LIMIT}, headers)
+            raw_items = list(first_page)
+            if next_url:
+                types = list(Config.MIRO_ITEM_TYPES)
+                types += sorted({d["type"] for d in first_page if d.get("type") not in types})
+                streams = [
+                    executor.submit(propagate(self._fetch_stream), items_url, {"type": item_type}, headers)
+                    for item_type in types
+                ]
+                for stream in streams:
+                    raw_items.extend(stream.result())
+                fetched = len({d["id"] for d in raw_items})
+                if total is not None and fetched < total:
+                    print(f"Typed item streams returned {fetched} of {total} items, fetching all items unfiltered")
+                    raw_items.extend(self._fetch_stream(items_url, {}, headers))
+
+            raw_items.extend(connectors.result())
+
+        if self.keep_raw:
+            self.raw_store = RawPayloadStore.for_board(board_id)
+            self.raw_store.reset()
+
         items = []
-        url = f"{self.base_url}/boards/{board_id}/items"
-        params = {"limit": 50}
-        
+        unique = {}
+        for item_data in raw_items:
+            if item_data["id"] in unique:
+                continue
+            unique[item_data["id"]] = item_data
+            items.append(self._parse_item(item_data))
+        if self.raw_store is not None:
+            # One append for the whole board rather than an open per item
+            self.raw_store.add_many(unique.items())
+        return items
+
+    def _fetch_page(self, url: str, params: Dict[str, Any],
+                    headers: Dict[str, str]) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
+        """One page of a stream: its entries, the next page's URL and the stream's total, if reported."""
+        response = self._get(url, headers, params)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch {url} ({response.status_code}): {response.text}")
+
+        data = response.json()
+        return data.get("data", []), data.get("links", {}).get("next"), data.get("total")
+
+    def _fetch_stream(self, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> List[Dict[str, Any]]:
+        results = []
+        params = {**params, "limit": Config.MIRO_PAGE_LIMIT}
+
         while url:
-            response = requests.get(url, headers=self.get_headers(), params=params)
-            if response.status_code != 200:
-                raise Exception(f"Failed to fetch board items: {response.text}")
-            
-            data = response.json()
-            for item_data in data.get("data", []):
-                items.append(self._parse_item(item_data))
-            
-            url = data.get("links", {}).get("next")
+            page, url, _ = self._fetch_page(url, params, headers)
+            results.extend(page)
+            # The "next" link already carries the cursor and filters
             params = {}
-            
-        return items
+
+        return results
 
     def _parse_item(self, data: Dict[str, Any]) -> BoardItem:
         pos_data = data.get("position", {})
         position = None
         if "x" in pos_data and "y" in pos_data:
-            position = Position(x=pos_data["x"], y=pos_data["y"])
+            position = Position(x=pos_data["x"], y=pos_data["y"], relative_to=pos_data.get("relativeTo"))
+
+        geometry = None
+        geo_data = data.get("geometry", {})
+        if geo_data:
+            geometry = Geometry(width=geo_data.get("width"), height=geo_data.get("height"))
             
         content = ""
         if data["type"] == "sticky_note":
@@ -60,6 +199,11 @@ class MiroClient:
             content = data.get("data", {}).get("content", "")
         elif data["type"] == "shape":
              content = data.get("data", {}).get("content", "")
+        elif data["type"] in ("frame", "card", "app_card"):
+            content = data.get("data", {}).get("title", "")
+        elif data["type"] == "connector":
+            # Connectors come from their own endpoint and carry their label in captions
+            content = " ".join(c.get("content", "") for c in data.get("captions", []))
         
         content = self._clean_html(content)
 
@@ -68,9 +212,11 @@ class MiroClient:
             type=data["type"],
             content=content,
             position=position,
+            geometry=geometry,
             parent_id=data.get("parent", {}).get("id"),
-            style=data.get("style", {}),
-            metadata=data
+            modified_at=data.get("modifiedAt"),
+            start_id=data.get("startItem", {}).get("id"),
+            end_id=data.get("endItem", {}).get("id")
         )
 
     def _clean_html(self, raw_html: str) -> str:
@@ -6,26 +6,46 @@ from pydantic import BaseModel, Field
 class Position(BaseModel):
     x: float
     y: float
+    relative_to: Optional[str] = None # "canvas_center" or "parent_top_left"
+
+class Geometry(BaseModel):
+    width: Optional[float] = None
+    height: Optional[float] = None
 
 class BoardItem(BaseModel):
+    # Only the fields the parser and prompts use; raw payloads live in RawPayloadStore
     id: str
     type: str
     content: str = ""
     position: Optional[Position] = None
+    geometry: Optional[Geometry] = None
     parent_id: Optional[str] = None # For items inside frames
-    style: Dict[str, Any] = Field(default_factory=dict)
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    modified_at: Optional[str] = None # Miro "modifiedAt", used for incremental sync
+    start_id: Optional[str] = None # Connector endpoints
+    end_id: Optional[str] = None
+    style: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None # Legacy raw payload; not populated by MiroClient
 
 class Relation(BaseModel):
     source_id: str
     target_id: str
     type: str # e.g., "connected_to", "contains", "visually_near"
-    label: Optional[str] = None
+    label: Optional[str] = None # connector caption; "geometric" for bbox-derived containment
+
+class FlowAnalysis(BaseModel):
+    # Structure of the connected_to relations, computed by the parser
+    entries: List[str] = Field(default_factory=list) # Items no arrow leads into
+    exits: List[str] = Field(default_factory=list) # Items no arrow leads out of
+    order: List[str] = Field(default_factory=list) # Topological order; loop members are adjacent
+    branches: Dict[str, List[str]] = Field(default_factory=dict) # Fan-out: item -> targets
+    merges: Dict[str, List[str]] = Field(default_factory=dict) # Fan-in: item -> sources
+    loops: List[List[str]] = Field(default_factory=list) # Strongly connected components and self-loops
 
 class StructuralGraph(BaseModel):
     items: Dict[str, BoardItem] = Field(default_factory=dict)
     relations: List[Relation] = Field(default_factory=list)
     frames: List[str] = Field(default_factory=list) # List of frame IDs
+    flow: FlowAnalysis = Field(default_factory=FlowAnalysis)
 
 # --- Agent Build DSL (Output Format) ---
 
@@ -74,3 +94,14 @@ class AgentSpec(BaseModel):
                 "workflows": []
             }
         }
+
+# --- Stage Outputs (validated LLM responses) ---
+
+class ArchitectOutput(BaseModel):
+    name: Optional[str] = None
+    goal: Optional[str] = None
+    sub_agents: List[SubAgent] = Field(default_factory=list)
+    tools: List[AgentTool] = Field(default_factory=list)
+
+class WorkflowPlan(BaseModel):
+    workflows: List[AgentWorkflow] = Field(default_factory=list)
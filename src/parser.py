@@ -1,20 +1,52 @@
-from typing import List, Dict
+import statistics
+from typing import List, Dict, Optional
 
 try:
+    from columnar import ColumnarBoard, available as columnar_available
+    from config import Config
+    from flow import analyze_flow
     from models import BoardItem, StructuralGraph, Relation
+    from spatial import SpatialGrid, absolute_bboxes, bbox_gap
 except ImportError:
+    from .columnar import ColumnarBoard, available as columnar_available
+    from .config import Config
+    from .flow import analyze_flow
     from .models import BoardItem, StructuralGraph, Relation
+    from .spatial import SpatialGrid, absolute_bboxes, bbox_gap
 
 class LayoutParser:
-    def __init__(self, items: List[BoardItem]):
+    def __init__(self, items: List[BoardItem], near_distance: Optional[float] = None, max_neighbors: Optional[int] = None,
+                 columnar: Optional[bool] = None, board: Optional[ColumnarBoard] = None):
         self.items = {item.id: item for item in items}
         self.graph = StructuralGraph()
         self.graph.items = self.items
+        self.near_distance = Config.SPATIAL_NEAR_DISTANCE if near_distance is None else near_distance
+        self.max_neighbors = Config.SPATIAL_MAX_NEIGHBORS if max_neighbors is None else max_neighbors
+        if columnar is None:
+            columnar = Config.COLUMNAR_ENABLED and len(self.items) >= Config.COLUMNAR_MIN_ITEMS
+        self.columnar = columnar and columnar_available()
+        self.board = board  # A prebuilt (e.g. memory-mapped) columnar copy of the same items
+        self.container: Dict[str, str] = {}
 
     def parse(self) -> StructuralGraph:
+        # Large boards run the geometry and connector passes over NumPy columns
+        board = self.board
+        if board is None and self.columnar:
+            board = ColumnarBoard.from_items(list(self.items.values()))
         self._identify_frames()
         self._identify_containment()
-        self._identify_connectors()
+        if Config.SPATIAL_ENABLED:
+            if board is not None:
+                self._identify_spatial_columnar(board)
+            else:
+                self.bboxes = absolute_bboxes(self.items)
+                self._identify_geometric_containment()
+                self._identify_proximity()
+        if board is not None:
+            self._identify_connectors_columnar(board)
+        else:
+            self._identify_connectors()
+        self._analyze_flow()
         return self.graph
 
     def _identify_frames(self):
@@ -25,18 +57,122 @@ class LayoutParser:
     def _identify_containment(self):
         for item in self.items.values():
             if item.parent_id and item.parent_id in self.items:
+                self.container[item.id] = item.parent_id
                 self.graph.relations.append(Relation(
                     source_id=item.parent_id,
                     target_id=item.id,
                     type="contains"
                 ))
 
+    def _identify_geometric_containment(self):
+        # Items that sit inside a frame's bounds without being parented to it
+        loose = SpatialGrid(self._cell_size())
+        for item_id, box in self.bboxes.items():
+            if item_id not in self.container and self.items[item_id].type != "connector":
+                cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+                loose.insert(item_id, (cx, cy, cx, cy))
+
+        best: Dict[str, tuple] = {}
+        for frame_id in self.graph.frames:
+            frame = self.bboxes.get(frame_id)
+            if frame is None or frame[2] <= frame[0] or frame[3] <= frame[1]:
+                continue
+            area = (frame[2] - frame[0]) * (frame[3] - frame[1])
+            for item_id in loose.query(frame):
+                if item_id == frame_id:
+                    continue
+                box = self.bboxes[item_id]
+                cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+                if not (frame[0] <= cx <= frame[2] and frame[1] <= cy <= frame[3]):
+                    continue
+                if self.items[item_id].type == "frame":
+                    inner = (box[2] - box[0]) * (box[3] - box[1])
+                    if inner >= area:
+                        continue
+                # The smallest enclosing frame wins
+                if item_id not in best or area < best[item_id][0]:
+                    best[item_id] = (area, frame_id)
+
+        for item_id, (_, frame_id) in best.items():
+            self.container[item_id] = frame_id
+            self.graph.relations.append(Relation(
+                source_id=frame_id,
+                target_id=item_id,
+                type="contains",
+                label="geometric"
+            ))
+
+    def _identify_spatial_columnar(self, board: ColumnarBoard):
+        # Same relations as _identify_geometric_containment and _identify_proximity
+        boxes = board.absolute_bboxes()
+        self.bboxes = board.bbox_dict(boxes)
+        ids = [board.strings[ref] for ref in board.id.tolist()]
+        geometric = board.geometric_containment(boxes)
+        for row, frame in enumerate(geometric.tolist()):
+            if frame < 0:
+                continue
+            self.container[ids[row]] = ids[frame]
+            self.graph.relations.append(Relation(
+                source_id=ids[frame],
+                target_id=ids[row],
+                type="contains",
+                label="geometric"
+            ))
+
+        scope = board.parent.copy()
+        scope[scope < 0] = geometric[scope < 0]
+        sources, targets = board.proximity(boxes, scope, self.near_distance, self.max_neighbors)
+        for source, target in zip(sources.tolist(), targets.tolist()):
+            self.graph.relations.append(Relation(
+                source_id=ids[source],
+                target_id=ids[target],
+                type="visually_near"
+            ))
+
+    def _identify_proximity(self):
+        candidates = {
+            item_id: box for item_id, box in self.bboxes.items()
+            if self.items[item_id].type not in ("frame", "connector")
+        }
+        if not candidates or self.near_distance <= 0:
+            return
+
+        grid = SpatialGrid(self._cell_size())
+        for item_id, box in candidates.items():
+            grid.insert(item_id, box)
+
+        order = {item_id: index for index, item_id in enumerate(candidates)}
+        d = self.near_distance
+        for item_id, box in candidates.items():
+            scope = self.container.get(item_id)
+            neighbors = []
+            for other_id in grid.query((box[0] - d, box[1] - d, box[2] + d, box[3] + d)):
+                # Each pair once, and only between items in the same frame
+                if order[other_id] <= order[item_id] or self.container.get(other_id) != scope:
+                    continue
+                gap = bbox_gap(box, candidates[other_id])
+                if gap <= d:
+                    neighbors.append((gap, order[other_id], other_id))
+
+            for _, _, other_id in sorted(neighbors)[:self.max_neighbors]:
+                self.graph.relations.append(Relation(
+                    source_id=item_id,
+                    target_id=other_id,
+                    type="visually_near"
+                ))
+
+    def _cell_size(self) -> float:
+        # Cells around the typical item size keep both per-item cell counts and cell occupancy small
+        sizes = [max(b[2] - b[0], b[3] - b[1]) for b in self.bboxes.values()]
+        typical = statistics.median(sizes) if sizes else 0.0
+        return max(self.near_distance, typical, 1.0)
+
     def _identify_connectors(self):
         for item in self.items.values():
             if item.type == "connector":
-                data = item.metadata
-                start_item = data.get("startItem", {}).get("id")
-                end_item = data.get("endItem", {}).get("id")
+                data = item.metadata or {}
+                start_item = item.start_id or data.get("startItem", {}).get("id")
+                end_item = item.end_id or data.get("endItem", {}).get("id")
                 
                 if start_item and end_item:
                     self.graph.relations.append(Relation(
@@ -45,3 +181,18 @@ class LayoutParser:
                         type="connected_to",
                         label=item.content
                     ))
+
+    def _identify_connectors_columnar(self, board: ColumnarBoard):
+        rows, starts, ends = board.connector_endpoints()
+        content = board.content
+        for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+            self.graph.relations.append(Relation(
+                source_id=board.strings[start],
+                target_id=board.strings[end],
+                type="connected_to",
+                label=board.strings[int(content[row])]
+            ))
+
+    def _analyze_flow(self):
+        edges = [(r.source_id, r.target_id) for r in self.graph.relations if r.type == "connected_to"]
+        self.graph.flow = analyze_flow(list(self.items), edges)
@@ -0,0 +1,132 @@
+from typing import Dict, Any, List, Optional
+
+try:
+    from assembler import normalize_name
+    from graph_encoding import graph_token_estimate
+except ImportError:
+    from .assembler import normalize_name
+    from .graph_encoding import graph_token_estimate
+
+UNFRAMED = "__unframed__"
+
+def _root_frames(graph: Dict[str, Any]) -> Dict[str, str]:
+    """Map every item id to the id of its outermost containing frame (or UNFRAMED)."""
+    frames = set(graph.get("frames", []))
+    parent = {}
+    for rel in graph.get("relations", []):
+        if rel["type"] == "contains" and rel["source_id"] in frames:
+            parent[rel["target_id"]] = rel["source_id"]
+
+    roots = {}
+    for item_id in graph.get("items", {}):
+        node = item_id
+        seen = set()
+        while node in parent and node not in seen:
+            seen.add(node)
+            node = parent[node]
+        roots[item_id] = node if node in frames else UNFRAMED
+    return roots
+
+def item_roots(graph: Dict[str, Any]) -> Dict[str, str]:
+    """Like _root_frames, with each connector assigned to the frame of its start item."""
+    items = graph.get("items", {})
+    roots = _root_frames(graph)
+    for item_id, item in items.items():
+        if item.get("type") == "connector":
+            start = item.get("start_id") or (item.get("metadata") or {}).get("startItem", {}).get("id")
+            if start in roots:
+                roots[item_id] = roots[start]
+    return roots
+
+def partition_graph(graph: Dict[str, Any], target_tokens: int) -> Dict[str, Any]:
+    """
+    Split a StructuralGraph dict by top-level frame.
+
+    Small frames are packed together up to target_tokens so tiny frames do not
+    each cost a model call. Connectors between partitions are returned separately
+    as cross-frame edges described by frame title and item text.
+    """
+    items = graph.get("items", {})
+    # Connectors belong to the frame of their start item
+    roots = item_roots(graph)
+
+    groups: Dict[str, List[str]] = {}
+    for item_id, root in roots.items():
+        groups.setdefault(root, []).append(item_id)
+    relations: Dict[str, List[Dict[str, Any]]] = {}
+    for rel in graph.get("relations", []):
+        root = roots.get(rel["source_id"])
+        if root is not None and root == roots.get(rel["target_id"]):
+            relations.setdefault(root, []).append(rel)
+    frames = graph.get("frames", [])
+
+    def subgraph(group_roots: List[str]) -> Dict[str, Any]:
+        item_ids = [i for root in group_roots for i in groups[root]]
+        members = set(item_ids)
+        return {
+            "items": {i: items[i] for i in item_ids},
+            "relations": [r for root in group_roots for r in relations.get(root, [])],
+            "frames": [f for f in frames if f in members],
+        }
+
+    # Greedily pack consecutive groups up to the target size
+    partitions = []
+    pending: List[str] = []
+    pending_tokens = 0
+    for root in groups:
+        tokens = graph_token_estimate(subgraph([root]))
+        if pending and pending_tokens + tokens > target_tokens:
+            partitions.append({"frames": pending, "graph": subgraph(pending)})
+            pending, pending_tokens = [], 0
+        pending.append(root)
+        pending_tokens += tokens
+    if pending:
+        partitions.append({"frames": pending, "graph": subgraph(pending)})
+
+    def describe(item_id: str) -> str:
+        root = roots.get(item_id, UNFRAMED)
+        frame = (items[root].get("content") or root) if root != UNFRAMED else "(no frame)"
+        return f"{frame} / {items[item_id].get('content') or items[item_id].get('type')}"
+
+    cross_frame_edges = []
+    for rel in graph.get("relations", []):
+        if rel["type"] != "connected_to":
+            continue
+        source, target = rel["source_id"], rel["target_id"]
+        if source in items and target in items and roots.get(source) != roots.get(target):
+            cross_frame_edges.append([describe(source), describe(target), rel.get("label") or ""])
+
+    return {"partitions": partitions, "cross_frame_edges": cross_frame_edges}
+
+def merge_components(results: List[Dict[str, Any]], partition_frames: Optional[List[List[str]]] = None) -> Dict[str, Any]:
+    """
+    Reduce per-partition architect outputs into one component set, de-duplicating
+    sub-agents and tools by normalized name and recording which frames produced them.
+    The system name and goal come from the first partition that named them.
+    """
+    merged: Dict[str, Any] = {"sub_agents": [], "tools": [], "provenance": {"sub_agents": {}, "tools": {}}}
+    index: Dict[str, Dict[str, Dict[str, Any]]] = {"sub_agents": {}, "tools": {}}
+
+    for position, result in enumerate(results):
+        frames = partition_frames[position] if partition_frames else []
+        for field in ("name", "goal"):
+            if result.get(field) and not merged.get(field):
+                merged[field] = result[field]
+        for kind in ("sub_agents", "tools"):
+            for component in result.get(kind, []):
+                if not isinstance(component, dict) or not component.get("name"):
+                    continue
+                key = normalize_name(component["name"])
+                existing = index[kind].get(key)
+                if existing is None:
+                    index[kind][key] = component
+                    merged[kind].append(component)
+                    merged["provenance"][kind][component["name"]] = list(frames)
+                else:
+                    # Keep the first occurrence, filling fields it left empty
+                    for field, value in component.items():
+                        if value and not existing.get(field):
+                            existing[field] = value
+                    sources = merged["provenance"][kind][existing["name"]]
+                    sources.extend(f for f in frames if f not in sources)
+    return merged
@@ -0,0 +1,47 @@
+from typing import Any, Dict, List, Optional
+
+try:
+    from config import Config
+    from graph_encoding import estimate_tokens
+    from prompts import SHARED_SYSTEM_PROMPT
+except ImportError:
+    from .config import Config
+    from .graph_encoding import estimate_tokens
+    from .prompts import SHARED_SYSTEM_PROMPT
+
+def build_messages(instructions: str, data: str = "", board_context: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Lay out a stage's chat messages so every stage of a run starts with the same
+    bytes: the shared system prompt, then the board context, and only then the
+    stage's own instructions and data. Ollama can then reuse the prefill of the
+    shared prefix instead of re-reading the whole graph at every stage.
+    """
+    messages = [{"role": "system", "content": SHARED_SYSTEM_PROMPT}]
+    if board_context is not None:
+        messages.append({"role": "user", "content": f"Board Context:\n{board_context}"})
+    content = instructions.strip()
+    if data:
+        content += f"\n\nContext Data:\n{data}"
+    messages.append({"role": "user", "content": content})
+    return messages
+
+def _bucket(tokens: int) -> int:
+    size = Config.LLM_NUM_CTX_MIN
+    while size < tokens and size < Config.LLM_NUM_CTX_MAX:
+        size *= 2
+    return min(size, Config.LLM_NUM_CTX_MAX)
+
+def context_options(messages: List[Dict[str, str]], board_context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Pick num_ctx from the measured prompt size, rounded up to a power of two.
+    Changing num_ctx makes Ollama reload the model and drop its prefix cache, so
+    the size is driven by the board context (shared by all stages) plus a fixed
+    headroom; only a stage whose own prompt overflows that moves to a larger bucket.
+    """
+    prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+    shared_tokens = estimate_tokens(board_context or "") + estimate_tokens(SHARED_SYSTEM_PROMPT)
+    num_ctx = max(
+        _bucket(shared_tokens + Config.LLM_CONTEXT_HEADROOM),
+        _bucket(prompt_tokens + Config.LLM_OUTPUT_RESERVE),
+    )
+    return {"num_ctx": num_ctx}
@@ -0,0 +1,95 @@
+import random
+import threading
+import time
+from typing import Mapping, Optional
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+class TokenBucket:
+    """
+    Client-side token bucket shared by every request to one API in the process.
+
+    Tokens are Miro rate-limit credits. The bucket refills continuously and is
+    re-synchronised from the X-RateLimit-* response headers, so concurrent
+    fetches slow down together before the server starts returning 429s.
+    """
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def acquire(self, cost: float = 1.0):
+        """Block until cost tokens are available and no pause is in effect."""
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= cost:
+                        self.tokens -= cost
+                        return
+                    wait = (cost - self.tokens) / self.refill_per_second
+            time.sleep(min(max(wait, 0.001), 5.0))
+
+    def pause(self, seconds: float):
+        """Hold back every caller, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit:
+                self.capacity = limit
+            if remaining is not None:
+                # The server's view wins when it is stricter than ours
+                self.tokens = min(self.tokens, remaining)
+                if reset is not None:
+                    # Reset is either epoch seconds or seconds from now
+                    seconds = reset - time.time() if reset > 1e9 else reset
+                    if seconds > 0:
+                        # Refill to full capacity by the time the server's window resets
+                        self.refill_per_second = max(self.capacity - self.tokens, 1.0) / seconds
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name) if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number attempt (0-based): Retry-After if given, else full-jitter backoff."""
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    ceiling = min(Config.MIRO_BACKOFF_MAX, Config.MIRO_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+_miro_bucket: Optional[TokenBucket] = None
+_bucket_lock = threading.Lock()
+
+def miro_bucket() -> TokenBucket:
+    global _miro_bucket
+    with _bucket_lock:
+        if _miro_bucket is None:
+            credits = Config.MIRO_RATE_LIMIT_CREDITS
+            _miro_bucket = TokenBucket(credits, credits / 60.0)
+        return _miro_bucket
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from typing import Dict, Any, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    from config import Config
+except ImportError:
+    from .config import Config
+
+class RawPayloadStore:
+    """
+    Optional side-store for raw Miro item payloads.
+
+    Payloads are appended to a per-board spill file as "<id>\\t<json>" lines and
+    only an offset index is kept in memory; a payload is read and parsed only
+    when requested.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._offsets: Optional[Dict[str, Tuple[int, int]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_board(cls, board_id: str, root: Optional[str] = None) -> "RawPayloadStore":
+        root = root or Config.SNAPSHOT_DIR
+        return cls(os.path.join(root, f"{quote(board_id, safe='')}.raw"))
+
+    def reset(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            open(self.path, "wb").close()
+            self._offsets = {}
+
+    def add(self, item_id: str, payload: Dict[str, Any]):
+        self.add_many([(item_id, payload)])
+
+    def add_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Append many payloads with a single open and write of the spill file."""
+        lines = [(item_id, f"{item_id}\t{json.dumps(payload, separators=(',', ':'))}\n".encode("utf-8"))
+                 for item_id, payload in entries]
+        with self._lock:
+            if self._offsets is None:
+                self._offsets = self._load_index()
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(line for _, line in lines))
+            for item_id, line in lines:
+                self._offsets[item_id] = (offset, len(line))
+                offset += len(line)
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._offsets is None:
+                self._offsets = self._load_index()
+            location = self._offsets.get(item_id)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            line = f.read(length)
+        return json.loads(line.split(b"\t", 1)[1])
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._lock:
+            if self._offsets is None:
+                self._offsets = self._load_index()
+            return item_id in self._offsets
+
+    def _load_index(self) -> Dict[str, Tuple[int, int]]:
+        # Rebuild the index from the ids at the start of each line, without parsing payloads
+        offsets: Dict[str, Tuple[int, int]] = {}
+        if not os.path.exists(self.path):
+            return offsets
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                item_id = line.split(b"\t", 1)[0].decode("utf-8")
+                offsets[item_id] = (offset, len(line))
+                offset += len(line)
+        return offsets
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    from config import Config
+    from instrumentation import current_run_id, metrics
+except ImportError:
+    from .config import Config
+    from .instrumentation import current_run_id, metrics
+
+# Largest prompt (estimated tokens) and graph complexity the small model is trusted with
+PROFILES: Dict[str, Dict[str, int]] = {
+    "fast": {"max_prompt_tokens": 12000, "max_complexity": 400},
+    "balanced": {"max_prompt_tokens": 4000, "max_complexity": 120},
+    "quality": {"max_prompt_tokens": 0, "max_complexity": 0},
+}
+
+# Stages that only run when something already went wrong go straight to the large model
+LARGE_ONLY_STAGES = {"generator"}
+
+def graph_complexity(graph: Dict[str, Any]) -> int:
+    """Non-connector items plus twice the connections between them."""
+    items = graph.get("items", {})
+    connections = sum(1 for rel in graph.get("relations", []) if rel.get("type") == "connected_to")
+    return sum(1 for item in items.values() if item.get("type") != "connector") + 2 * connections
+
+class ModelRouter:
+    """
+    Picks the models to try for an LLM call, cheapest first, from the stage,
+    the prompt size and the graph's complexity under a latency/quality profile.
+    Every decision and its outcome is appended to a JSON-lines log for tuning.
+    """
+    def __init__(self, small_model: Optional[str] = None, large_model: Optional[str] = None,
+                 profile: Optional[str] = None, log_path: Optional[str] = None):
+        self.small_model = small_model if small_model is not None else Config.OLLAMA_SMALL_MODEL
+        self.large_model = large_model or Config.OLLAMA_MODEL
+        self.profile = profile or Config.ROUTER_PROFILE
+        if self.profile not in PROFILES:
+            raise ValueError(f"Unknown router profile '{self.profile}'. Choose from: {', '.join(PROFILES)}")
+        self.log_path = log_path if log_path is not None else Config.ROUTER_LOG
+        self._lock = threading.Lock()
+
+    def candidates(self, stage: Optional[str], prompt_tokens: int, complexity: int) -> List[str]:
+        limits = PROFILES[self.profile]
+        small_fits = (
+            self.small_model
+            and self.small_model != self.large_model
+            and stage not in LARGE_ONLY_STAGES
+            and prompt_tokens <= limits["max_prompt_tokens"]
+            and complexity <= limits["max_complexity"]
+        )
+        return [self.small_model, self.large_model] if small_fits else [self.large_model]
+
+    def record(self, stage: Optional[str], model: str, outcome: str, seconds: float,
+               prompt_tokens: int, complexity: int, error: Optional[str] = None):
+        """outcome: "ok", "escalated" (failed, the next model is tried) or "failed"."""
+        metrics.inc("miro_agent_llm_routes_total", stage=stage or "-", model=model, outcome=outcome)
+        # With a single model there is nothing to tune
+        if not self.log_path or not self.small_model:
+            return
+        entry = {
+            "ts": round(time.time(), 3), "run_id": current_run_id(), "stage": stage, "profile": self.profile,
+            "model": model, "outcome": outcome, "seconds": round(seconds, 3),
+            "prompt_tokens": prompt_tokens, "complexity": complexity, "error": error,
+        }
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            except OSError:
+                pass
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+def get_router() -> ModelRouter:
+    global _router
+    with _router_lock:
+        key = (Config.OLLAMA_SMALL_MODEL, Config.OLLAMA_MODEL, Config.ROUTER_PROFILE, Config.ROUTER_LOG)
+        if _router is None or (_router.small_model, _router.large_model, _router.profile, _router.log_path) != key:
+            _router = ModelRouter()
+        return _router
@@ -1,27 +1,70 @@
 import argparse
+import importlib
 import json
+import re
 import sys
 import os
+import time
 
-# Ensure src is in path if running from root
-sys.path.append(os.path.join(os.getcwd(), "src"))
+# Heavy modules (langgraph, requests, pydantic, dotenv) are imported lazily so that
+# `--help` and light subcommands only pay for what they use.
 
-try:
-    from agent import app
-    from config import Config
-except ImportError:
-    from src.agent import app
-    from src.config import Config
+def _import(module: str):
+    """Import a sibling module, whether running as a script or as part of the src package."""
+    if __package__:
+        return importlib.import_module(f".{module}", __package__)
+    return importlib.import_module(module)
 
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Miro Board to Agent DSL Converter")
-    parser.add_argument("url", help="Miro Board URL")
+    parser.add_argument("url", nargs="*", help="Miro Board URL(s); more than one runs in batch mode")
     parser.add_argument("--output", "-o", help="Output file for DSL JSON", default="agent_plan.json")
-    
+    parser.add_argument("--metrics-port", type=int, help="Serve aggregate counters at http://127.0.0.1:PORT/metrics (default: METRICS_PORT)")
+    parser.add_argument("--list-runs", action="store_true", help="List recent checkpointed runs and exit")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a failed run at the node that failed ('last' for the latest failed run)")
+    parser.add_argument("--stage", help="With --resume: re-run only this stage from its saved input state")
+    parser.add_argument("--stream", action="store_true", help="Stream LLM output and show live progress")
+    parser.add_argument("--manifest", help="Batch mode: file with one board URL per line, or a JSON list of URLs")
+    parser.add_argument("--output-dir", default="agent_plans", help="Batch mode: directory for per-board outputs and the summary")
+    parser.add_argument("--jobs", type=int, default=4, help="Batch mode: boards processed concurrently")
+    parser.add_argument("--miro-concurrency", type=int, help="Max in-flight Miro API requests (default: MIRO_MAX_CONCURRENCY)")
+    parser.add_argument("--ollama-concurrency", type=int, help="Max in-flight Ollama requests (default: OLLAMA_MAX_CONCURRENCY)")
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived HTTP job service instead of a one-shot run")
+    parser.add_argument("--host", help="Service mode: address to bind (default: SERVICE_HOST)")
+    parser.add_argument("--port", type=int, help="Service mode: port to listen on (default: SERVICE_PORT)")
+    parser.add_argument("--workers", type=int, help="Service mode: boards processed concurrently (default: SERVICE_WORKERS)")
+    return parser
+
+def main():
+    parser = build_arg_parser()
     args = parser.parse_args()
+    if args.list_runs:
+        print_runs()
+        return
+    urls = list(args.url)
+    if args.manifest:
+        urls.extend(load_manifest(args.manifest))
+    if args.serve and (urls or args.resume):
+        parser.error("--serve does not take board URLs; submit them to POST /jobs")
+    if not urls and not args.resume and not args.serve:
+        parser.error("a board URL or --manifest is required")
+    if args.stage and not args.resume:
+        parser.error("--stage requires --resume")
     
-    print(f"Starting Miro Agent for URL: {args.url}")
+    Config = _import("config").Config
+    limits = _import("limits")
+    agent = _import("agent")
     Config.validate()
+    if args.stream:
+        Config.LLM_STREAM = True
+    if args.miro_concurrency is not None:
+        limits.configure_limit("miro", args.miro_concurrency)
+    if args.ollama_concurrency is not None:
+        limits.configure_limit("ollama", args.ollama_concurrency)
+    metrics_port = Config.METRICS_PORT if args.metrics_port is None else args.metrics_port
+    if metrics_port:
+        _import("instrumentation").serve_metrics(metrics_port)
+        print(f"Metrics available at http://127.0.0.1:{metrics_port}/metrics")
     
     # Set LangSmith Environment Variables
     if Config.LANGCHAIN_TRACING_V2:
@@ -32,29 +75,59 @@ def main():
         os.environ["LANGCHAIN_API_KEY"] = Config.LANGCHAIN_API_KEY
     if Config.LANGCHAIN_PROJECT:
         os.environ["LANGCHAIN_PROJECT"] = Config.LANGCHAIN_PROJECT
+
+    if args.serve:
+        # One process keeps the compiled graph, HTTP pools, caches and a warm model
+        _import("service").serve(agent.get_app(), warm=agent.warm_model, host=args.host, port=args.port, workers=args.workers)
+        return
+
+    if len(urls) > 1 or args.manifest:
+        summary = run_batch(urls, args.output_dir, args.jobs, agent.get_app())
+        if agent.llm_cache is not None:
+            print(f"LLM cache stats: {agent.llm_cache.stats}")
+        if any(entry["status"] != "ok" for entry in summary["boards"]):
+            sys.exit(1)
+        return
     
-    initial_state = {"board_url": args.url}
-    result = app.invoke(initial_state)
+    if args.resume:
+        run_id = args.resume
+        if run_id == "last":
+            failed = _import("checkpoints").get_checkpoint_store().list_runs(status="failed", limit=1)
+            if not failed:
+                print("No failed runs to resume.")
+                sys.exit(1)
+            run_id = failed[0]["run_id"]
+        try:
+            result = agent.rerun_stage(run_id, args.stage) if args.stage else agent.resume_run(run_id)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    else:
+        print(f"Starting Miro Agent for URL: {urls[0]}")
+        initial_state = {"board_url": urls[0]}
+        result = agent.get_app().invoke(initial_state)
+    if agent.llm_cache is not None:
+        print(f"LLM cache stats: {agent.llm_cache.stats}")
+    if Config.TRACE_ENABLED and result.get("run_id"):
+        print(f"Run trace: {os.path.join(Config.TRACE_DIR, result['run_id'] + '.jsonl')}")
     
     if result.get("error"):
         print(f"Error: {result['error']}")
         sys.exit(1)
+
+    if args.resume and args.stage and not result.get("agent_dsl"):
+        # A stage re-run stops after that stage; its later checkpoints were discarded
+        print(f"Re-ran {args.stage} of run {result['run_id']}. "
+              f"Run with --resume {result['run_id']} to continue with the remaining stages.")
+        return
         
     dsl = result.get("agent_dsl")
     if dsl:
         print("\n--- Generated Agent DSL ---\n")
         print(json.dumps(dsl, indent=2))
         
-        # Save JSON
-        with open(args.output, "w") as f:
-            json.dump(dsl, f, indent=2)
-        print(f"\nJSON Plan saved to {args.output}")
-        
-        # Save Plain Text/Markdown
-        text_output_file = args.output.rsplit('.', 1)[0] + ".md"
-        text_plan = format_dsl_to_text(dsl)
-        with open(text_output_file, "w") as f:
-            f.write(text_plan)
+        json_file, text_output_file, text_plan = write_plan(dsl, args.output)
+        print(f"\nJSON Plan saved to {json_file}")
         print(f"Text Plan saved to {text_output_file}")
         
         # Print Text Plan to console for immediate view
@@ -63,6 +136,111 @@ def main():
     else:
         print("Failed to generate DSL.")
 
+def print_runs():
+    store = _import("checkpoints").get_checkpoint_store()
+    runs = store.list_runs()
+    if not runs:
+        print("No checkpointed runs.")
+        return
+    for run in runs:
+        updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["updated"]))
+        done = store.completed_nodes(run["run_id"])
+        line = f"{run['run_id']}  {run['status']:<9}  {updated}  {run['board_id'] or run['board_url']}  last stage: {done[-1] if done else '-'}"
+        if run["status"] == "failed":
+            line += f"  failed at {run['failed_node']}: {run['error']}"
+        print(line)
+
+def write_plan(dsl: dict, output: str):
+    """
+    Save the DSL as JSON and its Markdown rendering next to it.
+    """
+    with open(output, "w") as f:
+        json.dump(dsl, f, indent=2)
+
+    text_output_file = output.rsplit('.', 1)[0] + ".md"
+    text_plan = format_dsl_to_text(dsl)
+    with open(text_output_file, "w") as f:
+        f.write(text_plan)
+    return output, text_output_file, text_plan
+
+def load_manifest(path: str) -> list:
+    with open(path, "r") as f:
+        content = f.read()
+    if content.lstrip().startswith("["):
+        return [str(url) for url in json.loads(content)]
+    return [line.strip() for line in content.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+def _board_file_stem(url: str, index: int) -> str:
+    from urllib.parse import quote
+
+    match = re.search(r"board/([^/?#]+)", url)
+    return quote(match.group(1), safe="") if match else f"board_{index}"
+
+def run_batch(urls: list, output_dir: str, jobs: int, app) -> dict:
+    """
+    Run every board through the compiled graph concurrently and write one
+    JSON/Markdown pair per board plus summary.json to output_dir. A board listed
+    more than once (by any URL) is run once; the repeats are listed as duplicates.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    board_key = _import("service").board_key
+
+    first_url = {}
+    duplicates = []
+    for url in urls:
+        key = board_key(url)
+        if key in first_url:
+            duplicates.append({"url": url, "duplicate_of": first_url[key]})
+        else:
+            first_url[key] = url
+    urls = list(first_url.values())
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Starting batch of {len(urls)} boards ({jobs} concurrent)")
+    if duplicates:
+        print(f"Skipping {len(duplicates)} duplicate manifest entries")
+
+    def run_one(index: int, url: str) -> dict:
+        started = time.perf_counter()
+        entry = {"url": url, "status": "ok"}
+        try:
+            result = app.invoke({"board_url": url})
+        except Exception as e:
+            result = {"error": str(e)}
+        entry["board_id"] = result.get("board_id")
+        entry["run_id"] = result.get("run_id")
+        if result.get("error"):
+            entry["status"] = "error"
+            entry["error"] = result["error"]
+        elif not result.get("agent_dsl"):
+            entry["status"] = "error"
+            entry["error"] = "Failed to generate DSL."
+        else:
+            output = os.path.join(output_dir, _board_file_stem(url, index) + ".json")
+            entry["json"], entry["markdown"], _ = write_plan(result["agent_dsl"], output)
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        print(f"[{entry['status']}] {url} ({entry['seconds']}s)")
+        return entry
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        boards = list(executor.map(run_one, range(len(urls)), urls))
+
+    ok = sum(1 for entry in boards if entry["status"] == "ok")
+    summary = {
+        "total": len(boards),
+        "succeeded": ok,
+        "failed": len(boards) - ok,
+        "seconds": round(time.perf_counter() - started, 3),
+        "boards": boards,
+        "duplicates": duplicates,
+    }
+    summary_file = os.path.join(output_dir, "summary.json")
+    with open(summary_file, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\nBatch finished: {ok}/{len(boards)} succeeded in {summary['seconds']}s. Summary saved to {summary_file}")
+    return summary
+
 def format_dsl_to_text(dsl: dict) -> str:
     lines = []
     lines.append(f"# Agent System: {dsl.get('name', 'Unnamed System')}")
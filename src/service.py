@@ -0,0 +1,262 @@
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from config import Config
+    from instrumentation import metrics
+except ImportError:
+    from .config import Config
+    from .instrumentation import metrics
+
+def board_key(url: str) -> str:
+    """Identify a board by its id, so different URLs for one board share a job."""
+    match = re.search(r"board/([^/?#]+)", url)
+    return match.group(1) if match else url.strip()
+
+class Job:
+    def __init__(self, board_url: str, priority: int):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.board_url = board_url
+        self.board_key = board_key(board_url)
+        self.priority = priority
+        self.status = "queued"  # queued -> running -> done | failed
+        self.submissions = 1
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.run_id: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "board_url": self.board_url,
+            "status": self.status,
+            "priority": self.priority,
+            "submissions": self.submissions,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "run_id": self.run_id,
+            "error": self.error,
+        }
+
+class JobQueue:
+    """
+    Board jobs on a priority queue (higher priority first, then FIFO) worked by a
+    pool of threads over one compiled app. A submission for a board that is
+    already queued or running joins that job instead of starting another run.
+    """
+    def __init__(self, app, workers: int = 2, max_jobs: Optional[int] = None):
+        self.app = app
+        self.workers = max(1, workers)
+        self.max_jobs = Config.SERVICE_MAX_JOBS if max_jobs is None else max_jobs
+        self._queue: "queue.PriorityQueue[Tuple[int, int, Optional[str]]]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, str] = {}  # board key -> job id while queued or running
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        # Sentinels sort after every real job, so queued work drains first
+        for _ in self._threads:
+            self._queue.put((2 ** 31, next(self._sequence), None))
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, board_url: str, priority: int = 0) -> Tuple[Job, bool]:
+        """Queue a board; returns the job and whether a new run was created."""
+        key = board_key(board_url)
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                job = self._jobs[active]
+                job.submissions += 1
+                metrics.inc("miro_agent_service_jobs_deduplicated_total")
+                if job.status == "queued" and priority > job.priority:
+                    # Re-queue at the higher priority; the stale entry is skipped when popped
+                    job.priority = priority
+                    self._queue.put((-priority, next(self._sequence), job.job_id))
+                return job, False
+
+            job = Job(board_url, priority)
+            self._jobs[job.job_id] = job
+            self._active[key] = job.job_id
+            self._queue.put((-priority, next(self._sequence), job.job_id))
+            metrics.inc("miro_agent_service_jobs_submitted_total")
+            return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue
+                job.status = "running"
+                job.started = time.time()
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        try:
+            result = self.app.invoke({"board_url": job.board_url})
+        except Exception as e:
+            result = {"error": str(e)}
+        with self._lock:
+            job.run_id = result.get("run_id")
+            if result.get("error"):
+                job.status, job.error = "failed", result["error"]
+            elif not result.get("agent_dsl"):
+                job.status, job.error = "failed", "Failed to generate DSL."
+            else:
+                job.status, job.result = "done", result["agent_dsl"]
+            job.finished = time.time()
+            self._active.pop(job.board_key, None)
+            self._prune()
+        metrics.inc("miro_agent_service_jobs_finished_total", status=job.status)
+        job.done.set()
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once more than max_jobs are kept
+        finished = [job for job in self._jobs.values() if job.finished is not None]
+        for job in sorted(finished, key=lambda job: job.finished)[: max(0, len(finished) - self.max_jobs)]:
+            del self._jobs[job.job_id]
+
+def keep_warm(warm: Callable[[], None], interval: float, stop: threading.Event) -> threading.Thread:
+    """Call warm() now and then every interval seconds until stop is set."""
+    def loop():
+        while True:
+            try:
+                warm()
+            except Exception as e:
+                print(f"Model warm-up failed: {e}")
+            if stop.wait(interval):
+                return
+    thread = threading.Thread(target=loop, name="keep-warm", daemon=True)
+    thread.start()
+    return thread
+
+def create_server(jobs: JobQueue, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    HTTP front end for a JobQueue:
+
+        POST /jobs                  {"url": ..., "priority": 0} -> 202 job status
+        GET  /jobs/<id>             job status
+        GET  /jobs/<id>/result      200 with the DSL, 202 while pending, 422 if failed;
+                                    ?wait=SECONDS blocks until the job finishes
+        GET  /health                queue counts
+        GET  /metrics               aggregate counters (Prometheus text)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any, content_type: str = "application/json"):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip("/") != "/jobs":
+                self._send(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                url = payload["url"]
+                if not isinstance(url, str) or not url.strip():
+                    raise ValueError("url must be a non-empty string")
+                priority = int(payload.get("priority", 0))
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": "Expected a JSON body with a non-empty string 'url' and optional integer 'priority'"})
+                return
+            job, created = jobs.submit(url, priority)
+            self._send(202, {**job.to_dict(), "deduplicated": not created})
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = [part for part in parsed.path.split("/") if part]
+            if parts == ["health"]:
+                self._send(200, {"status": "ok", "workers": jobs.workers, "jobs": jobs.counts()})
+            elif parts == ["metrics"]:
+                self._send(200, metrics.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            elif len(parts) in (2, 3) and parts[0] == "jobs" and parts[2:] in ([], ["result"]):
+                job = jobs.get(parts[1])
+                if job is None:
+                    self._send(404, {"error": f"Unknown job: {parts[1]}"})
+                elif len(parts) == 2:
+                    self._send(200, job.to_dict())
+                else:
+                    self._send_result(job, parse_qs(parsed.query).get("wait", ["0"])[0])
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def _send_result(self, job: Job, wait: str):
+            try:
+                job.done.wait(max(0.0, float(wait)))
+            except ValueError:
+                self._send(400, {"error": "wait must be a number of seconds"})
+                return
+            if job.status == "done":
+                self._send(200, {"job_id": job.job_id, "run_id": job.run_id, "agent_dsl": job.result})
+            elif job.status == "failed":
+                self._send(422, job.to_dict())
+            else:
+                self._send(202, job.to_dict())
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+def serve(app, warm: Optional[Callable[[], None]] = None, host: Optional[str] = None,
+          port: Optional[int] = None, workers: Optional[int] = None) -> None:
+    """Run the job service until interrupted."""
+    jobs = JobQueue(app, workers=Config.SERVICE_WORKERS if workers is None else workers)
+    jobs.start()
+    stop = threading.Event()
+    if warm is not None and Config.OLLAMA_KEEP_WARM_SECONDS > 0:
+        keep_warm(warm, Config.OLLAMA_KEEP_WARM_SECONDS, stop)
+
+    server = create_server(jobs, host or Config.SERVICE_HOST, Config.SERVICE_PORT if port is None else port)
+    bound_host, bound_port = server.server_address[:2]
+    print(f"Serving board jobs at http://{bound_host}:{bound_port} ({jobs.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down")
+    finally:
+        stop.set()
+        server.server_close()
+        jobs.stop(timeout=5)
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    from config import Config
+    from models import BoardItem
+except ImportError:
+    from .config import Config
+    from .models import BoardItem
+
+class BoardSnapshot:
+    def __init__(self, board_id: str, board_modified_at: Optional[str], items: List[BoardItem]):
+        self.board_id = board_id
+        self.board_modified_at = board_modified_at
+        self.items = items
+
+class SnapshotStore:
+    """
+    Persists the last fetched item set of each board on local disk.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or Config.SNAPSHOT_DIR
+
+    def _path(self, board_id: str) -> str:
+        # Board ids may contain characters such as '=' that are unsafe in file names
+        return os.path.join(self.root, f"{quote(board_id, safe='')}.json")
+
+    def load(self, board_id: str) -> Optional[BoardSnapshot]:
+        path = self._path(board_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            items = [BoardItem(**item) for item in data.get("items", [])]
+        except (ValueError, TypeError):
+            # A corrupt snapshot is treated as missing; the next save replaces it
+            return None
+        return BoardSnapshot(board_id, data.get("board_modified_at"), items)
+
+    def save(self, board_id: str, board_modified_at: Optional[str], items: List[BoardItem]):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(board_id)
+        data = {
+            "board_id": board_id,
+            "board_modified_at": board_modified_at,
+            "items": [item.dict(exclude_none=True) for item in items],
+        }
+        # A unique temp file per writer, so concurrent runs of one board never share a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+def merge_items(cached: List[BoardItem], fresh: List[BoardItem]) -> Tuple[List[BoardItem], Dict[str, List[str]]]:
+    """
+    Merge a fresh fetch into the cached item set, keeping cached items whose
+    modifiedAt is unchanged. Returns the merged items and the diff.
+    """
+    cached_by_id = {item.id: item for item in cached}
+    diff = {"added": [], "changed": [], "removed": []}
+    merged = []
+
+    for item in fresh:
+        previous = cached_by_id.pop(item.id, None)
+        if previous is None:
+            diff["added"].append(item.id)
+            merged.append(item)
+        elif item.modified_at is not None and previous.modified_at == item.modified_at:
+            merged.append(previous)
+        else:
+            diff["changed"].append(item.id)
+            merged.append(item)
+
+    diff["removed"] = list(cached_by_id)
+    return merged, diff
@@ -0,0 +1,90 @@
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from models import BoardItem
+except ImportError:
+    from .models import BoardItem
+
+# (min_x, min_y, max_x, max_y) in absolute board coordinates
+BBox = Tuple[float, float, float, float]
+
+def absolute_bboxes(items: Dict[str, BoardItem]) -> Dict[str, BBox]:
+    """
+    Compute absolute bounding boxes for every positioned item.
+
+    Miro positions are item centers; children of frames are positioned relative
+    to their parent's top-left corner, so parents are resolved first.
+    """
+    boxes: Dict[str, BBox] = {}
+
+    def resolve(item_id: str, depth: int = 0) -> Optional[BBox]:
+        if item_id in boxes:
+            return boxes[item_id]
+        item = items.get(item_id)
+        if item is None or item.position is None or depth > 32:
+            return None
+
+        x, y = item.position.x, item.position.y
+        relative = item.position.relative_to == "parent_top_left" or (
+            item.position.relative_to is None and item.parent_id is not None
+        )
+        if relative and item.parent_id:
+            parent = resolve(item.parent_id, depth + 1)
+            if parent is not None:
+                x += parent[0]
+                y += parent[1]
+
+        width = (item.geometry.width if item.geometry else None) or 0.0
+        height = (item.geometry.height if item.geometry else None) or 0.0
+        box = (x - width / 2, y - height / 2, x + width / 2, y + height / 2)
+        boxes[item_id] = box
+        return box
+
+    for item_id in items:
+        resolve(item_id)
+    return boxes
+
+def bbox_gap(a: BBox, b: BBox) -> float:
+    dx = max(0.0, b[0] - a[2], a[0] - b[2])
+    dy = max(0.0, b[1] - a[3], a[1] - b[3])
+    return math.hypot(dx, dy)
+
+class SpatialGrid:
+    """
+    Uniform grid hash over bounding boxes. Each box is registered in every cell
+    it overlaps, so a query only inspects items in nearby cells.
+    """
+    def __init__(self, cell_size: float):
+        self.cell_size = max(cell_size, 1e-6)
+        self.cells: Dict[Tuple[int, int], List[str]] = {}
+
+    def _cell_range(self, box: BBox) -> Iterable[Tuple[int, int]]:
+        size = self.cell_size
+        x0, y0 = math.floor(box[0] / size), math.floor(box[1] / size)
+        x1, y1 = math.floor(box[2] / size), math.floor(box[3] / size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    def insert(self, key: str, box: BBox):
+        for cell in self._cell_range(box):
+            self.cells.setdefault(cell, []).append(key)
+
+    def query(self, box: BBox) -> Set[str]:
+        # Large query boxes visit only occupied cells
+        size = self.cell_size
+        span = (math.floor(box[2] / size) - math.floor(box[0] / size) + 1) * (
+            math.floor(box[3] / size) - math.floor(box[1] / size) + 1
+        )
+        found: Set[str] = set()
+        if span > len(self.cells):
+            x0, y0 = math.floor(box[0] / size), math.floor(box[1] / size)
+            x1, y1 = math.floor(box[2] / size), math.floor(box[3] / size)
+            for (cx, cy), keys in self.cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    found.update(keys)
+            return found
+        for cell in self._cell_range(box):
+            found.update(self.cells.get(cell, ()))
+        return found
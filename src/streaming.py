@@ -0,0 +1,174 @@
+import json
+import time
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+class StreamAborted(Exception):
+    """Raised when a streamed generation is cut off before completion."""
+
+class IncrementalJSONParser:
+    """
+    Incremental scanner over a streamed JSON object.
+
+    Tracks string/escape state and container nesting so that each element of a
+    watched top-level array (e.g. "sub_agents" or "workflows") is reported as soon
+    as it closes, and structurally broken output is detected mid-stream.
+    """
+    def __init__(
+        self,
+        watched_keys: Iterable[str] = ("sub_agents", "tools", "workflows"),
+        on_element: Optional[Callable[[str, Any], None]] = None,
+        max_preamble: int = 200,
+    ):
+        self.watched_keys = set(watched_keys)
+        self.on_element = on_element
+        self.max_preamble = max_preamble
+        self.elements: Dict[str, List[Any]] = {key: [] for key in self.watched_keys}
+        self.done = False
+        self._chunks: List[str] = []
+        self._chunk_offsets: List[int] = []
+        self._length = 0
+        self._end = 0 # index just past the top-level '}'
+        self._start = None # index of the top-level '{'
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._element_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk and return the (key, element) pairs completed by it.
+        Raises StreamAborted if the output can no longer be valid JSON.
+        """
+        base = self._length
+        self._chunks.append(chunk)
+        self._chunk_offsets.append(base)
+        self._length += len(chunk)
+        completed = []
+
+        for offset, ch in enumerate(chunk):
+            if self.done:
+                break
+            i = base + offset
+
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._stack.append("{")
+                elif i >= self.max_preamble:
+                    raise StreamAborted("no JSON object found at the start of the output")
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = self._slice(self._string_start + 1, i)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if len(self._stack) == 1 and ch == "[" and self._last_key in self.watched_keys:
+                    self._array_key = self._last_key
+                elif len(self._stack) == 2 and self._array_key is not None:
+                    self._element_start = i
+                self._stack.append(ch)
+            elif ch in "}]":
+                expected = "{" if ch == "}" else "["
+                if not self._stack or self._stack[-1] != expected:
+                    raise StreamAborted(f"unbalanced '{ch}' at offset {i}")
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 2 and self._element_start is not None:
+                    element = self._complete_element(self._slice(self._element_start, i + 1))
+                    self._element_start = None
+                    if element is not None:
+                        completed.append((self._array_key, element))
+                elif depth == 1:
+                    self._array_key = None
+                elif depth == 0:
+                    self.done = True
+                    self._end = i + 1
+
+        for key, element in completed:
+            if self.on_element:
+                self.on_element(key, element)
+        return completed
+
+    def result(self) -> Dict[str, Any]:
+        if not self.done:
+            raise StreamAborted("output ended before the JSON object was closed")
+        return json.loads(self._slice(self._start, self._end))
+
+    def _slice(self, start: int, end: int) -> str:
+        # Join only the chunks that overlap [start, end)
+        first = bisect_right(self._chunk_offsets, start) - 1
+        last = bisect_right(self._chunk_offsets, end - 1) - 1
+        joined = "".join(self._chunks[first:last + 1])
+        base = self._chunk_offsets[first]
+        return joined[start - base:end - base]
+
+    def _complete_element(self, raw: str) -> Optional[Any]:
+        try:
+            element = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        self.elements[self._array_key].append(element)
+        return element
+
+def consume_ollama_stream(
+    lines: Iterable[bytes],
+    parser: IncrementalJSONParser,
+    max_tokens: int,
+    max_seconds: float,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Feed Ollama's newline-delimited /api/chat stream into the parser, enforcing
+    a token and wall-clock budget. Returns the parsed object and latency metrics.
+    """
+    started = time.perf_counter()
+    metrics: Dict[str, Any] = {"time_to_first_token": None, "tokens": 0, "bytes_received": 0, "stats": {}}
+
+    for line in lines:
+        if not line:
+            continue
+        metrics["bytes_received"] += len(line)
+        chunk = json.loads(line)
+        if chunk.get("error"):
+            raise StreamAborted(f"model error: {chunk['error']}")
+
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            if metrics["time_to_first_token"] is None:
+                metrics["time_to_first_token"] = time.perf_counter() - started
+            metrics["tokens"] += 1
+            parser.feed(content)
+
+        if chunk.get("done"):
+            # The final chunk carries Ollama's token counts and durations
+            metrics["stats"] = {k: v for k, v in chunk.items() if k.endswith(("_count", "_duration"))}
+        elapsed = time.perf_counter() - started
+        if parser.done or chunk.get("done"):
+            break
+        if metrics["tokens"] > max_tokens:
+            raise StreamAborted(f"token budget of {max_tokens} exceeded")
+        if elapsed > max_seconds:
+            raise StreamAborted(f"time budget of {max_seconds}s exceeded")
+
+    metrics["total_seconds"] = time.perf_counter() - started
+    if metrics["total_seconds"] > 0:
+        metrics["tokens_per_second"] = metrics["tokens"] / metrics["total_seconds"]
+    return parser.result(), metrics
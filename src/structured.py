@@ -0,0 +1,94 @@
+import copy
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+# Format of a repair response: values to set at dotted paths of the previous output
+FIX_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "fixes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"path": {"type": "string"}, "value": {}},
+                "required": ["path", "value"],
+            },
+        },
+    },
+    "required": ["fixes"],
+}
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {k: _inline_refs(v, defs) for k, v in node.items() if k != "$defs"}
+    if isinstance(node, list):
+        return [_inline_refs(v, defs) for v in node]
+    return node
+
+@lru_cache(maxsize=None)
+def _schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    schema = model.model_json_schema()
+    return _inline_refs(schema, schema.get("$defs", {}))
+
+def output_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    JSON schema for Ollama's structured output ("format"), with $refs inlined so
+    the grammar it compiles doesn't depend on reference support.
+    """
+    return copy.deepcopy(_schema(model))
+
+def validate_output(model: Type[BaseModel], data: Any) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (validated output, []) or (None, pydantic errors)."""
+    try:
+        return model.model_validate(data).dict(exclude_none=True), []
+    except ValidationError as e:
+        return None, e.errors(include_url=False)
+
+def format_errors(errors: List[Dict[str, Any]], limit: int = 20) -> str:
+    lines = []
+    for error in errors[:limit]:
+        path = ".".join(str(part) for part in error["loc"]) or "(root)"
+        line = f"- {path}: {error['msg']}"
+        if error["type"] != "missing":
+            line += f" (got {repr(error.get('input'))[:60]})"
+        lines.append(line)
+    if len(errors) > limit:
+        lines.append(f"- ... and {len(errors) - limit} more")
+    return "\n".join(lines)
+
+def apply_fixes(data: Any, fixes: List[Dict[str, Any]]) -> Any:
+    """
+    Apply {"path": "workflows.0.steps.1.step_id", "value": ...} fixes to a copy of
+    data. An index one past the end of a list appends; unusable paths are skipped.
+    """
+    data = copy.deepcopy(data)
+    for fix in fixes:
+        if not isinstance(fix, dict) or not isinstance(fix.get("path"), str):
+            continue
+        parts = [part for part in fix["path"].split(".") if part]
+        if not parts:
+            if isinstance(fix.get("value"), dict):
+                data = copy.deepcopy(fix["value"])
+            continue
+        target = data
+        for part, following in zip(parts, parts[1:] + [None]):
+            key: Any = int(part) if isinstance(target, list) and part.isdigit() else part
+            if isinstance(target, list) and not isinstance(key, int):
+                break
+            if following is None:
+                if isinstance(target, list) and key == len(target):
+                    target.append(fix.get("value"))
+                elif isinstance(target, dict) or (isinstance(target, list) and key < len(target)):
+                    target[key] = fix.get("value")
+                break
+            if isinstance(target, dict) and not isinstance(target.get(key), (dict, list)):
+                target[key] = [] if following.isdigit() else {}
+            elif isinstance(target, list) and key >= len(target):
+                break
+            target = target[key]
+    return data
@@ -2,21 +2,47 @@ import json
 import re
 from typing import Dict, Any, List
 try:
+    # Optional faster parser; falls back to the standard library
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+try:
+    from config import Config
     from miro_client import MiroClient
     from parser import LayoutParser
+    from snapshot_store import SnapshotStore, merge_items
 except ImportError:
+    from .config import Config
     from .miro_client import MiroClient
     from .parser import LayoutParser
+    from .snapshot_store import SnapshotStore, merge_items
 
 def fetch_board_info(board_url: str) -> Dict[str, Any]:
     """
     Tool to fetch board items from Miro.
+
+    With snapshots enabled, an unchanged board is served from the local snapshot
+    and a changed board is diffed against it by item modifiedAt.
     """
     try:
         client = MiroClient()
         board_id = client.get_board_id_from_url(board_url)
-        items = client.fetch_board_items(board_id)
-        return {"board_id": board_id, "raw_items": items}
+        if not Config.SNAPSHOT_ENABLED:
+            items = client.fetch_board_items(board_id)
+            return {"board_id": board_id, "raw_items": items}
+
+        store = SnapshotStore()
+        snapshot = store.load(board_id)
+        board_modified_at = client.fetch_board(board_id).get("modifiedAt")
+        if snapshot and board_modified_at and snapshot.board_modified_at == board_modified_at:
+            print(f"Board unchanged since last snapshot ({board_modified_at}), skipping item fetch")
+            diff = {"added": [], "changed": [], "removed": []}
+            return {"board_id": board_id, "raw_items": snapshot.items, "board_diff": diff}
+
+        fresh = client.fetch_board_items(board_id)
+        items, diff = merge_items(snapshot.items if snapshot else [], fresh)
+        store.save(board_id, board_modified_at, items)
+        return {"board_id": board_id, "raw_items": items, "board_diff": diff}
     except Exception as e:
         return {"error": str(e)}
 
@@ -27,38 +53,88 @@ def parse_board_items(raw_items: List[Any]) -> Dict[str, Any]:
     try:
         parser = LayoutParser(raw_items)
         graph = parser.parse()
-        return {"structural_graph": graph.dict()}
+        return {"structural_graph": graph.dict(exclude_none=True)}
     except Exception as e:
         return {"error": str(e)}
 
-def extract_json(text: str) -> Dict[str, Any]:
+class JSONExtractionError(ValueError):
     """
-    Robustly extract JSON from a string that might contain markdown or other text.
+    Raised when no JSON object can be recovered from an LLM completion.
+    `reason` says what went wrong (empty, no object, truncated, invalid).
     """
-    # 1. Try direct parsing
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    def __init__(self, reason: str, text: str):
+        self.reason = reason
+        super().__init__(f"Could not extract valid JSON from response ({reason}): {text[:100]}...")
 
-    # 2. Remove markdown code blocks
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-    
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+# Inside an object only braces and whole strings matter; string bodies are skipped in C
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}]', re.DOTALL)
+_decoder = json.JSONDecoder()
+
+def _balanced_end(text: str, start: int):
+    """
+    Return the index just past the object opened at `start`, ignoring braces
+    inside JSON strings, or None if the text ends before it closes.
+    """
+    depth = 0
+    for match in _TOKEN.finditer(text, start):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return None
+
+_FENCE = re.compile(r"^```[\w-]*\s*(.*?)\s*```$", re.DOTALL)
+
+def extract_json(text: str) -> Any:
+    """
+    Robustly extract JSON from a string that might contain markdown or other text.
 
-    # 3. Find the first '{' and the last '}'
-    start = text.find('{')
-    end = text.rfind('}')
-    
-    if start != -1 and end != -1 and end > start:
-        json_str = text[start:end+1]
+    A completion that is, or is fenced around, a single JSON object or array is
+    returned as is. Otherwise the text is walked once: each top-level '{' is
+    decoded in place, and one that does not parse is skipped to its balancing '}',
+    so fences and prose are never copied or re-parsed. The largest object wins.
+    Raises JSONExtractionError explaining why nothing could be extracted.
+    """
+    stripped = text.strip()
+    if not stripped:
+        raise JSONExtractionError("empty response", text)
+
+    # Fast path: with format=json the whole completion is usually the object
+    fenced = _FENCE.match(stripped)
+    whole = fenced.group(1) if fenced else stripped
+    if whole and (whole[0], whole[-1]) in (("{", "}"), ("[", "]")):
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
+            return _loads(whole)
+        except ValueError:
             pass
-            
-    raise ValueError(f"Could not extract valid JSON from response: {text[:100]}...")
+
+    best, best_size = None, -1
+    error, error_size = None, -1
+    text_end = len(text.rstrip())
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = _decoder.raw_decode(text, pos)
+            if end - pos > best_size:
+                best, best_size = obj, end - pos
+        except json.JSONDecodeError as e:
+            # Running out of input means everything from pos was a valid prefix
+            truncated = e.pos >= text_end or e.msg.startswith("Unterminated string")
+            end = None if truncated else _balanced_end(text, pos)
+            if end is None:
+                # Everything after pos belongs to this object
+                if best is None and error is None:
+                    raise JSONExtractionError(f"unterminated object starting at offset {pos} (truncated output?)", text)
+                break
+            if end - pos > error_size:
+                error, error_size = f"invalid JSON in object at offset {pos}: {e}", end - pos
+        pos = text.find("{", end)
+
+    if best is not None:
+        return best
+    if error:
+        raise JSONExtractionError(error, text)
+    raise JSONExtractionError("no JSON object found", text)
@@ -0,0 +1,137 @@
+import random
+from typing import Dict, Any, List
+
+SHAPE_TEXT = [
+    "Fetch <b>Arxiv</b> papers", "Summarize abstracts", "Search the web", "Rank results",
+    "Send <i>email</i> report", "Store in vector DB", "Classify intent", "Ask user for approval",
+]
+STICKY_TEXT = [
+    "<p>Researcher agent: finds relevant sources</p>", "<p>Writer agent drafts the summary</p>",
+    "<p>Use <a href=\"https://example.com\">the API</a> with retries</p>", "<p>TODO: rate limits?</p>",
+]
+FRAME_TITLES = ["Research", "Writing", "Review", "Publishing", "Ingestion", "Routing", "Support", "Analytics"]
+
+
+def generate_board(
+    n_items: int,
+    seed: int = 0,
+    items_per_frame: int = 40,
+    connector_ratio: float = 0.3,
+    loose_ratio: float = 0.05,
+) -> List[Dict[str, Any]]:
+    """
+    Generate raw Miro v2 item and connector payloads for a synthetic board.
+
+    Items are laid out in frames on a grid; children are positioned relative to
+    their frame's top-left corner, as the API does. About connector_ratio of the
+    items are connectors chaining shapes within a frame, with occasional
+    cross-frame arrows.
+    """
+    rng = random.Random(seed)
+    n_connectors = int(n_items * connector_ratio)
+    n_loose = int(n_items * loose_ratio)
+    n_framed = max(0, n_items - n_connectors - n_loose)
+    n_frames = max(1, n_framed // (items_per_frame + 1))
+    columns = max(1, int(n_frames ** 0.5))
+    frame_size = 2400.0
+
+    items: List[Dict[str, Any]] = []
+    children: List[List[str]] = []
+    counter = 0
+
+    def next_id() -> str:
+        nonlocal counter
+        counter += 1
+        return f"3458764{counter:012d}"
+
+    def stamp() -> str:
+        return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+
+    for f in range(n_frames):
+        frame_id = next_id()
+        x = (f % columns) * (frame_size + 400)
+        y = (f // columns) * (frame_size + 400)
+        items.append({
+            "id": frame_id, "type": "frame", "modifiedAt": stamp(),
+            "data": {"title": f"{FRAME_TITLES[f % len(FRAME_TITLES)]} {f}", "format": "custom"},
+            "position": {"x": x, "y": y, "origin": "center", "relativeTo": "canvas_center"},
+            "geometry": {"width": frame_size, "height": frame_size},
+            "style": {"fillColor": "#ffffffff"},
+        })
+        children.append([])
+
+    for i in range(n_framed - n_frames):
+        frame_index = i % n_frames
+        frame_id = items[frame_index]["id"]
+        kind = rng.choice(("shape", "shape", "sticky_note", "text"))
+        text = rng.choice(STICKY_TEXT if kind == "sticky_note" else SHAPE_TEXT)
+        item_id = next_id()
+        items.append({
+            "id": item_id, "type": kind, "modifiedAt": stamp(),
+            "data": {"content": text, "shape": "rectangle"} if kind == "shape" else {"content": text},
+            "position": {"x": rng.uniform(100, frame_size - 100), "y": rng.uniform(100, frame_size - 100),
+                         "origin": "center", "relativeTo": "parent_top_left"},
+            "geometry": {"width": 200.0, "height": 100.0},
+            "parent": {"id": frame_id},
+            "style": {"fillColor": "light_yellow", "textAlign": "center"},
+        })
+        children[frame_index].append(item_id)
+
+    for _ in range(n_loose):
+        items.append({
+            "id": next_id(), "type": "sticky_note", "modifiedAt": stamp(),
+            "data": {"content": rng.choice(STICKY_TEXT)},
+            "position": {"x": rng.uniform(-5000, -1000), "y": rng.uniform(-5000, 5000),
+                         "origin": "center", "relativeTo": "canvas_center"},
+            "geometry": {"width": 200.0, "height": 200.0},
+        })
+
+    linkable = [ids for ids in children if len(ids) >= 2]
+    for c in range(n_connectors if linkable else 0):
+        ids = linkable[c % len(linkable)]
+        if rng.random() < 0.05 and len(linkable) > 1:
+            start, end = rng.choice(ids), rng.choice(rng.choice(linkable))
+        else:
+            k = rng.randrange(len(ids) - 1)
+            start, end = ids[k], ids[k + 1]
+        connector: Dict[str, Any] = {
+            "id": next_id(), "type": "connector", "modifiedAt": stamp(),
+            "startItem": {"id": start}, "endItem": {"id": end},
+            "shape": "elbowed", "style": {"strokeColor": "#1a1a1a"},
+        }
+        if rng.random() < 0.3:
+            connector["captions"] = [{"content": rng.choice(["<p>next</p>", "<p>on failure</p>", "<p>yes</p>"])}]
+        items.append(connector)
+
+    return items
+
+
+def generate_dsl(n_agents: int, steps_per_workflow: int = 8, seed: int = 0) -> Dict[str, Any]:
+    """Generate an AgentSpec-shaped dict for exercising the text formatter."""
+    rng = random.Random(seed)
+    agents = [{"name": f"Agent{i}", "role": "Worker", "description": "Does things", "goal": "Finish"} for i in range(n_agents)]
+    tools = [{"name": f"tool_{i}", "description": "A tool"} for i in range(n_agents * 2)]
+    workflows = []
+    for w in range(max(1, n_agents // 2)):
+        steps = [{
+            "step_id": s + 1, "description": f"Step {s + 1} of workflow {w}",
+            "assigned_to": rng.choice(agents)["name"] if agents else None,
+            "tools_required": [rng.choice(tools)["name"]] if tools else [],
+        } for s in range(steps_per_workflow)]
+        workflows.append({"name": f"Workflow{w}", "description": "A workflow", "steps": steps})
+    return {"name": "Synthetic", "role": "Orchestrator", "goal": "Benchmark", "type": "orchestrator",
+            "sub_agents": agents, "tools": tools, "workflows": workflows, "constraints": []}
+
+
+def adversarial_llm_outputs(size: int = 200) -> Dict[str, str]:
+    """LLM completions that exercise the slow and failure paths of extract_json."""
+    import json
+    body = json.dumps(generate_dsl(size), indent=2)
+    return {
+        "clean": body,
+        "fenced": f"```json\n{body}\n```",
+        "prose_with_braces": f"Here is the plan {{draft}}:\n{body}\nNote: use {{placeholders}} as needed.",
+        "truncated": body[: len(body) // 2],
+        "no_json": "I could not find any agents on this board. " * size,
+    }
+
@@ -5,12 +5,14 @@ import os
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.miro_client import MiroClient
 from src.parser import LayoutParser
-from src.models import BoardItem
+from src.models import BoardItem, Geometry, Position
+from tests.synthetic_board import generate_board
 
 def test_parser():
     print("Testing LayoutParser...")
-    with open("tests/sample_miro_data.json", "r") as f:
+    with open(os.path.join(os.path.dirname(__file__), "sample_miro_data.json"), "r") as f:
         raw_data = json.load(f)
     
     # Mock parsing raw dict to BoardItem since MiroClient usually does this
@@ -36,5 +38,40 @@ def test_parser():
     assert len(graph.relations) >= 2 # 2 containments + 1 connector
     print("Parser Test Passed!")
 
+def test_parser_spatial_relations():
+    frame = BoardItem(id="frame", type="frame", position=Position(x=500, y=500, relative_to="canvas_center"),
+                      geometry=Geometry(width=1000, height=1000))
+    # Parented child at (100, 100) from the frame's top-left is at (100, 100) on the canvas
+    child = BoardItem(id="child", type="shape", parent_id="frame", position=Position(x=100, y=100, relative_to="parent_top_left"),
+                      geometry=Geometry(width=100, height=100))
+    # Not parented, but visually inside the frame and next to the child
+    floating = BoardItem(id="floating", type="sticky_note", position=Position(x=230, y=100, relative_to="canvas_center"),
+                         geometry=Geometry(width=100, height=100))
+    far = BoardItem(id="far", type="shape", position=Position(x=5000, y=5000, relative_to="canvas_center"))
+
+    graph = LayoutParser([frame, child, floating, far], near_distance=40).parse()
+    relations = {(r.source_id, r.target_id, r.type) for r in graph.relations}
+
+    assert ("frame", "child", "contains") in relations
+    assert ("frame", "floating", "contains") in relations
+    assert ("frame", "far", "contains") not in relations
+    assert ("child", "floating", "visually_near") in relations
+    assert not any("far" in (s, t) for s, t, kind in relations if kind == "visually_near")
+
+def test_parser_on_synthetic_board():
+    raw = generate_board(500, seed=1)
+    client = MiroClient(access_token="test")
+    items = [client._parse_item(d) for d in raw]
+    graph = LayoutParser(items).parse()
+
+    frames = [d["id"] for d in raw if d["type"] == "frame"]
+    connectors = [d for d in raw if d["type"] == "connector"]
+    kinds = {r.type for r in graph.relations}
+    assert graph.frames == frames
+    assert sum(1 for r in graph.relations if r.type == "connected_to") == len(connectors)
+    assert {"contains", "connected_to", "visually_near"} <= kinds
+
 if __name__ == "__main__":
     test_parser()
+    test_parser_spatial_relations()
+    test_parser_on_synthetic_board()
@@ -0,0 +1,67 @@
+import sys
+import os
+import sqlite3
+from collections import OrderedDict
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.artifacts import ArtifactStore, get_artifact_store, is_handle, resolve
+from src.checkpoints import get_checkpoint_store
+from src.config import Config
+from src.models import BoardItem
+
+
+def test_identical_values_are_stored_once(tmp_path):
+    store = ArtifactStore(str(tmp_path), min_bytes=0)
+    graph = {"items": {f"i{n}": {"type": "shape", "content": "x" * 50} for n in range(100)}}
+    first = store.put(graph, "structural_graph")
+    second = store.put(dict(graph), "structural_graph")
+
+    assert is_handle(first) and first == second
+    assert (store.stats["writes"], store.stats["dedup"]) == (1, 1)
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1 and os.path.getsize(os.path.join(tmp_path, first["$artifact"][:2], files[0])) < first["bytes"]
+
+    # A fresh store decodes from disk, rebuilding board items by kind
+    reopened = ArtifactStore(str(tmp_path), min_bytes=0)
+    assert reopened.get(first) == graph
+    items = reopened.get(store.put([BoardItem(id="s1", type="shape", content="Search")], "raw_items"))
+    assert isinstance(items[0], BoardItem) and items[0].content == "Search"
+
+
+def test_small_values_stay_inline(tmp_path):
+    store = ArtifactStore(str(tmp_path), min_bytes=1024)
+    assert store.put({"workflows": []}, "workflow_plan") == {"workflows": []}
+    assert resolve({"workflows": []}) == {"workflows": []}
+    assert not os.listdir(tmp_path)
+
+
+def test_checkpoints_hold_handles_and_resumed_stages_resolve_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(Config, "TRACE_ENABLED", False)
+    monkeypatch.setattr(Config, "ARTIFACT_MIN_BYTES", 256)
+    items = [BoardItem(id=f"s{n}", type="shape", content=f"Search source {n} for facts") for n in range(200)]
+    components = {"sub_agents": [{"name": "Researcher", "role": "r", "description": "d"}], "tools": []}
+    plan = {"workflows": [{"name": "W", "description": "d", "steps": [
+        {"step_id": 1, "description": "Search", "assigned_to": "Researcher"}]}]}
+
+    monkeypatch.setattr(agent, "fetch_board_info", lambda url: {"board_id": "b1", "raw_items": items})
+    monkeypatch.setattr(agent, "call_llm", lambda prompt, data, **kwargs: components if "Architect Agent" in prompt else plan)
+
+    result = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    assert result["agent_dsl"]["workflows"][0]["steps"][0]["assigned_to"] == "Researcher"
+    assert is_handle(result["raw_items"]) and is_handle(result["structural_graph"])
+    assert os.path.isdir(tmp_path / "artifacts")
+
+    with sqlite3.connect(Config.CHECKPOINT_DB) as conn:
+        sizes = [size for (size,) in conn.execute("SELECT length(state) FROM checkpoints")]
+    assert len(sizes) == 5 and max(sizes) < 2000
+
+    # Re-running a stage in a fresh process reads the graph back from disk
+    store = get_artifact_store()
+    monkeypatch.setattr(store, "_memory", OrderedDict())
+    rerun = agent.rerun_stage(result["run_id"], "workflow_planner")
+    assert resolve(rerun["workflow_plan"]) == plan and store.stats["disk_reads"] >= 2
+    assert get_checkpoint_store().completed_nodes(result["run_id"])[-1] == "workflow_planner"
@@ -0,0 +1,50 @@
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.assembler import assemble_agent_spec, ReconciliationError
+
+
+COMPONENTS = {
+    "name": "ResearchSystem",
+    "sub_agents": [
+        {"name": "Researcher", "role": "Research", "description": "Finds papers"},
+        {"name": "researcher", "role": "Duplicate", "description": "Dropped"},
+    ],
+    "tools": [{"name": "web_search", "description": "Searches the web"}],
+}
+
+
+def test_assembler_normalizes_names_across_stages():
+    plan = {"workflows": [{
+        "name": "ResearchFlow",
+        "description": "Find and summarize papers",
+        "steps": [
+            {"step_id": 1, "description": "Search", "assigned_to": "the researcher", "tools_required": ["Web Search"]},
+            {"description": "Report", "assigned_to": "system"},
+            {"step_id": 3, "description": "Search again", "assigned_to": "web-search"},
+        ],
+    }]}
+
+    spec = assemble_agent_spec(COMPONENTS, plan)
+
+    assert spec.name == "ResearchSystem"
+    assert spec.goal == "Find and summarize papers"
+    assert [a.name for a in spec.sub_agents] == ["Researcher"]
+    steps = spec.workflows[0].steps
+    assert steps[0].tools_required == ["web_search"]
+    assert steps[1].step_id == 2 and steps[1].assigned_to == "System"
+    assert steps[2].assigned_to == "web_search"
+
+
+def test_assembler_fails_on_unknown_references():
+    plan = {"workflows": [{"name": "W", "description": "", "steps": [
+        {"step_id": 1, "description": "x", "assigned_to": "Publisher", "tools_required": ["send_email"]},
+    ]}]}
+    with pytest.raises(ReconciliationError) as excinfo:
+        assemble_agent_spec(COMPONENTS, plan)
+    assert "Publisher" in str(excinfo.value) and "send_email" in str(excinfo.value)
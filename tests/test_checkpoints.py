@@ -0,0 +1,48 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.checkpoints import get_checkpoint_store
+from src.config import Config
+from src.models import BoardItem
+
+
+def test_failed_run_resumes_at_failed_node(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(Config, "TRACE_ENABLED", False)
+    calls = {"fetch": 0, "architect": 0, "planner": 0}
+
+    def fake_fetch(url):
+        calls["fetch"] += 1
+        return {"board_id": "b1", "raw_items": [BoardItem(id="s1", type="shape", content="Search the web")]}
+
+    def fake_llm(prompt, data, **kwargs):
+        if "Architect Agent" in prompt:
+            calls["architect"] += 1
+            return {"sub_agents": [{"name": "Researcher", "role": "r", "description": "d"}], "tools": []}
+        calls["planner"] += 1
+        if calls["planner"] == 1:
+            raise Exception("LLM Call Failed: timed out")
+        return {"workflows": [{"name": "W", "description": "d", "steps": [
+            {"step_id": 1, "description": "Search", "assigned_to": "Researcher"}]}]}
+
+    monkeypatch.setattr(agent, "fetch_board_info", fake_fetch)
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+
+    failed = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    assert "timed out" in failed["error"]
+    run = get_checkpoint_store().get_run(failed["run_id"])
+    assert (run["status"], run["failed_node"]) == ("failed", "workflow_planner")
+
+    resumed = agent.resume_run(failed["run_id"])
+    assert not resumed.get("error")
+    assert resumed["agent_dsl"]["workflows"][0]["steps"][0]["assigned_to"] == "Researcher"
+    assert (calls["fetch"], calls["architect"], calls["planner"]) == (1, 1, 2)
+    assert get_checkpoint_store().get_run(failed["run_id"])["status"] == "completed"
+
+    rerun = agent.rerun_stage(failed["run_id"], "architect_agent")
+    assert calls["architect"] == 2 and rerun["identified_components"]["sub_agents"]
+    assert get_checkpoint_store().completed_nodes(failed["run_id"])[-1] == "architect_agent"
@@ -0,0 +1,88 @@
+import sys
+import os
+import tracemalloc
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip("numpy")
+
+from src.columnar import ColumnarBoard
+from src.miro_client import MiroClient
+from src.models import BoardItem, Geometry, Position
+from src.parser import LayoutParser
+from src.spatial import absolute_bboxes
+from tests.synthetic_board import generate_board
+
+
+def _items(size=1500, seed=3):
+    client = MiroClient(access_token="test")
+    return [client._parse_item(d) for d in generate_board(size, seed=seed)]
+
+
+def _relations(graph):
+    return sorted((r.source_id, r.target_id, r.type, r.label or "") for r in graph.relations)
+
+
+def test_columnar_parse_matches_per_item_parse():
+    items = _items()
+    expected = LayoutParser(items, columnar=False).parse()
+    graph = LayoutParser(items, columnar=True).parse()
+
+    assert _relations(graph) == _relations(expected)
+    assert graph.flow == expected.flow
+    assert {r.type for r in graph.relations} >= {"contains", "visually_near", "connected_to"}
+
+
+def test_columnar_bboxes_follow_nested_relative_positions():
+    items = [
+        BoardItem(id="outer", type="frame", position=Position(x=1000, y=1000, relative_to="canvas_center"),
+                  geometry=Geometry(width=800, height=600)),
+        BoardItem(id="inner", type="frame", parent_id="outer", position=Position(x=200, y=150),
+                  geometry=Geometry(width=300, height=200)),
+        BoardItem(id="leaf", type="shape", parent_id="inner", position=Position(x=50, y=40, relative_to="parent_top_left"),
+                  geometry=Geometry(width=20)),
+        BoardItem(id="orphan", type="shape", parent_id="missing", position=Position(x=5, y=5)),
+        BoardItem(id="nowhere", type="sticky_note"),
+    ]
+    board = ColumnarBoard.from_items(items)
+
+    assert board.bbox_dict() == pytest.approx(absolute_bboxes({item.id: item for item in items}))
+    assert "nowhere" not in board.bbox_dict()
+
+
+def test_columnar_board_round_trips_through_a_memory_mapped_file(tmp_path):
+    items = _items(size=400, seed=4)
+    board = ColumnarBoard.from_items(items)
+    path = str(tmp_path / "board.col")
+    board.save(path)
+    loaded = ColumnarBoard.load(path)
+
+    assert isinstance(loaded.x, np.memmap) or isinstance(loaded.x.base, np.memmap)
+    for name in ColumnarBoard.COLUMNS:
+        np.testing.assert_array_equal(loaded.columns[name], board.columns[name])
+    rebuilt = loaded.items()
+    assert [(i.id, i.type, i.content, i.parent_id, i.start_id) for i in rebuilt] == \
+        [(i.id, i.type, i.content, i.parent_id, i.start_id) for i in items]
+
+    expected = LayoutParser(items, columnar=False).parse()
+    assert _relations(LayoutParser(rebuilt, board=loaded).parse()) == _relations(expected)
+
+
+def test_columnar_proximity_stays_bounded_on_a_stacked_column():
+    # Every sticky shares the same x span, so sorting on x alone would pair them all
+    items = [BoardItem(id=f"s{n}", type="sticky_note", content=f"Step {n}",
+                       position=Position(x=0, y=n * 60 + (n % 7) * 3), geometry=Geometry(width=200, height=50))
+             for n in range(3000)]
+    expected = LayoutParser(items, columnar=False).parse()
+
+    tracemalloc.start()
+    graph = LayoutParser(items, columnar=True).parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert _relations(graph) == _relations(expected)
+    assert any(r.type == "visually_near" for r in graph.relations)
+    assert peak < 64 * 1024 * 1024
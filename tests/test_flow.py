@@ -0,0 +1,51 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.flow import analyze_flow
+from src.graph_encoding import encode_graph
+from src.models import BoardItem
+from src.parser import LayoutParser
+
+
+def test_analyze_flow_branches_merges_and_loops():
+    # start -> check -> (fix -> retry -> check) | done; check and notify both lead to done
+    nodes = ["start", "check", "fix", "retry", "done", "notify", "isolated"]
+    edges = [("start", "check"), ("check", "fix"), ("fix", "retry"), ("retry", "check"),
+             ("check", "done"), ("notify", "done"), ("done", "done"), ("start", "check")]
+    flow = analyze_flow(nodes, edges)
+
+    assert flow.entries == ["start", "notify"]
+    assert flow.exits == ["done"]
+    assert flow.order == ["start", "check", "fix", "retry", "notify", "done"]
+    assert flow.branches == {"check": ["fix", "done"]}
+    assert flow.merges == {"check": ["start", "retry"], "done": ["check", "notify"]}
+    assert flow.loops == [["check", "fix", "retry"], ["done"]]
+
+
+def test_analyze_flow_closed_loop_and_long_chain():
+    flow = analyze_flow(["a", "b", "c"], [("a", "b"), ("b", "c"), ("c", "a")])
+    assert (flow.entries, flow.exits, flow.order) == (["a"], ["c"], ["a", "b", "c"])
+
+    # Deeper than the recursion limit
+    nodes = [f"n{i}" for i in range(5000)]
+    flow = analyze_flow(list(reversed(nodes)), list(zip(nodes, nodes[1:])))
+    assert flow.order == nodes
+    assert flow.loops == []
+
+
+def test_parser_flow_reaches_the_board_context():
+    items = [BoardItem(id=i, type="shape", content=i.title()) for i in ("plan", "research", "write")]
+    items += [BoardItem(id="c1", type="connector", start_id="plan", end_id="research"),
+              BoardItem(id="c2", type="connector", start_id="research", end_id="write"),
+              BoardItem(id="c3", type="connector", start_id="write", end_id="research", content="revise")]
+    graph = LayoutParser(items).parse().dict(exclude_none=True)
+
+    assert graph["flow"]["order"] == ["plan", "research", "write"]
+    assert graph["flow"]["loops"] == [["research", "write"]]
+    assert json.loads(encode_graph(graph))["flow"] == {
+        "entry": ["n1"], "order": ["n1", "n2", "n3"], "merge": {"n2": ["n1", "n3"]}, "loop": [["n2", "n3"]], "exit": ["n3"],
+    }
@@ -0,0 +1,54 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.graph_encoding import encode_graph, estimate_tokens
+from src.models import BoardItem, Position
+from src.parser import LayoutParser
+
+
+def _graph(shapes_per_frame=2):
+    items = [BoardItem(id="3458764500000000001", type="frame", content="Research Workflow",
+                       metadata={"big": "x" * 1000}, style={"fillColor": "#fff"})]
+    for i in range(shapes_per_frame):
+        items.append(BoardItem(id=f"34587645000000001{i:02d}", type="shape", content=f"<b>Step</b> {i}",
+                               position=Position(x=i, y=0), parent_id="3458764500000000001"))
+    items.append(BoardItem(id="c1", type="connector", content="Next",
+                           metadata={"startItem": {"id": "3458764500000000100"}, "endItem": {"id": "3458764500000000101"}}))
+    return LayoutParser(items).parse().dict()
+
+
+def test_encode_graph_is_compact_and_grouped():
+    graph = _graph()
+    encoded = json.loads(encode_graph(graph))
+
+    assert encoded["frames"] == [{"id": "F1", "title": "Research Workflow", "items": [
+        ["n1", "shape", "<b>Step</b> 0"], ["n2", "shape", "<b>Step</b> 1"],
+    ]}]
+    assert encoded["items"] == []
+    assert encoded["edges"] == {"n1": ["n2:Next"]}
+    assert len(encode_graph(graph)) < len(json.dumps(graph, indent=2)) / 4
+
+
+def test_encode_graph_degrades_within_budget():
+    graph = _graph(shapes_per_frame=400)
+    encoded = encode_graph(graph, token_budget=600)
+    view = json.loads(encoded)
+
+    assert estimate_tokens(encoded) <= 600
+    assert view["truncated"] is True
+    # Connected items are kept ahead of unconnected ones
+    assert view["frames"][0]["items"][0][0] == "n1"
+    assert view["edges"] == {"n1": ["n2:Next"]}
+
+
+def test_encode_graph_flags_boards_that_cannot_fit():
+    items = [BoardItem(id=f"frame-{i}", type="frame", content=f"Frame number {i}") for i in range(200)]
+    items.append(BoardItem(id="s1", type="shape", content="Step", parent_id="frame-0"))
+    view = json.loads(encode_graph(LayoutParser(items).parse().dict(), token_budget=100))
+
+    assert view["over_budget"] is True and view["truncated"] is True
+    assert len(view["frames"]) == 200 and view["frames"][0]["more"] == 1
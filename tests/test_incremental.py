@@ -0,0 +1,128 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.config import Config
+from src.incremental import diff_graphs, patch_spec, should_patch
+from src.models import BoardItem
+from src.parser import LayoutParser
+
+
+def _board(writing_text="Draft the report"):
+    return [
+        BoardItem(id="f1", type="frame", content="Research"),
+        BoardItem(id="s1", type="shape", content="Search the web for papers", parent_id="f1"),
+        BoardItem(id="f2", type="frame", content="Writing"),
+        BoardItem(id="s2", type="shape", content=writing_text, parent_id="f2"),
+        BoardItem(id="c1", type="connector", content="", start_id="s1", end_id="s2"),
+    ]
+
+
+def _graph(items):
+    return LayoutParser(items).parse().dict(exclude_none=True)
+
+
+def test_diff_graphs_reports_changed_frames_only():
+    diff = diff_graphs(_graph(_board()), _graph(_board("Draft and edit the report")))
+    assert (diff["changed"], diff["added"], diff["removed"]) == (["f2"], [], [])
+    assert not diff["cross_frame_changed"]
+    assert should_patch(diff, 0.5)
+
+
+def test_changed_cross_frame_connectors_force_a_full_run():
+    board = _board()
+    board[-1] = BoardItem(id="c1", type="connector", content="then", start_id="s1", end_id="s2")
+    diff = diff_graphs(_graph(_board()), _graph(board))
+
+    assert diff["cross_frame_changed"] and len(diff["changed"]) < diff["total"]
+    assert not should_patch(diff, 1.0)
+
+
+def test_patch_spec_keeps_unchanged_entries_and_fields():
+    previous = {"name": "Old", "role": "r", "goal": "g", "sub_agents": [{"name": "A", "role": "x", "description": "d"}],
+                "tools": [], "workflows": []}
+    spec = {"name": "New", "role": "r", "goal": "g", "sub_agents": [{"name": "A", "role": "x", "description": "d"},
+            {"name": "B", "role": "y", "description": "d"}], "tools": [], "workflows": []}
+    patched = patch_spec(previous, spec)
+    assert patched["name"] == "Old" and patched["sub_agents"][0] is previous["sub_agents"][0]
+    assert [a["name"] for a in patched["sub_agents"]] == ["A", "B"]
+
+
+def test_second_run_reanalyzes_only_the_edited_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(Config, "TRACE_ENABLED", False)
+    board = {"items": _board()}
+    calls = []
+
+    def fake_fetch(url):
+        return {"board_id": "b1", "raw_items": board["items"]}
+
+    def fake_llm(prompt, data, board_context=None, **kwargs):
+        calls.append((prompt, board_context))
+        if "Architect Agent" in prompt and "partition" in prompt:
+            return {"sub_agents": [{"name": "Editor", "role": "Writing", "description": "Drafts and edits the report"}],
+                    "tools": []}
+        if "Architect Agent" in prompt:
+            return {"sub_agents": [
+                {"name": "Researcher", "role": "Research", "description": "Searches the web for papers"},
+                {"name": "Writer", "role": "Writing", "description": "Drafts the report"}], "tools": []}
+        return {"workflows": [{"name": "Main", "description": "d", "steps": [
+            {"step_id": 1, "description": "Search", "assigned_to": "Researcher"},
+            {"step_id": 2, "description": "Write", "assigned_to": data and ("Editor" if "Editor" in data else "Writer")}]}]}
+
+    monkeypatch.setattr(agent, "fetch_board_info", fake_fetch)
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+
+    first = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    assert not first.get("error") and len(calls) == 2
+
+    # Unchanged board: no LLM calls at all and an identical spec
+    calls.clear()
+    again = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    assert calls == [] and again["agent_dsl"] == first["agent_dsl"]
+
+    board["items"] = _board("Draft and edit the report")
+    loads = []
+    store = agent.get_checkpoint_store()
+    state_after = store.state_after
+    monkeypatch.setattr(store, "state_after", lambda run_id, node: loads.append(node) or state_after(run_id, node))
+    second = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    # The base run is loaded once, by the architect, not again by later stages
+    assert len(loads) == 1
+    architect_prompt, context = calls[0]
+    assert "partition" in architect_prompt and "Draft and edit" in context and "Search the web" not in context
+
+    agents = second["agent_dsl"]["sub_agents"]
+    assert agents[0] == first["agent_dsl"]["sub_agents"][0]
+    assert [a["name"] for a in agents] == ["Researcher", "Editor"]
+    assert second["agent_dsl"]["workflows"][0]["steps"][1]["assigned_to"] == "Editor"
+    assert second["incremental"]["changed_components"] == ["editor", "writer"]
+
+
+def test_unreadable_base_run_falls_back_to_a_full_analysis(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(Config, "TRACE_ENABLED", False)
+    calls = []
+
+    def fake_llm(prompt, data, **kwargs):
+        calls.append(prompt)
+        if "Architect Agent" in prompt:
+            return {"sub_agents": [{"name": "Researcher", "role": "r", "description": "d"}], "tools": []}
+        return {"workflows": [{"name": "Main", "description": "d", "steps": [
+            {"step_id": 1, "description": "Search", "assigned_to": "Researcher"}]}]}
+
+    monkeypatch.setattr(agent, "fetch_board_info", lambda url: {"board_id": "b1", "raw_items": _board()})
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+    assert not agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"}).get("error")
+
+    def broken(run_id, node):
+        raise ValueError("Artifact 00ff (structural_graph) is missing")
+
+    monkeypatch.setattr(agent.get_checkpoint_store(), "state_after", broken)
+    calls.clear()
+    result = agent.app.invoke({"board_url": "https://miro.com/app/board/b1/"})
+    assert not result.get("error") and "incremental" not in result
+    assert len(calls) == 2 and "partition" not in calls[0]
@@ -0,0 +1,41 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import instrumentation
+from src.config import Config
+
+
+def test_traced_node_records_trace_and_counters(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "TRACE_ENABLED", True)
+    instrumentation.metrics.reset()
+
+    def architect(state):
+        instrumentation.record_llm_call("small", 1.5, 100, 50, {"prompt_eval_count": 900, "eval_count": 120, "load_duration": 2e9})
+        return {"identified_components": {}}
+
+    def planner(state):
+        instrumentation.record_http("miro", "GET", "https://api.miro.com/v2/boards/x", 429, 0.1, 40, 10)
+        return {"error": "LLM Call Failed"}
+
+    update = instrumentation.traced_node("architect_agent", architect)({"board_url": "u"})
+    run_id = update["run_id"]
+    failed = instrumentation.traced_node("workflow_planner", planner)({"run_id": run_id})
+    assert "run_id" not in failed
+
+    with open(tmp_path / f"{run_id}.jsonl") as f:
+        events = [json.loads(line) for line in f]
+    assert [(e["kind"], e["node"]) for e in events] == [
+        ("llm", "architect_agent"), ("node", "architect_agent"), ("http", "workflow_planner"), ("node", "workflow_planner"),
+    ]
+    assert events[0]["prompt_tokens"] == 900 and events[0]["load_seconds"] == 2.0
+    assert events[3]["error"] == "LLM Call Failed"
+
+    text = instrumentation.metrics.render_prometheus()
+    assert 'miro_agent_llm_prompt_tokens_total{model="small"} 900' in text
+    assert 'miro_agent_node_errors_total{node="workflow_planner"} 1' in text
+    assert 'miro_agent_http_requests_total{service="miro",status="429"} 1' in text
@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_cache import LLMCache
+
+
+def test_llm_cache_tiers_and_eviction(tmp_path):
+    cache = LLMCache(directory=str(tmp_path), max_memory_entries=1, max_disk_bytes=10_000, ttl_seconds=60)
+    key_a = LLMCache.make_key("model", "system", "data-a")
+    key_b = LLMCache.make_key("model", "system", "data-b")
+    assert key_a != key_b
+    assert key_a == LLMCache.make_key("model", "system", "data-a", {})
+
+    assert cache.get(key_a) is None
+    cache.set(key_a, {"tools": ["a"]})
+    cache.set(key_b, {"tools": ["b"]})
+
+    # key_a was evicted from memory but is still served from disk
+    assert cache.get(key_b) == {"tools": ["b"]}
+    assert cache.get(key_a) == {"tools": ["a"]}
+    assert cache.stats["memory_hits"] == 1
+    assert cache.stats["disk_hits"] == 1
+    assert cache.stats["misses"] == 1
+
+    # Returned values are copies, not shared with the cache
+    cache.get(key_b)["tools"].append("mutated")
+    assert cache.get(key_b) == {"tools": ["b"]}
+
+    expired = LLMCache(directory=str(tmp_path), ttl_seconds=0)
+    time.sleep(0.01)
+    assert expired.get(key_a) is None
+
+
+
+def _disk_usage(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def test_disk_tier_is_scanned_only_when_over_its_limit(tmp_path, monkeypatch):
+    cache = LLMCache(directory=str(tmp_path), max_memory_entries=1, max_disk_bytes=2_000, ttl_seconds=60)
+    scans = []
+    disk_entries = cache._disk_entries
+    monkeypatch.setattr(cache, "_disk_entries", lambda: scans.append(1) or disk_entries())
+
+    for n in range(100):
+        cache.set(LLMCache.make_key("model", "system", f"data-{n}"), {"tools": ["x" * 40]})
+
+    assert cache.stats["evictions"] > 0
+    assert 0 < _disk_usage(tmp_path) <= 2_000
+    assert cache._disk_bytes == _disk_usage(tmp_path)
+    # One scan to learn the initial size, then one per eviction round rather than per write
+    assert len(scans) < 40
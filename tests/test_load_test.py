@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_services import FakeMiro, FakeOllama
+from benchmarks.load_test import configure, percentile, restore, run_load
+from src import agent
+from src.config import Config
+from src.miro_client import MiroClient
+from src.rate_limit import TokenBucket
+
+
+def test_fake_miro_paginates_and_rate_limits(monkeypatch):
+    monkeypatch.setattr(Config, "MIRO_BACKOFF_BASE", 0.0)
+    with FakeMiro(board_items=240, rate_limit_every=3) as miro:
+        monkeypatch.setattr(Config, "MIRO_BASE_URL", f"{miro.url}/v2")
+        client = MiroClient(access_token="test", bucket=TokenBucket(1e9, 1e9))
+        items = client.fetch_board_items("board-a")
+
+        assert len(items) == len(miro.board("board-a"))
+        assert miro.stats["rate_limited"] >= 1
+
+
+def test_load_test_runs_the_app_against_the_stand_ins(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent, "llm_cache", None)
+    monkeypatch.setattr(Config, "LLM_STREAM", False)
+    with FakeMiro(board_items=120) as miro, FakeOllama(malformed_rate=0.0) as ollama:
+        previous = configure(miro.url, ollama.url, str(tmp_path))
+        try:
+            urls = [f"https://miro.com/app/board/load-{i}=/" for i in range(3)]
+            report = run_load(agent.get_app(), urls, concurrency=3)
+        finally:
+            restore(previous)
+
+    assert (report["runs"], report["succeeded"], report["errors"]) == (3, 3, {})
+    assert report["latency"]["p50"] <= report["latency"]["p99"]
+    assert {"fetch_data", "architect_agent", "workflow_planner", "dsl_generator"} <= set(report["stages"])
+    assert ollama.stats["chats"] >= 9
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) is None
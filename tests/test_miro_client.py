@@ -0,0 +1,170 @@
+import builtins
+import sys
+import os
+from urllib.parse import urlparse
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.miro_client import MiroClient
+from src.rate_limit import TokenBucket
+from src.raw_store import RawPayloadStore
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = str(payload)
+        self.content = self.text.encode()
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Serves a two-page item stream, per-type streams and a connector stream."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, headers=None, params=None):
+        params = params or {}
+        self.calls.append((url, dict(params)))
+        path = urlparse(url).path
+        if path.endswith("/connectors"):
+            return FakeResponse({"data": [{
+                "id": "c1", "type": "connector",
+                "startItem": {"id": "s1"}, "endItem": {"id": "s2"},
+                "captions": [{"content": "<p>next</p>"}],
+            }]})
+        if "page=2" in url:
+            return FakeResponse({"data": [{"id": "s2", "type": "shape", "data": {"content": "B"}}]})
+        item_type = params.get("type")
+        if item_type == "shape":
+            return FakeResponse({"data": [
+                {"id": "s1", "type": "shape", "data": {"content": "A"}},
+                {"id": "s2", "type": "shape", "data": {"content": "B"}},
+            ]})
+        if item_type == "frame":
+            return FakeResponse({"data": [{"id": "f1", "type": "frame", "data": {"title": "F"}}]})
+        if item_type:
+            return FakeResponse({"data": []})
+        return FakeResponse({
+            "data": [{"id": "f1", "type": "frame", "data": {"title": "F"}},
+                     {"id": "s1", "type": "shape", "data": {"content": "A"}}],
+            "links": {"next": url + "?page=2"},
+        })
+
+
+def test_fetch_board_items_merges_parallel_streams():
+    session = FakeSession()
+    client = MiroClient(access_token="token", session=session)
+    items = client.fetch_board_items("board")
+
+    ids = [item.id for item in items]
+    assert sorted(ids) == ["c1", "f1", "s1", "s2"]
+    assert len(ids) == len(set(ids))
+
+    connector = next(item for item in items if item.id == "c1")
+    assert connector.content == "next"
+    assert (connector.start_id, connector.end_id) == ("s1", "s2")
+    assert connector.metadata is None and connector.style is None
+
+    # The second page of the unfiltered stream is never walked once split by type
+    assert not any("page=2" in url for url, _ in session.calls)
+
+
+def test_raw_payloads_are_kept_out_of_items_and_loaded_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SNAPSHOT_DIR", str(tmp_path))
+    client = MiroClient(access_token="token", session=FakeSession(), keep_raw=True)
+    client.fetch_board_items("board")
+
+    # A fresh store rebuilds its index from the spill file
+    store = RawPayloadStore.for_board("board")
+    assert "c1" in store
+    assert store.get("c1")["captions"] == [{"content": "<p>next</p>"}]
+    assert store.get("missing") is None
+
+
+def test_raw_payloads_are_appended_in_one_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SNAPSHOT_DIR", str(tmp_path))
+    opened = []
+    real_open = builtins.open
+    monkeypatch.setattr(builtins, "open", lambda path, *args, **kwargs: opened.append(path) or real_open(path, *args, **kwargs))
+    client = MiroClient(access_token="token", session=FakeSession(), keep_raw=True)
+    client.fetch_board_items("board")
+
+    assert opened.count(client.raw_store.path) == 2  # reset, then one append
+    assert [client.raw_store.get(i)["id"] for i in ("c1", "f1", "s1", "s2")] == ["c1", "f1", "s1", "s2"]
+
+
+class UntypedSession(FakeSession):
+    """Reports a total that includes a type outside MIRO_ITEM_TYPES, only served unfiltered."""
+
+    def get(self, url, headers=None, params=None):
+        params = params or {}
+        if "page=2" in url:
+            self.calls.append((url, dict(params)))
+            return FakeResponse({"data": [{"id": "m1", "type": "mindmap_node"}], "total": 4})
+        response = super().get(url, headers, params)
+        if not urlparse(url).path.endswith("/connectors") and not params.get("type"):
+            response.payload["total"] = 4
+        return response
+
+
+def test_items_of_unlisted_types_are_fetched_unfiltered():
+    session = UntypedSession()
+    items = MiroClient(access_token="token", session=session).fetch_board_items("board")
+
+    assert sorted(item.id for item in items) == ["c1", "f1", "m1", "s1", "s2"]
+    assert any("page=2" in url for url, _ in session.calls)
+
+
+def test_failed_page_names_the_stream():
+    class GoneSession:
+        def get(self, url, headers=None, params=None):
+            return FakeResponse({"message": "gone"}, 404)
+
+    client = MiroClient(access_token="token", session=GoneSession(), bucket=TokenBucket(1e9, 1e9))
+    with pytest.raises(Exception, match=r"/boards/b/connectors \(404\)"):
+        client._fetch_stream("https://api.miro.com/v2/boards/b/connectors", {}, client.get_headers())
+
+
+class FlakySession:
+    """Two-page stream whose second page fails with a 429 and then a 503 before succeeding."""
+
+    def __init__(self):
+        self.calls = []
+        self.failures = [FakeResponse({}, 429, {"Retry-After": "0"}), FakeResponse({}, 503)]
+
+    def get(self, url, headers=None, params=None):
+        self.calls.append(url)
+        if "cursor=2" in url:
+            if self.failures:
+                return self.failures.pop(0)
+            return FakeResponse({"data": [{"id": "b", "type": "shape"}]},
+                                headers={"X-RateLimit-Limit": "1000", "X-RateLimit-Remaining": "900", "X-RateLimit-Reset": "30"})
+        return FakeResponse({"data": [{"id": "a", "type": "shape"}], "links": {"next": "https://api.miro.com/v2/x?cursor=2"}})
+
+
+def test_pagination_retries_failed_page_without_restarting(monkeypatch):
+    monkeypatch.setattr(Config, "MIRO_BACKOFF_BASE", 0.001)
+    session = FlakySession()
+    bucket = TokenBucket(capacity=10_000, refill_per_second=10_000)
+    client = MiroClient(access_token="token", session=session, bucket=bucket)
+
+    results = client._fetch_stream("https://api.miro.com/v2/x", {}, client.get_headers())
+
+    assert [d["id"] for d in results] == ["a", "b"]
+    # One request for page one, three attempts for page two
+    assert len(session.calls) == 4 and session.calls.count("https://api.miro.com/v2/x") == 1
+    assert bucket.capacity == 1000 and bucket.tokens <= 900
+
+
+if __name__ == "__main__":
+    test_fetch_board_items_merges_parallel_streams()
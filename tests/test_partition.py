@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models import BoardItem
+from src.parser import LayoutParser
+from src.partition import partition_graph, merge_components
+
+
+def test_partition_graph_splits_by_frame_and_keeps_cross_edges():
+    items = []
+    for f in range(3):
+        items.append(BoardItem(id=f"f{f}", type="frame", content=f"Frame {f}"))
+        items.append(BoardItem(id=f"s{f}", type="shape", content=f"Shape {f}", parent_id=f"f{f}"))
+    items.append(BoardItem(id="c1", type="connector", metadata={"startItem": {"id": "s0"}, "endItem": {"id": "s1"}}))
+    graph = LayoutParser(items).parse().dict()
+
+    # A target of one token forces one partition per frame
+    split = partition_graph(graph, target_tokens=1)
+
+    assert [p["frames"] for p in split["partitions"]] == [["f0"], ["f1"], ["f2"]]
+    assert set(split["partitions"][0]["graph"]["items"]) == {"f0", "s0", "c1"}
+    assert split["cross_frame_edges"] == [["Frame 0 / Shape 0", "Frame 1 / Shape 1", ""]]
+
+    packed = partition_graph(graph, target_tokens=100_000)
+    assert [p["frames"] for p in packed["partitions"]] == [["f0", "f1", "f2"]]
+
+
+def test_merge_components_dedupes_across_partitions():
+    merged = merge_components(
+        [{"sub_agents": [{"name": "Researcher", "role": ""}], "tools": [{"name": "web_search"}]},
+         {"sub_agents": [{"name": "researcher", "role": "Research"}], "tools": [{"name": "Web Search"}]}],
+        [["f0"], ["f1"]],
+    )
+    assert merged["sub_agents"] == [{"name": "Researcher", "role": "Research"}]
+    assert [t["name"] for t in merged["tools"]] == ["web_search"]
+    assert merged["provenance"]["sub_agents"]["Researcher"] == ["f0", "f1"]
+
+
+def test_merge_components_keeps_the_first_system_name_and_goal():
+    merged = merge_components([
+        {"name": "", "sub_agents": []},
+        {"name": "ResearchCrew", "goal": "Answer questions", "sub_agents": []},
+        {"name": "Other", "goal": "Something else", "sub_agents": []},
+    ])
+    assert (merged["name"], merged["goal"]) == ("ResearchCrew", "Answer questions")
+    assert "name" not in merge_components([{"sub_agents": []}])
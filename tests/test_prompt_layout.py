@@ -0,0 +1,64 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.config import Config
+from src.graph_encoding import encode_graph
+from src.prompt_layout import build_messages, context_options
+from src.prompts import ARCHITECT_PROMPT, WORKFLOW_PLANNER_PROMPT, DSL_GENERATOR_PROMPT
+from src.miro_client import MiroClient
+from src.tools import parse_board_items
+from tests.synthetic_board import generate_board
+
+
+def test_stages_share_a_byte_identical_prefix_and_context_size():
+    client = MiroClient(access_token="test")
+    items = [client._parse_item(d) for d in generate_board(200, items_per_frame=20)]
+    graph = parse_board_items(items)["structural_graph"]
+    board_context = encode_graph(graph)
+    stages = [
+        build_messages(ARCHITECT_PROMPT, "", board_context),
+        build_messages(WORKFLOW_PLANNER_PROMPT, 'Identified Components:\n{"sub_agents":[]}', board_context),
+        build_messages(DSL_GENERATOR_PROMPT, '{"components":{},"workflows":{}}', board_context),
+    ]
+    prefixes = {json.dumps(messages[:2]) for messages in stages}
+    assert len(prefixes) == 1
+    assert stages[1][-1]["content"].startswith(WORKFLOW_PLANNER_PROMPT.strip())
+    # A changed num_ctx reloads the model, so every stage must land in the same bucket
+    assert len({context_options(messages, board_context)["num_ctx"] for messages in stages}) == 1
+
+
+def test_num_ctx_grows_in_power_of_two_buckets():
+    small = build_messages(ARCHITECT_PROMPT, "", "{}")
+    assert context_options(small, "{}")["num_ctx"] >= Config.LLM_NUM_CTX_MIN
+    large_context = "x" * (Config.PROMPT_CHARS_PER_TOKEN * 20000)
+    num_ctx = context_options(build_messages(ARCHITECT_PROMPT, "", large_context), large_context)["num_ctx"]
+    assert num_ctx >= 20000 + Config.LLM_CONTEXT_HEADROOM and num_ctx & (num_ctx - 1) == 0
+
+
+def test_call_llm_sends_context_first_with_keep_alive(monkeypatch):
+    sent = {}
+
+    class FakeResponse:
+        content = b"{}"
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"message": {"content": '{"tools": []}'}}
+
+    def fake_post(url, data=None, headers=None):
+        sent.update(json.loads(data))
+        return FakeResponse()
+
+    monkeypatch.setattr(agent, "llm_cache", None)
+    monkeypatch.setattr(Config, "LLM_STREAM", False)
+    monkeypatch.setattr(agent.ollama_session, "post", fake_post)
+
+    assert agent.call_llm(ARCHITECT_PROMPT, "", board_context='{"frames":[]}') == {"tools": []}
+    assert [m["role"] for m in sent["messages"]] == ["system", "user", "user"]
+    assert sent["messages"][1]["content"] == 'Board Context:\n{"frames":[]}'
+    assert sent["keep_alive"] == Config.OLLAMA_KEEP_ALIVE and sent["options"]["num_ctx"] >= Config.LLM_NUM_CTX_MIN
@@ -0,0 +1,67 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.config import Config
+from src.instrumentation import metrics
+from src.llm_cache import LLMCache
+from src.models import WorkflowPlan
+from src.prompts import WORKFLOW_PLANNER_PROMPT
+from src.router import ModelRouter
+
+
+def test_candidates_follow_profile_and_stage():
+    router = ModelRouter(small_model="small", large_model="large", profile="balanced", log_path="")
+    assert router.candidates("architect", 500, 10) == ["small", "large"]
+    assert router.candidates("architect", 50000, 10) == ["large"]
+    assert router.candidates("planner", 500, 1000) == ["large"]
+    assert router.candidates("generator", 10, 1) == ["large"]
+    assert ModelRouter(small_model="small", large_model="large", profile="quality", log_path="").candidates("architect", 1, 1) == ["large"]
+    assert ModelRouter(small_model="", large_model="large", log_path="").candidates("architect", 1, 1) == ["large"]
+
+
+def test_invalid_small_model_output_escalates_and_is_logged(tmp_path, monkeypatch):
+    log = tmp_path / "routing.jsonl"
+    monkeypatch.setattr(Config, "OLLAMA_SMALL_MODEL", "small")
+    monkeypatch.setattr(Config, "OLLAMA_MODEL", "large")
+    monkeypatch.setattr(Config, "ROUTER_LOG", str(log))
+    monkeypatch.setattr(Config, "LLM_STREAM", False)
+    monkeypatch.setattr(agent, "llm_cache", None)
+    models = []
+
+    class FakeResponse:
+        def __init__(self, content):
+            self.content = json.dumps({"message": {"content": json.dumps(content)}}).encode()
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return json.loads(self.content)
+
+    def fake_post(url, data=None, headers=None):
+        model = json.loads(data)["model"]
+        models.append(model)
+        if model == "small":
+            return FakeResponse({"workflows": [{"name": "W"}]})
+        return FakeResponse({"workflows": [{"name": "W", "description": "d", "steps": []}]})
+
+    monkeypatch.setattr(agent.ollama_session, "post", fake_post)
+    plan = agent.call_llm(WORKFLOW_PLANNER_PROMPT, "", board_context="{}", schema=WorkflowPlan, stage="planner", complexity=3)
+
+    # No repair turn on the small model: straight to the large one
+    assert models == ["small", "large"] and plan["workflows"][0]["description"] == "d"
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [(e["model"], e["outcome"]) for e in entries] == [("small", "escalated"), ("large", "ok")]
+    assert entries[0]["stage"] == "planner" and entries[0]["complexity"] == 3 and "description" in entries[0]["error"]
+
+    # A cached escalated answer is attributed to the model that produced it
+    monkeypatch.setattr(agent, "llm_cache", LLMCache(directory=str(tmp_path / "llm")))
+    agent.call_llm(WORKFLOW_PLANNER_PROMPT, "", board_context="{}", schema=WorkflowPlan, stage="planner", complexity=3)
+    hits = metrics.snapshot().get('miro_agent_llm_calls_total{cache="hit",model="large"}', 0)
+    models.clear()
+    cached = agent.call_llm(WORKFLOW_PLANNER_PROMPT, "", board_context="{}", schema=WorkflowPlan, stage="planner", complexity=3)
+    assert models == [] and cached == plan
+    assert metrics.snapshot()['miro_agent_llm_calls_total{cache="hit",model="large"}'] == hits + 1
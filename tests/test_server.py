@@ -0,0 +1,56 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent, server
+
+
+class FakeApp:
+    def invoke(self, state):
+        if "broken" in state["board_url"]:
+            return {"error": "Failed to fetch board items"}
+        board_id = state["board_url"].rsplit("/", 1)[-1]
+        return {"board_id": board_id, "agent_dsl": {"name": board_id, "tools": [], "workflows": []}}
+
+
+def test_run_batch_writes_outputs_and_summary(tmp_path):
+    manifest = tmp_path / "boards.txt"
+    manifest.write_text("# weekly boards\nhttps://miro.com/app/board/a1=/\nhttps://miro.com/app/board/broken\n")
+
+    urls = server.load_manifest(str(manifest))
+    summary = server.run_batch(urls, str(tmp_path / "out"), jobs=2, app=FakeApp())
+
+    assert (summary["succeeded"], summary["failed"]) == (1, 1)
+    assert os.path.exists(tmp_path / "out" / "a1%3D.json")
+    assert os.path.exists(tmp_path / "out" / "a1%3D.md")
+    with open(tmp_path / "out" / "summary.json") as f:
+        assert json.load(f)["boards"][1]["error"] == "Failed to fetch board items"
+
+
+def test_run_batch_runs_each_board_once(tmp_path):
+    calls = []
+
+    class CountingApp(FakeApp):
+        def invoke(self, state):
+            calls.append(state["board_url"])
+            return super().invoke(state)
+
+    urls = ["https://miro.com/app/board/a1=/", "https://miro.com/app/board/b2=/", "https://miro.com/app/board/a1=/?share=1"]
+    summary = server.run_batch(urls, str(tmp_path / "out"), jobs=3, app=CountingApp())
+
+    assert sorted(calls) == urls[:2] and summary["total"] == 2
+    assert summary["duplicates"] == [{"url": urls[2], "duplicate_of": urls[0]}]
+
+
+def test_stage_rerun_points_to_resume_instead_of_failing(monkeypatch, capsys):
+    monkeypatch.setattr(agent, "rerun_stage", lambda run_id, stage: {"run_id": run_id, "identified_components": {}})
+    monkeypatch.setattr(sys, "argv", ["server.py", "--resume", "run1", "--stage", "architect_agent"])
+    monkeypatch.setattr(os, "environ", os.environ.copy())  # main() exports the LangSmith settings
+    server.main()
+
+    out = capsys.readouterr().out
+    assert "Re-ran architect_agent of run run1" in out and "--resume run1" in out
+    assert "Failed to generate DSL." not in out
@@ -0,0 +1,91 @@
+import json
+import sys
+import os
+import threading
+import urllib.error
+import urllib.request
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.service import JobQueue, create_server
+
+
+class GatedApp:
+    """Blocks every run until released, recording the order boards ran in."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.started = []
+
+    def invoke(self, state):
+        self.started.append(state["board_url"])
+        self.entered.set()
+        self.release.wait(5)
+        if "broken" in state["board_url"]:
+            return {"error": "Failed to fetch board items"}
+        return {"run_id": "r1", "agent_dsl": {"name": state["board_url"]}}
+
+
+def test_duplicate_submissions_share_one_run_and_priority_orders_queue():
+    app = GatedApp()
+    jobs = JobQueue(app, workers=1)
+    running, _ = jobs.submit("https://miro.com/app/board/a=/")
+    jobs.start()
+    assert app.entered.wait(5)
+
+    low, _ = jobs.submit("https://miro.com/app/board/low=/")
+    high, _ = jobs.submit("https://miro.com/app/board/high=/", priority=5)
+    same, created = jobs.submit("https://miro.com/app/board/a=/?share=1")
+    assert same is running and not created and running.submissions == 2
+
+    app.release.set()
+    for job in (running, low, high):
+        assert job.done.wait(5)
+    jobs.stop(timeout=5)
+
+    assert app.started == ["https://miro.com/app/board/a=/", "https://miro.com/app/board/high=/",
+                           "https://miro.com/app/board/low=/"]
+    assert running.status == "done" and running.result == {"name": "https://miro.com/app/board/a=/"}
+    # Once a run finished, a new submission starts a fresh run
+    _, created = jobs.submit("https://miro.com/app/board/a=/")
+    assert created
+
+
+def test_http_submit_status_and_result():
+    app = GatedApp()
+    app.release.set()
+    jobs = JobQueue(app, workers=2)
+    jobs.start()
+    server = create_server(jobs, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path, body=None):
+        request = urllib.request.Request(base + path, data=json.dumps(body).encode() if body else None)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        status, job = call("/jobs", {"url": "https://miro.com/app/board/ok=/"})
+        assert status == 202
+        status, result = call(f"/jobs/{job['job_id']}/result?wait=5")
+        assert status == 200 and result["agent_dsl"] == {"name": "https://miro.com/app/board/ok=/"}
+
+        _, failed = call("/jobs", {"url": "https://miro.com/app/board/broken"})
+        status, result = call(f"/jobs/{failed['job_id']}/result?wait=5")
+        assert status == 422 and result["error"] == "Failed to fetch board items"
+
+        assert call("/jobs", {"priority": 1})[0] == 400
+        assert call("/jobs", {"url": 5})[0] == 400
+        assert call("/jobs", {"url": "  "})[0] == 400
+        assert call("/jobs/missing")[0] == 404
+        status, health = call("/health")
+        assert health["jobs"]["done"] == 1 and health["jobs"]["failed"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.stop(timeout=5)
@@ -0,0 +1,46 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models import BoardItem
+from src.snapshot_store import SnapshotStore, merge_items
+
+
+def test_snapshot_roundtrip_and_merge(tmp_path):
+    store = SnapshotStore(root=str(tmp_path))
+    cached = [
+        BoardItem(id="a", type="shape", content="old", modified_at="t1"),
+        BoardItem(id="b", type="shape", content="keep", modified_at="t1"),
+        BoardItem(id="c", type="shape", content="gone", modified_at="t1"),
+    ]
+    store.save("uXjV=board", "board-t1", cached)
+
+    snapshot = store.load("uXjV=board")
+    assert snapshot.board_modified_at == "board-t1"
+    assert [item.id for item in snapshot.items] == ["a", "b", "c"]
+
+    fresh = [
+        BoardItem(id="a", type="shape", content="new", modified_at="t2"),
+        BoardItem(id="b", type="shape", content="keep", modified_at="t1"),
+        BoardItem(id="d", type="shape", content="added", modified_at="t2"),
+    ]
+    merged, diff = merge_items(snapshot.items, fresh)
+
+    assert diff == {"added": ["d"], "changed": ["a"], "removed": ["c"]}
+    assert [item.content for item in merged] == ["new", "keep", "added"]
+    assert merged[1] is snapshot.items[1]
+    assert store.load("missing") is None
+
+
+def test_concurrent_saves_of_one_board_leave_a_whole_snapshot(tmp_path):
+    store = SnapshotStore(root=str(tmp_path))
+    batches = [[BoardItem(id=f"{n}-{i}", type="shape", content="x" * 200) for i in range(300)] for n in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda items: store.save("board", "t1", items), batches))
+
+    snapshot = store.load("board")
+    assert snapshot is not None and [item.id for item in snapshot.items] in [[i.id for i in b] for b in batches]
+    assert os.listdir(tmp_path) == ["board.json"]
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SERVER = os.path.join(ROOT, "src", "server.py")
+
+# Cumulative import time of server.py's own import graph, excluding interpreter startup
+# (~10 ms today; langgraph or pydantic alone would take well over this)
+IMPORT_BUDGET_SECONDS = 0.15
+HEAVY_MODULES = ("langgraph", "requests", "pydantic", "dotenv", "numpy")
+
+
+def test_help_does_not_import_heavy_modules():
+    probe = (
+        "import runpy, sys\n"
+        f"sys.argv = [{SERVER!r}, '--help']\n"
+        f"sys.path.insert(0, {os.path.dirname(SERVER)!r})\n"
+        "try:\n"
+        f"    runpy.run_path({SERVER!r}, run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
+
+
+
+def _import_seconds(module, directory):
+    """Cumulative import time of module as reported by -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True, cwd=directory)
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_server_import_within_budget():
+    # Best of three; -X importtime measures only the import, not interpreter startup
+    seconds = min(_import_seconds("server", os.path.dirname(SERVER)) for _ in range(3))
+    assert seconds < IMPORT_BUDGET_SECONDS, f"importing server took {seconds * 1000:.1f}ms"
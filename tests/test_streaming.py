@@ -0,0 +1,41 @@
+import json
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.streaming import IncrementalJSONParser, StreamAborted, consume_ollama_stream
+
+
+def _ollama_lines(text, size=3):
+    for i in range(0, len(text), size):
+        yield json.dumps({"message": {"content": text[i:i + size]}, "done": False}).encode()
+    yield json.dumps({"message": {"content": ""}, "done": True}).encode()
+
+
+def test_incremental_parser_reports_elements_as_they_close():
+    doc = {
+        "sub_agents": [{"name": "Researcher", "role": "r", "description": "has } and \" inside"}],
+        "tools": [{"name": "web_search", "description": "[x]"}],
+    }
+    seen = []
+    parser = IncrementalJSONParser(on_element=lambda key, el: seen.append((key, el["name"])))
+    text = "```json\n" + json.dumps(doc) + "\n```"
+
+    result, metrics = consume_ollama_stream(_ollama_lines(text), parser, max_tokens=10_000, max_seconds=60)
+
+    assert result == doc
+    assert seen == [("sub_agents", "Researcher"), ("tools", "web_search")]
+    assert metrics["tokens"] > 0 and metrics["time_to_first_token"] is not None
+
+
+def test_incremental_parser_aborts_on_malformed_or_runaway_output():
+    with pytest.raises(StreamAborted):
+        IncrementalJSONParser().feed('{"workflows": [}')
+
+    runaway = '{"workflows": [' + '{"name": "x"},' * 1000
+    with pytest.raises(StreamAborted):
+        consume_ollama_stream(_ollama_lines(runaway), IncrementalJSONParser(), max_tokens=50, max_seconds=60)
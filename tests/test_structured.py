@@ -0,0 +1,93 @@
+import json
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import agent
+from src.config import Config
+from src.instrumentation import metrics
+from src.models import AgentSpec, WorkflowPlan
+from src.prompts import WORKFLOW_PLANNER_PROMPT
+from src.structured import apply_fixes, output_schema, validate_output
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = json.dumps({"message": {"content": json.dumps(content)}}).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def test_output_schema_is_self_contained():
+    schema = output_schema(AgentSpec)
+    assert "$ref" not in json.dumps(schema) and "$defs" not in schema
+    step = schema["properties"]["workflows"]["items"]["properties"]["steps"]["items"]
+    assert step["properties"]["step_id"]["type"] == "integer"
+
+
+def test_apply_fixes_sets_appends_and_skips_bad_paths():
+    data = {"workflows": [{"name": "W", "steps": [{"step_id": "one", "description": "a"}]}]}
+    fixed = apply_fixes(data, [
+        {"path": "workflows.0.description", "value": "d"},
+        {"path": "workflows.0.steps.0.step_id", "value": 1},
+        {"path": "workflows.0.steps.1", "value": {"step_id": 2, "description": "b"}},
+        {"path": "workflows.5.name", "value": "ignored"},
+    ])
+    validated, errors = validate_output(WorkflowPlan, fixed)
+    assert not errors and [s["step_id"] for s in validated["workflows"][0]["steps"]] == [1, 2]
+    assert data["workflows"][0]["steps"][0]["step_id"] == "one"
+
+
+def test_call_llm_repairs_only_the_failing_fields(monkeypatch):
+    responses = [
+        {"workflows": [{"name": "W", "steps": [{"step_id": "first", "description": "Search"}]}]},
+        {"fixes": [{"path": "workflows.0.description", "value": "Research"},
+                   {"path": "workflows.0.steps.0.step_id", "value": 1}]},
+    ]
+    sent = []
+
+    def fake_post(url, data=None, headers=None):
+        sent.append(json.loads(data))
+        return FakeResponse(responses[len(sent) - 1])
+
+    monkeypatch.setattr(agent, "llm_cache", None)
+    monkeypatch.setattr(Config, "LLM_STREAM", False)
+    monkeypatch.setattr(agent.ollama_session, "post", fake_post)
+
+    series = f'miro_agent_llm_repairs_total{{model="{Config.OLLAMA_MODEL}",schema="WorkflowPlan"}}'
+    repairs = metrics.snapshot().get(series, 0)
+    plan = agent.call_llm(WORKFLOW_PLANNER_PROMPT, "Identified Components:\n{}", board_context="{}", schema=WorkflowPlan)
+    assert plan["workflows"][0]["steps"][0]["step_id"] == 1
+    # The repair is counted for the model that produced the reply, with the schema as its own label
+    assert metrics.snapshot()[series] == repairs + 1
+    assert sent[0]["format"]["properties"].keys() == {"workflows"}
+
+    # The repair turn extends the original conversation and carries only the errors
+    first, repair = sent
+    assert repair["messages"][:len(first["messages"])] == first["messages"]
+    assert repair["messages"][-2]["role"] == "assistant"
+    assert "workflows.0.description: Field required" in repair["messages"][-1]["content"]
+    assert repair["options"] == first["options"]
+
+
+def test_call_llm_gives_up_after_repair_attempts(monkeypatch):
+    def fake_post(url, data=None, headers=None):
+        if "fixes" in json.dumps(json.loads(data)["format"]):
+            return FakeResponse({"fixes": []})
+        return FakeResponse({"workflows": [{"name": "W"}]})
+
+    monkeypatch.setattr(agent, "llm_cache", None)
+    monkeypatch.setattr(Config, "LLM_STREAM", False)
+    monkeypatch.setattr(Config, "LLM_REPAIR_ATTEMPTS", 1)
+    monkeypatch.setattr(agent.ollama_session, "post", fake_post)
+
+    with pytest.raises(Exception, match="does not match WorkflowPlan"):
+        agent.call_llm(WORKFLOW_PLANNER_PROMPT, "", schema=WorkflowPlan)
@@ -0,0 +1,43 @@
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools import extract_json, JSONExtractionError
+from tests.synthetic_board import adversarial_llm_outputs
+
+
+def test_extract_json_recovers_object_from_fences_and_prose():
+    outputs = adversarial_llm_outputs(5)
+    expected = extract_json(outputs["clean"])
+    assert extract_json(outputs["fenced"]) == expected
+    # Braces in the prose before and after the JSON must not break extraction
+    assert extract_json(outputs["prose_with_braces"]) == expected
+
+
+def test_extract_json_accepts_top_level_arrays():
+    assert extract_json("[1, 2]") == [1, 2]
+    assert extract_json('```json\n[{"name": "a"}]\n```') == [{"name": "a"}]
+
+
+def test_extract_json_ignores_braces_and_escapes_inside_strings():
+    text = 'Result: {"note": "use } and \\" {", "ok": true} see {docs}'
+    assert extract_json(text) == {"note": 'use } and " {', "ok": True}
+
+
+@pytest.mark.parametrize("key, reason", [
+    ("truncated", "unterminated object"),
+    ("no_json", "no JSON object found"),
+])
+def test_extract_json_reports_why_it_failed(key, reason):
+    with pytest.raises(JSONExtractionError) as excinfo:
+        extract_json(adversarial_llm_outputs(5)[key])
+    assert reason in excinfo.value.reason
+
+
+def test_extract_json_reports_invalid_candidate():
+    with pytest.raises(ValueError, match="invalid JSON in object at offset 0"):
+        extract_json('{"a": 1,}')